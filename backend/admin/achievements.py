@@ -2,8 +2,12 @@
 combat records). Separate from the play-facing
 `GET /api/achievement-definitions` (routers/achievements.py), which stays
 read-only.
+
+Creating a definition, or changing an existing one's condition, queues a
+background re-evaluation of it for every pilot (services/achievement_backfill.py),
+returned as `backfillJobId`; `POST .../reevaluate` re-runs it on demand.
 """
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
@@ -12,6 +16,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_session
 from models import AchievementDefinition, PilotAchievement
+from services import achievement_backfill, achievement_rules, pilot_stats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -31,6 +36,11 @@ class AchievementDefinitionUpdateIn(BaseModel):
     condition: Optional[str] = None
 
 
+class AchievementReevaluateIn(BaseModel):
+    # None: every definition.
+    achievementIds: Optional[List[str]] = None
+
+
 def definition_to_dict(a):
     return {"id": a.id, "name": a.name, "icon": a.icon, "description": a.description, "condition": a.condition}
 
@@ -50,7 +60,9 @@ async def admin_create_achievement_definition(
     definition = AchievementDefinition(**payload.model_dump())
     session.add(definition)
     await session.commit()
-    return definition_to_dict(definition)
+    achievement_rules.invalidate()
+    job = await achievement_backfill.start_backfill(session, [definition.id])
+    return {**definition_to_dict(definition), "backfillJobId": job.id}
 
 
 @router.put("/achievement-definitions/{achievement_id}")
@@ -60,10 +72,17 @@ async def admin_update_achievement_definition(
     definition = await session.get(AchievementDefinition, achievement_id)
     if not definition:
         raise HTTPException(status_code=404, detail="Achievement definition not found")
-    for key, value in payload.model_dump(exclude_unset=True).items():
+    changes = payload.model_dump(exclude_unset=True)
+    condition_changed = "condition" in changes and changes["condition"] != definition.condition
+    for key, value in changes.items():
         setattr(definition, key, value)
     await session.commit()
-    return definition_to_dict(definition)
+    achievement_rules.invalidate()
+    result = definition_to_dict(definition)
+    if condition_changed:
+        job = await achievement_backfill.start_backfill(session, [achievement_id])
+        result["backfillJobId"] = job.id
+    return result
 
 
 @router.delete("/achievement-definitions/{achievement_id}", status_code=204)
@@ -71,7 +90,35 @@ async def admin_delete_achievement_definition(achievement_id: str, session: Asyn
     definition = await session.get(AchievementDefinition, achievement_id)
     if not definition:
         raise HTTPException(status_code=404, detail="Achievement definition not found")
+    pilot_ids = (
+        await session.execute(
+            select(PilotAchievement.pilot_id).where(PilotAchievement.achievement_id == achievement_id)
+        )
+    ).scalars().all()
     await session.execute(delete(PilotAchievement).where(PilotAchievement.achievement_id == achievement_id))
     await session.delete(definition)
+    await pilot_stats.refresh(session, pilot_ids)
     await session.commit()
+    achievement_rules.invalidate()
     return Response(status_code=204)
+
+
+@router.post("/achievement-definitions/reevaluate", status_code=202)
+async def admin_reevaluate_achievement_definitions(
+    payload: AchievementReevaluateIn, session: AsyncSession = Depends(get_session)
+):
+    job = await achievement_backfill.start_backfill(session, payload.achievementIds)
+    return achievement_backfill.job_to_dict(job)
+
+
+@router.get("/achievement-backfills")
+async def admin_list_achievement_backfills(session: AsyncSession = Depends(get_session)):
+    return [achievement_backfill.job_to_dict(job) for job in await achievement_backfill.list_jobs(session)]
+
+
+@router.get("/achievement-backfills/{job_id}")
+async def admin_get_achievement_backfill(job_id: str, session: AsyncSession = Depends(get_session)):
+    job = await achievement_backfill.get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Achievement backfill job not found")
+    return achievement_backfill.job_to_dict(job)
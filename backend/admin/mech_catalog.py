@@ -1,44 +1,60 @@
 """Admin-triggered mech catalog CSV import.
 
-Wraps the same idempotent upsert-by-MUL-ID logic used by the operational
-`import_mech_catalog.py` script and the watched-folder mechanism
-(watcher.py), so all three paths (manual script, watched folder, admin
-upload) stay in sync. This endpoint is the primary in-app path; the watched
-folder remains available for Docker/ops workflows (see DEPLOYMENT.md).
+Uploads are spooled and imported as background jobs (services/catalog_jobs.py)
+through the shared import engine (services/catalog_import.py) used by the
+operational `import_mech_catalog.py` script and the watched-folder
+mechanism (watcher.py), so all three paths (manual script, watched folder,
+admin upload) stay in sync. This endpoint is the primary in-app path; the
+watched folder remains available for Docker/ops workflows (see
+DEPLOYMENT.md).
 """
-import tempfile
-from pathlib import Path
-
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_session
-from import_mech_catalog import import_catalog
+from services.catalog_import import CatalogImportError, catalog_format
+from services.catalog_jobs import create_job, get_job, list_jobs, cancel_job, job_to_dict
+from services.import_queue import ImportQueueFull
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 
-@router.post("/mech-catalog/import")
+@router.post("/mech-catalog/import", status_code=202)
 async def admin_import_mech_catalog(
-    file: UploadFile = File(...), session: AsyncSession = Depends(get_session)
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False, alias="dryRun"),
+    session: AsyncSession = Depends(get_session),
 ):
-    if not file.filename or not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only .csv files are supported")
+    if catalog_format(file.filename) is None:
+        raise HTTPException(status_code=400, detail="Only .csv, .csv.gz, .zip and .ndjson files are supported")
 
-    contents = await file.read()
-    tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(mode="wb", suffix=".csv", delete=False) as tmp:
-            tmp.write(contents)
-            tmp_path = Path(tmp.name)
-
-        created, updated = await import_catalog(session, tmp_path)
-        await session.commit()
+        job = await create_job(session, file, dry_run=dry_run)
+    except CatalogImportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except ImportQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
-        await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to import CSV: {exc}")
-    finally:
-        if tmp_path is not None:
-            tmp_path.unlink(missing_ok=True)
+    return job_to_dict(job)
+
+
+@router.get("/mech-catalog/import-jobs")
+async def admin_list_mech_catalog_import_jobs(session: AsyncSession = Depends(get_session)):
+    return [job_to_dict(job) for job in await list_jobs(session)]
+
+
+@router.get("/mech-catalog/import/{job_id}")
+async def admin_get_mech_catalog_import_job(job_id: str, session: AsyncSession = Depends(get_session)):
+    job = await get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job_to_dict(job)
+
 
-    return {"filename": file.filename, "created": created, "updated": updated, "errors": []}
+@router.post("/mech-catalog/import/{job_id}/cancel")
+async def admin_cancel_mech_catalog_import_job(job_id: str, session: AsyncSession = Depends(get_session)):
+    job = await cancel_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job_to_dict(job)
@@ -0,0 +1,85 @@
+"""mech catalog components table
+
+Revision ID: 3d9a61f2c4b7
+Revises: 07f5507d9f67
+Create Date: 2026-10-19 09:12:31.418276
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9a61f2c4b7'
+down_revision: Union[str, Sequence[str], None] = '07f5507d9f67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# domain/components_logic.py's parser as of this revision.
+_ENTRY_RE = re.compile(r"^(?:(\d+)\s*x\s*)?(.+?)\s*$", re.IGNORECASE)
+SYSTEM_LOCATIONS = {"Armor", "Structure", "Engine"}
+
+
+def _parse_components(text):
+    parsed = {}
+    for raw_entry in (text or "").split(","):
+        raw_entry = raw_entry.strip()
+        if not raw_entry:
+            continue
+        if ":" in raw_entry:
+            raw_entry, location = raw_entry.rsplit(":", 1)
+            location = location.strip()
+        else:
+            location = ""
+        match = _ENTRY_RE.match(raw_entry)
+        if not match or not match.group(2):
+            continue
+        count = int(match.group(1)) if match.group(1) else 1
+        item = match.group(2)
+        key = (item.lower(), location)
+        _, previous = parsed.get(key, (item, 0))
+        if location in SYSTEM_LOCATIONS:
+            parsed[key] = (item, max(previous, count))
+        else:
+            parsed[key] = (item, previous + count)
+    return [(item, location, count) for (_, location), (item, count) in parsed.items()]
+
+
+def upgrade() -> None:
+    """Create mech_catalog_components and backfill it by parsing every
+    existing catalog row's `components` text."""
+    op.create_table('mech_catalog_components',
+    sa.Column('catalog_id', sa.Integer(), nullable=False),
+    sa.Column('item', sa.String(collation='NOCASE'), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['catalog_id'], ['mech_catalog.id'], ),
+    sa.PrimaryKeyConstraint('catalog_id', 'item', 'location')
+    )
+    op.create_index('ix_mech_catalog_components_item_catalog_id', 'mech_catalog_components', ['item', 'catalog_id'], unique=False)
+
+    conn = op.get_bind()
+    rows = conn.execute(text("SELECT id, components FROM mech_catalog")).fetchall()
+    params = [
+        {"catalog_id": row.id, "item": item, "location": location, "count": count}
+        for row in rows
+        for item, location, count in _parse_components(row.components)
+    ]
+    if params:
+        conn.execute(
+            text(
+                "INSERT INTO mech_catalog_components (catalog_id, item, location, count) "
+                "VALUES (:catalog_id, :item, :location, :count)"
+            ),
+            params,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mech_catalog_components_item_catalog_id', table_name='mech_catalog_components')
+    op.drop_table('mech_catalog_components')
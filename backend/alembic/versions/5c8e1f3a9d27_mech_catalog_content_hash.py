@@ -0,0 +1,49 @@
+"""mech catalog content hash
+
+Revision ID: 5c8e1f3a9d27
+Revises: 9b2e4c7d1a05
+Create Date: 2026-10-19 11:02:47.903114
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e1f3a9d27'
+down_revision: Union[str, Sequence[str], None] = '9b2e4c7d1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTENT_COLUMNS = (
+    "mul_id", "chassis", "model", "bv", "tonnage", "year", "techbase", "role", "walk", "max_walk",
+    "jump", "max_jump", "heat", "dissipation", "dissipation_efficiency", "components",
+)
+
+
+def _content_hash(values):
+    # domain.catalog_logic.content_hash as of this revision.
+    payload = json.dumps(sorted(values.items()), separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Add mech_catalog.content_hash and backfill it from the existing rows,
+    so the first re-import after upgrading only touches rows that differ."""
+    op.add_column('mech_catalog', sa.Column('content_hash', sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(text(f"SELECT id, {', '.join(CONTENT_COLUMNS)} FROM mech_catalog")).mappings().all()
+    params = [{"id": row["id"], "content_hash": _content_hash({c: row[c] for c in CONTENT_COLUMNS})} for row in rows]
+    if params:
+        conn.execute(text("UPDATE mech_catalog SET content_hash = :content_hash WHERE id = :id"), params)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mech_catalog', 'content_hash')
@@ -0,0 +1,45 @@
+"""mech catalog chassis/model upsert index
+
+Revision ID: 9b2e4c7d1a05
+Revises: 3d9a61f2c4b7
+Create Date: 2026-10-19 10:41:07.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e4c7d1a05'
+down_revision: Union[str, Sequence[str], None] = '3d9a61f2c4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the partial unique index bulk upserts use as the conflict target
+    for catalog rows without a MUL ID. The old importer already matched such
+    rows on (chassis, model), so duplicates shouldn't exist - any that do are
+    collapsed to the most recently inserted row first."""
+    conn = op.get_bind()
+    stale = (
+        "SELECT id FROM mech_catalog WHERE mul_id IS NULL AND id NOT IN "
+        "(SELECT MAX(id) FROM mech_catalog WHERE mul_id IS NULL GROUP BY chassis, model)"
+    )
+    conn.execute(text(f"DELETE FROM mech_catalog_components WHERE catalog_id IN ({stale})"))
+    conn.execute(text(f"DELETE FROM mech_catalog WHERE id IN ({stale})"))
+    op.create_index(
+        'uq_mech_catalog_chassis_model_without_mul_id',
+        'mech_catalog',
+        ['chassis', 'model'],
+        unique=True,
+        sqlite_where=sa.text('mul_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_mech_catalog_chassis_model_without_mul_id', table_name='mech_catalog')
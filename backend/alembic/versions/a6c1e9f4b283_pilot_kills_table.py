@@ -0,0 +1,97 @@
+"""pilot kills table
+
+Revision ID: a6c1e9f4b283
+Revises: f4a9d3b6c015
+Create Date: 2026-10-19 20:15:26.840917
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c1e9f4b283'
+down_revision: Union[str, Sequence[str], None] = 'f4a9d3b6c015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from domain/achievements_logic.py as of this revision.
+WEIGHT_CLASSES = {
+    "light": (20, 35),
+    "medium": (40, 55),
+    "heavy": (60, 75),
+    "assault": (80, 100),
+}
+
+
+def _weight_class(tonnage):
+    for name, (lo, hi) in WEIGHT_CLASSES.items():
+        if lo <= tonnage <= hi:
+            return name
+    return None
+
+
+def upgrade() -> None:
+    """Create pilot_kills and backfill it from every pilot's
+    combat_record kills."""
+    op.create_table('pilot_kills',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('pilot_id', sa.String(), nullable=False),
+    sa.Column('force_id', sa.String(), nullable=False),
+    sa.Column('mission', sa.String(), nullable=True),
+    sa.Column('date', sa.String(), nullable=True),
+    sa.Column('mech_model', sa.String(), nullable=False),
+    sa.Column('tonnage', sa.Integer(), nullable=False),
+    sa.Column('weight_class', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['force_id'], ['forces.id'], ),
+    sa.ForeignKeyConstraint(['pilot_id'], ['pilots.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pilot_kills_force_id_weight_class', 'pilot_kills', ['force_id', 'weight_class'], unique=False)
+    op.create_index(op.f('ix_pilot_kills_force_id'), 'pilot_kills', ['force_id'], unique=False)
+    op.create_index(op.f('ix_pilot_kills_mission'), 'pilot_kills', ['mission'], unique=False)
+    op.create_index(op.f('ix_pilot_kills_pilot_id'), 'pilot_kills', ['pilot_id'], unique=False)
+    op.create_index(op.f('ix_pilot_kills_weight_class'), 'pilot_kills', ['weight_class'], unique=False)
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        text("SELECT id, force_id, combat_record FROM pilots WHERE combat_record IS NOT NULL")
+    ).fetchall()
+    params = []
+    for row in rows:
+        record = json.loads(row.combat_record)
+        for kill in (record.get("kills") or []) if isinstance(record, dict) else []:
+            tonnage = kill.get("tonnage") or 0
+            params.append(
+                {
+                    "pilot_id": row.id,
+                    "force_id": row.force_id,
+                    "mission": kill.get("mission"),
+                    "date": kill.get("date"),
+                    "mech_model": kill.get("mechModel") or "",
+                    "tonnage": tonnage,
+                    "weight_class": _weight_class(tonnage),
+                }
+            )
+    if params:
+        conn.execute(
+            text(
+                "INSERT INTO pilot_kills (pilot_id, force_id, mission, date, mech_model, tonnage, weight_class) "
+                "VALUES (:pilot_id, :force_id, :mission, :date, :mech_model, :tonnage, :weight_class)"
+            ),
+            params,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pilot_kills_weight_class'), table_name='pilot_kills')
+    op.drop_index(op.f('ix_pilot_kills_pilot_id'), table_name='pilot_kills')
+    op.drop_index(op.f('ix_pilot_kills_mission'), table_name='pilot_kills')
+    op.drop_index(op.f('ix_pilot_kills_force_id'), table_name='pilot_kills')
+    op.drop_index('ix_pilot_kills_force_id_weight_class', table_name='pilot_kills')
+    op.drop_table('pilot_kills')
@@ -0,0 +1,35 @@
+"""unit file states table
+
+Revision ID: c3f9a2d6e418
+Revises: e8a1c4b7f352
+Create Date: 2026-10-19 15:48:12.604231
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a2d6e418'
+down_revision: Union[str, Sequence[str], None] = 'e8a1c4b7f352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('unit_file_states',
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('mtime_ns', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(), nullable=False),
+    sa.Column('scanned_at', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('path')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('unit_file_states')
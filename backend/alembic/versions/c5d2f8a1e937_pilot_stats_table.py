@@ -0,0 +1,98 @@
+"""pilot stats table
+
+Revision ID: c5d2f8a1e937
+Revises: a6c1e9f4b283
+Create Date: 2026-10-19 21:02:44.615290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2f8a1e937'
+down_revision: Union[str, Sequence[str], None] = 'a6c1e9f4b283'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create pilot_stats and backfill one row per existing pilot from
+    pilot_kills, pilot_achievements and the combat record."""
+    op.create_table('pilot_stats',
+    sa.Column('pilot_id', sa.String(), nullable=False),
+    sa.Column('force_id', sa.String(), nullable=False),
+    sa.Column('kills', sa.Integer(), nullable=False),
+    sa.Column('tonnage_destroyed', sa.Integer(), nullable=False),
+    sa.Column('max_tonnage_kill', sa.Integer(), nullable=False),
+    sa.Column('light_kills', sa.Integer(), nullable=False),
+    sa.Column('medium_kills', sa.Integer(), nullable=False),
+    sa.Column('heavy_kills', sa.Integer(), nullable=False),
+    sa.Column('assault_kills', sa.Integer(), nullable=False),
+    sa.Column('missions_completed', sa.Integer(), nullable=False),
+    sa.Column('missions_without_injury', sa.Integer(), nullable=False),
+    sa.Column('achievements', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['force_id'], ['forces.id'], ),
+    sa.ForeignKeyConstraint(['pilot_id'], ['pilots.id'], ),
+    sa.PrimaryKeyConstraint('pilot_id')
+    )
+    op.create_index(op.f('ix_pilot_stats_force_id'), 'pilot_stats', ['force_id'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_kills'), 'pilot_stats', ['kills'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_tonnage_destroyed'), 'pilot_stats', ['tonnage_destroyed'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_max_tonnage_kill'), 'pilot_stats', ['max_tonnage_kill'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_light_kills'), 'pilot_stats', ['light_kills'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_medium_kills'), 'pilot_stats', ['medium_kills'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_heavy_kills'), 'pilot_stats', ['heavy_kills'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_assault_kills'), 'pilot_stats', ['assault_kills'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_missions_completed'), 'pilot_stats', ['missions_completed'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_missions_without_injury'), 'pilot_stats', ['missions_without_injury'], unique=False)
+    op.create_index(op.f('ix_pilot_stats_achievements'), 'pilot_stats', ['achievements'], unique=False)
+
+    op.get_bind().execute(
+        text(
+            """
+            INSERT INTO pilot_stats (
+                pilot_id, force_id, kills, tonnage_destroyed, max_tonnage_kill,
+                light_kills, medium_kills, heavy_kills, assault_kills,
+                missions_completed, missions_without_injury, achievements
+            )
+            SELECT
+                p.id, p.force_id,
+                COALESCE(k.kills, 0), COALESCE(k.tonnage, 0), COALESCE(k.max_tonnage, 0),
+                COALESCE(k.light, 0), COALESCE(k.medium, 0), COALESCE(k.heavy, 0), COALESCE(k.assault, 0),
+                COALESCE(JSON_EXTRACT(p.combat_record, '$.missionsCompleted'), 0),
+                COALESCE(JSON_EXTRACT(p.combat_record, '$.missionsWithoutInjury'), 0),
+                COALESCE(a.count, 0)
+            FROM pilots p
+            LEFT JOIN (
+                SELECT
+                    pilot_id, COUNT(*) AS kills, SUM(tonnage) AS tonnage, MAX(tonnage) AS max_tonnage,
+                    SUM(weight_class = 'light') AS light, SUM(weight_class = 'medium') AS medium,
+                    SUM(weight_class = 'heavy') AS heavy, SUM(weight_class = 'assault') AS assault
+                FROM pilot_kills GROUP BY pilot_id
+            ) k ON k.pilot_id = p.id
+            LEFT JOIN (
+                SELECT pilot_id, COUNT(*) AS count FROM pilot_achievements GROUP BY pilot_id
+            ) a ON a.pilot_id = p.id
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pilot_stats_achievements'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_missions_without_injury'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_missions_completed'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_assault_kills'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_heavy_kills'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_medium_kills'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_light_kills'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_max_tonnage_kill'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_tonnage_destroyed'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_kills'), table_name='pilot_stats')
+    op.drop_index(op.f('ix_pilot_stats_force_id'), table_name='pilot_stats')
+    op.drop_table('pilot_stats')
@@ -0,0 +1,57 @@
+"""mech catalog source
+
+Revision ID: d8e3b1f7a924
+Revises: c5d2f8a1e937
+Create Date: 2026-10-19 22:31:05.217460
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e3b1f7a924'
+down_revision: Union[str, Sequence[str], None] = 'c5d2f8a1e937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The columns unit-file scans wrote (every content column but `bv`).
+UNIT_FILE_COLUMNS = (
+    "mul_id", "chassis", "model", "tonnage", "year", "techbase", "role", "walk", "max_walk",
+    "jump", "max_jump", "heat", "dissipation", "dissipation_efficiency", "components",
+)
+
+
+def _content_hash(values):
+    # domain.catalog_logic.content_hash as of this revision.
+    payload = json.dumps(sorted(values.items()), separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Add mech_catalog.source. Rows a unit-file scan wrote last are the
+    ones whose stored hash covers the unit-file columns only."""
+    op.add_column('mech_catalog', sa.Column('source', sa.String(), nullable=False, server_default='mul'))
+
+    conn = op.get_bind()
+    columns = ", ".join(UNIT_FILE_COLUMNS)
+    rows = conn.execute(
+        text(f"SELECT id, content_hash, {columns} FROM mech_catalog WHERE content_hash IS NOT NULL")
+    ).mappings().all()
+    params = [
+        {"id": row["id"]}
+        for row in rows
+        if row["content_hash"] == _content_hash({c: row[c] for c in UNIT_FILE_COLUMNS})
+    ]
+    if params:
+        conn.execute(text("UPDATE mech_catalog SET source = 'unit_file' WHERE id = :id"), params)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mech_catalog', 'source')
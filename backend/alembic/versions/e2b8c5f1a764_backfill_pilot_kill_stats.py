@@ -0,0 +1,77 @@
+"""backfill pilot kill stats
+
+Revision ID: e2b8c5f1a764
+Revises: b7d4e2a91f60
+Create Date: 2026-10-19 16:41:09.527318
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c5f1a764'
+down_revision: Union[str, Sequence[str], None] = 'b7d4e2a91f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from domain/achievements_logic.py as of this revision, so the
+# backfill doesn't change when the app's version does.
+WEIGHT_CLASSES = {
+    "light": (20, 35),
+    "medium": (40, 55),
+    "heavy": (60, 75),
+    "assault": (80, 100),
+}
+KILL_STAT_KEYS = (
+    "killCount",
+    "lightKills",
+    "mediumKills",
+    "heavyKills",
+    "assaultKills",
+    "totalTonnageDestroyed",
+    "maxTonnageKill",
+)
+
+
+def _with_kill_stats(record):
+    if not record:
+        return record
+    kill_stats = dict.fromkeys(KILL_STAT_KEYS, 0)
+    for kill in record.get("kills") or []:
+        tonnage = kill.get("tonnage") or 0
+        kill_stats["killCount"] += 1
+        kill_stats["totalTonnageDestroyed"] += tonnage
+        if tonnage > kill_stats["maxTonnageKill"]:
+            kill_stats["maxTonnageKill"] = tonnage
+        for name, (lo, hi) in WEIGHT_CLASSES.items():
+            if lo <= tonnage <= hi:
+                kill_stats[f"{name}Kills"] += 1
+                break
+    return {**record, "killStats": kill_stats}
+
+
+def _rewrite_combat_records(transform):
+    conn = op.get_bind()
+    rows = conn.execute(text("SELECT id, combat_record FROM pilots WHERE combat_record IS NOT NULL")).fetchall()
+    params = []
+    for row in rows:
+        record = json.loads(row.combat_record)
+        if isinstance(record, dict):
+            params.append({"id": row.id, "combat_record": json.dumps(transform(record))})
+    if params:
+        conn.execute(text("UPDATE pilots SET combat_record = :combat_record WHERE id = :id"), params)
+
+
+def upgrade() -> None:
+    """Store every pilot's kill-derived stats under combatRecord.killStats,
+    which add_kill keeps up to date from now on."""
+    _rewrite_combat_records(_with_kill_stats)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rewrite_combat_records(lambda record: {k: v for k, v in record.items() if k != "killStats"})
@@ -0,0 +1,39 @@
+"""catalog import history columns
+
+Revision ID: e8a1c4b7f352
+Revises: a4f7d2e9c813
+Create Date: 2026-10-19 15:02:41.538190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a1c4b7f352'
+down_revision: Union[str, Sequence[str], None] = 'a4f7d2e9c813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """catalog_import_jobs becomes the history of every catalog import run
+    (Admin uploads and watched-folder drops); existing rows are uploads."""
+    op.add_column('catalog_import_jobs', sa.Column('source', sa.String(), nullable=False, server_default='admin'))
+    op.add_column('catalog_import_jobs', sa.Column('sha256', sa.String(), nullable=True))
+    op.add_column('catalog_import_jobs', sa.Column('duration_seconds', sa.Float(), nullable=True))
+    op.add_column('catalog_import_jobs', sa.Column('rows_per_second', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_catalog_import_jobs_sha256'), 'catalog_import_jobs', ['sha256'], unique=False)
+    op.create_index(op.f('ix_catalog_import_jobs_created_at'), 'catalog_import_jobs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_catalog_import_jobs_created_at'), table_name='catalog_import_jobs')
+    op.drop_index(op.f('ix_catalog_import_jobs_sha256'), table_name='catalog_import_jobs')
+    op.drop_column('catalog_import_jobs', 'rows_per_second')
+    op.drop_column('catalog_import_jobs', 'duration_seconds')
+    op.drop_column('catalog_import_jobs', 'sha256')
+    op.drop_column('catalog_import_jobs', 'source')
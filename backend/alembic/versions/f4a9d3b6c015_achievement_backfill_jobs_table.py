@@ -0,0 +1,44 @@
+"""achievement backfill jobs table
+
+Revision ID: f4a9d3b6c015
+Revises: e2b8c5f1a764
+Create Date: 2026-10-19 19:37:52.104683
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9d3b6c015'
+down_revision: Union[str, Sequence[str], None] = 'e2b8c5f1a764'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('achievement_backfill_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('achievement_ids', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('total_pilots', sa.Integer(), nullable=False),
+    sa.Column('pilots_processed', sa.Integer(), nullable=False),
+    sa.Column('awarded', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.String(), nullable=False),
+    sa.Column('started_at', sa.String(), nullable=True),
+    sa.Column('finished_at', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_achievement_backfill_jobs_created_at'), 'achievement_backfill_jobs', ['created_at'], unique=False)
+    op.create_index(op.f('ix_achievement_backfill_jobs_status'), 'achievement_backfill_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_achievement_backfill_jobs_status'), table_name='achievement_backfill_jobs')
+    op.drop_index(op.f('ix_achievement_backfill_jobs_created_at'), table_name='achievement_backfill_jobs')
+    op.drop_table('achievement_backfill_jobs')
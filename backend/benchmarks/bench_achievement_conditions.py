@@ -0,0 +1,69 @@
+"""Benchmark: achievement checks at mission completion.
+
+Evaluates `definitions` achievement definitions over `pilots` random combat
+records, once with `check_achievements` (the condition strings go through
+the `check_condition` path) and once with the definitions compiled up front
+into `CompiledAchievements`, as complete_mission now does.
+
+Usage:
+    cd backend && python benchmarks/bench_achievement_conditions.py [definitions] [pilots]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.achievements_logic import CompiledAchievements, check_achievements  # noqa: E402
+
+STATS = [
+    "killCount", "assists", "missionsCompleted", "missionsWithoutInjury", "totalInjuriesHealed",
+    "lightKills", "mediumKills", "heavyKills", "assaultKills", "totalTonnageDestroyed", "maxTonnageKill",
+]
+
+
+def _definitions(count, rng):
+    definitions = []
+    for i in range(count):
+        parts = [
+            f"{rng.choice(STATS)} {rng.choice(['>=', '>', '<=', '<', '==='])} {rng.randint(0, 20)}"
+            for _ in range(rng.randint(1, 3))
+        ]
+        definitions.append({"id": f"a{i}", "name": "", "icon": "", "description": "", "condition": " && ".join(parts)})
+    return definitions
+
+
+def _record(rng):
+    return {
+        "kills": [{"tonnage": rng.choice(range(20, 101, 5))} for _ in range(rng.randint(0, 25))],
+        "assists": rng.randint(0, 10),
+        "missionsCompleted": rng.randint(0, 30),
+        "missionsWithoutInjury": rng.randint(0, 10),
+        "totalInjuriesHealed": rng.randint(0, 6),
+    }
+
+
+def main():
+    definition_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    pilot_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(42)
+    definitions = _definitions(definition_count, rng)
+    records = [_record(rng) for _ in range(pilot_count)]
+    print(f"{definition_count} definitions x {pilot_count} pilots")
+
+    started = time.perf_counter()
+    expected = [check_achievements(record, definitions) for record in records]
+    elapsed = time.perf_counter() - started
+    print(f"  check_achievements       {elapsed * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    compiled = CompiledAchievements(definitions)
+    earned = [compiled.earned_ids(record) for record in records]
+    elapsed = time.perf_counter() - started
+    print(f"  CompiledAchievements     {elapsed * 1000:8.1f} ms  (compile included)")
+    assert earned == expected
+
+
+if __name__ == "__main__":
+    main()
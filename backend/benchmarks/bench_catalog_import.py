@@ -0,0 +1,121 @@
+"""Benchmark: full mech catalog import/re-import.
+
+Times `import_mech_catalog.import_catalog` (chunked INSERT ... ON CONFLICT
+upserts) against a reference per-row implementation (one SELECT + ORM
+mutation per CSV row - how the importers used to work), on a throwaway
+SQLite database and a synthetic MUL-sized CSV.
+
+Usage:
+    cd backend && python benchmarks/bench_catalog_import.py [rows]
+"""
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+_TMP_DIR = tempfile.mkdtemp(prefix="btforce-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP_DIR}/bench.db"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, delete  # noqa: E402
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from import_mech_catalog import import_catalog  # noqa: E402
+from models import MechCatalogEntry, MechCatalogComponent  # noqa: E402
+from domain.catalog_logic import normalize_catalog_row  # noqa: E402
+
+FIELDNAMES = [
+    "chassis", "model", "mul_id", "year", "BV", "tonnage", "techBase", "role", "walk", "maxWalk",
+    "jump", "maxJump", "heat", "dissipation", "dissipationEfficiency", "components",
+]
+
+
+def write_synthetic_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for i in range(rows):
+            tonnage = 20 + (i % 17) * 5
+            writer.writerow(
+                {
+                    "chassis": f"Bench Chassis {i // 8}",
+                    "model": f"BC-{i % 8}X",
+                    # ~2% of MUL rows have no MUL ID; keep that path in the mix.
+                    "mul_id": "" if i % 50 == 0 else str(100000 + i),
+                    "year": str(3025 + i % 125),
+                    "BV": str(500 + i % 2000),
+                    "tonnage": str(tonnage),
+                    "techBase": "Inner Sphere",
+                    "role": "Brawler",
+                    "walk": "4",
+                    "maxWalk": "6",
+                    "jump": str(i % 5),
+                    "maxJump": str(i % 5),
+                    "heat": "30",
+                    "dissipation": "20",
+                    "dissipationEfficiency": "10",
+                    "components": "2xER Medium Laser:LA, 1xPPC:RA, 1xLRM 10:LT, 1xLRM 10 Ammo:LT, "
+                    "1xStandard Armor:Armor, 1xStandard Structure:Structure, 1x Fusion Engine:Engine",
+                }
+            )
+
+
+async def per_row_reference_import(session, csv_path):
+    """The pre-bulk-upsert approach: a SELECT and an ORM update per row."""
+    now = datetime.now(timezone.utc).isoformat()
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            values = normalize_catalog_row(row)
+            if values["mul_id"] is not None:
+                where = MechCatalogEntry.mul_id == values["mul_id"]
+            else:
+                where = (MechCatalogEntry.chassis == values["chassis"]) & (MechCatalogEntry.model == values["model"])
+            existing = (await session.execute(select(MechCatalogEntry).where(where))).scalar_one_or_none()
+            if existing:
+                for key, value in values.items():
+                    setattr(existing, key, value)
+                existing.updated_at = now
+            else:
+                session.add(MechCatalogEntry(**values, updated_at=now))
+
+
+async def reset():
+    async with SessionLocal() as session:
+        await session.execute(delete(MechCatalogComponent))
+        await session.execute(delete(MechCatalogEntry))
+        await session.commit()
+
+
+async def timed(label, fn, csv_path):
+    async with SessionLocal() as session:
+        start = time.perf_counter()
+        async with session.begin():
+            await fn(session, csv_path)
+        elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s")
+    return elapsed
+
+
+async def main(rows):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    csv_path = Path(_TMP_DIR) / "catalog.csv"
+    write_synthetic_csv(csv_path, rows)
+    print(f"{rows} rows, database in {_TMP_DIR}\n")
+
+    await reset()
+    await timed("per-row reference: first import", per_row_reference_import, csv_path)
+    await timed("per-row reference: re-import", per_row_reference_import, csv_path)
+
+    await reset()
+    await timed("bulk upsert: first import", import_catalog, csv_path)
+    await timed("bulk upsert: re-import", import_catalog, csv_path)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000))
@@ -0,0 +1,88 @@
+"""Benchmark: catalog CSV parse stage, sequential vs. process pool.
+
+Times `services.catalog_parse.iter_catalog_batches` alone (no database) on
+a synthetic MUL-style CSV with rich columns, once row by row on the event
+loop thread and then split into byte ranges across 2, 4, ... worker
+processes, to show how the parse stage scales with cores.
+
+Usage:
+    cd backend && python benchmarks/bench_catalog_parse.py [rows] [chunk_bytes]
+"""
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.catalog_parse import iter_catalog_batches  # noqa: E402
+
+FIELDNAMES = [
+    "chassis", "model", "mul_id", "year", "BV", "tonnage", "techBase", "role", "walk", "maxWalk",
+    "jump", "maxJump", "heat", "dissipation", "dissipationEfficiency", "components",
+]
+
+
+def write_synthetic_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow(
+                {
+                    "chassis": f"Bench Chassis {i // 8}",
+                    "model": f"BC-{i % 8}X",
+                    "mul_id": str(100000 + i),
+                    "year": str(3025 + i % 125),
+                    "BV": str(500 + i % 2000),
+                    "tonnage": str(20 + (i % 17) * 5),
+                    "techBase": "Inner Sphere",
+                    "role": "Brawler",
+                    "walk": "4",
+                    "maxWalk": "6",
+                    "jump": str(i % 5),
+                    "maxJump": str(i % 5),
+                    "heat": "30",
+                    "dissipation": "20",
+                    "dissipationEfficiency": "10",
+                    "components": "2xER Medium Laser:LA, 1xPPC:RA, 1xLRM 10:LT, 1xLRM 10 Ammo:LT, "
+                    "1xStandard Armor:Armor, 1xStandard Structure:Structure, 1x Fusion Engine:Engine",
+                }
+            )
+
+
+async def parse(path, workers, chunk_bytes):
+    rows = 0
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        async for batch in iter_catalog_batches(f, 2000, workers=workers, chunk_bytes=chunk_bytes):
+            rows += batch.rows
+    return rows, time.perf_counter() - start
+
+
+async def main(rows, chunk_bytes):
+    path = Path(tempfile.mkdtemp(prefix="btforce-bench-")) / "catalog.csv"
+    write_synthetic_csv(path, rows)
+    size_mb = path.stat().st_size / 1024 / 1024
+    cpus = os.cpu_count() or 1
+    print(f"{rows} rows ({size_mb:.1f} MB), {chunk_bytes} byte chunks, {cpus} CPU(s)\n")
+
+    worker_counts = [1] + [n for n in (2, 4, 8, 16) if n <= max(cpus, 2)]
+    baseline = None
+    for workers in worker_counts:
+        parsed, elapsed = await parse(path, workers, chunk_bytes)
+        baseline = baseline or elapsed
+        label = "sequential" if workers == 1 else f"{workers} workers"
+        print(f"{label:<12} {elapsed:7.3f}s  {parsed / elapsed:10.0f} rows/s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 1024 * 1024,
+        )
+    )
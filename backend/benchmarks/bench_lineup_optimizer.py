@@ -0,0 +1,45 @@
+"""Benchmark: lance builder branch and bound on a synthetic roster.
+
+Times `domain.lineup_optimizer.optimize_lineup` for a few typical budget
+shapes (a BV-capped lance, a tonnage-limited star, a BV + tonnage capped
+company) on a random roster of `units` deployable mechs.
+
+Usage:
+    cd backend && python benchmarks/bench_lineup_optimizer.py [units] [top_k]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.lineup_optimizer import optimize_lineup  # noqa: E402
+
+SCENARIOS = [
+    ("BV-capped lance", {"max_bv": 7000, "max_units": 4}),
+    ("tonnage-limited star", {"max_tonnage": 300, "max_units": 5}),
+    ("BV + tonnage capped company", {"max_bv": 18000, "max_tonnage": 700, "max_units": 12}),
+    ("tonnage only", {"max_tonnage": 400}),
+]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    top_k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rng = random.Random(42)
+    units = [(f"mech-{i}", rng.randint(700, 2800), rng.choice(range(20, 101, 5))) for i in range(size)]
+    print(f"{size} units, top {top_k}")
+    for label, budgets in SCENARIOS:
+        started = time.perf_counter()
+        result = optimize_lineup(units, top_k=top_k, time_limit=10, **budgets)
+        elapsed = time.perf_counter() - started
+        best = result["lineups"][0][1] if result["lineups"] else None
+        print(
+            f"  {label:<30} {elapsed * 1000:8.1f} ms  nodes={result['nodes']:<8} "
+            f"optimal={result['optimal']}  best BV={best}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 """Ported from frontend/src/lib/achievements.js - combat stats & achievement checks."""
+import operator
 import re
+from functools import lru_cache
 
 WEIGHT_CLASSES = {
     "light": (20, 35),
@@ -16,90 +18,158 @@ def get_weight_class(tonnage):
     return None
 
 
-def compute_combat_stats(combat_record):
+# Kill-derived stats, kept up to date under `combatRecord.killStats` by
+# `add_kill` so achievement checks don't walk the whole kill history.
+KILL_STAT_KEYS = (
+    "killCount",
+    "lightKills",
+    "mediumKills",
+    "heavyKills",
+    "assaultKills",
+    "totalTonnageDestroyed",
+    "maxTonnageKill",
+)
+
+
+def _count_kill(kill_stats, kill):
+    tonnage = kill.get("tonnage") or 0
+    kill_stats["killCount"] += 1
+    kill_stats["totalTonnageDestroyed"] += tonnage
+    if tonnage > kill_stats["maxTonnageKill"]:
+        kill_stats["maxTonnageKill"] = tonnage
+    weight_class = get_weight_class(tonnage)
+    if weight_class:
+        kill_stats[f"{weight_class}Kills"] += 1
+
+
+def compute_kill_stats(kills):
+    kill_stats = dict.fromkeys(KILL_STAT_KEYS, 0)
+    for kill in kills or []:
+        _count_kill(kill_stats, kill)
+    return kill_stats
+
+
+def get_kill_stats(combat_record):
+    """The record's maintained `killStats`, or - for records written
+    without them (older rows, the frontend's own `addKill`) - recomputed
+    from the kills. Stats whose count doesn't match the kill list are
+    treated as stale."""
     combat_record = combat_record or {}
     kills = combat_record.get("kills") or []
-    assists = combat_record.get("assists") or 0
-    missions_completed = combat_record.get("missionsCompleted") or 0
-    missions_without_injury = combat_record.get("missionsWithoutInjury") or 0
-    total_injuries_healed = combat_record.get("totalInjuriesHealed") or 0
-
-    light_kills = medium_kills = heavy_kills = assault_kills = 0
-    total_tonnage_destroyed = 0
-    max_tonnage_kill = 0
-
-    for kill in kills:
-        tonnage = kill.get("tonnage") or 0
-        total_tonnage_destroyed += tonnage
-        if tonnage > max_tonnage_kill:
-            max_tonnage_kill = tonnage
-        weight_class = get_weight_class(tonnage)
-        if weight_class == "light":
-            light_kills += 1
-        elif weight_class == "medium":
-            medium_kills += 1
-        elif weight_class == "heavy":
-            heavy_kills += 1
-        elif weight_class == "assault":
-            assault_kills += 1
+    kill_stats = combat_record.get("killStats")
+    if isinstance(kill_stats, dict) and kill_stats.get("killCount") == len(kills):
+        if all(key in kill_stats for key in KILL_STAT_KEYS):
+            return kill_stats
+    return compute_kill_stats(kills)
+
+
+def with_kill_stats(combat_record):
+    """`combat_record` with `killStats` recomputed from its kills, for
+    records that come in from outside (pilot writes, snapshot restores)."""
+    if not combat_record:
+        return combat_record
+    return {**combat_record, "killStats": compute_kill_stats(combat_record.get("kills"))}
 
+
+def compute_combat_stats(combat_record):
+    combat_record = combat_record or {}
+    kill_stats = get_kill_stats(combat_record)
     return {
-        "killCount": len(kills),
-        "assists": assists,
-        "missionsCompleted": missions_completed,
-        "missionsWithoutInjury": missions_without_injury,
-        "totalInjuriesHealed": total_injuries_healed,
-        "lightKills": light_kills,
-        "mediumKills": medium_kills,
-        "heavyKills": heavy_kills,
-        "assaultKills": assault_kills,
-        "totalTonnageDestroyed": total_tonnage_destroyed,
-        "maxTonnageKill": max_tonnage_kill,
+        "killCount": kill_stats["killCount"],
+        "assists": combat_record.get("assists") or 0,
+        "missionsCompleted": combat_record.get("missionsCompleted") or 0,
+        "missionsWithoutInjury": combat_record.get("missionsWithoutInjury") or 0,
+        "totalInjuriesHealed": combat_record.get("totalInjuriesHealed") or 0,
+        "lightKills": kill_stats["lightKills"],
+        "mediumKills": kill_stats["mediumKills"],
+        "heavyKills": kill_stats["heavyKills"],
+        "assaultKills": kill_stats["assaultKills"],
+        "totalTonnageDestroyed": kill_stats["totalTonnageDestroyed"],
+        "maxTonnageKill": kill_stats["maxTonnageKill"],
     }
 
 
 _CONDITION_RE = re.compile(r"^(\w+)\s*(>=|===|>|<|<=)\s*(\d+)$")
 
+_OPERATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "===": operator.eq,
+}
+
+
+def _never(stats):
+    return False
+
+
+def compile_condition(condition):
+    """Parse a condition string once into a predicate over a stats dict.
+    A condition with any malformed part never matches, as before."""
+    clauses = []
+    for part in (condition or "").split("&&"):
+        match = _CONDITION_RE.match(part.strip())
+        if not match:
+            return _never
+        variable, op, value_str = match.groups()
+        clauses.append((variable, _OPERATORS[op], int(value_str)))
+    clauses = tuple(clauses)
+
+    def predicate(stats):
+        try:
+            for variable, compare, target in clauses:
+                if not compare(stats.get(variable, 0) or 0, target):
+                    return False
+            return True
+        except Exception:
+            return False
+
+    return predicate
+
+
+@lru_cache(maxsize=256)
+def _compiled(condition):
+    return compile_condition(condition)
+
 
 def check_condition(condition, stats):
-    try:
-        parts = [p.strip() for p in condition.split("&&")]
-        for part in parts:
-            match = _CONDITION_RE.match(part)
-            if not match:
-                return False
-            variable, operator, value_str = match.groups()
-            stat_value = stats.get(variable, 0) or 0
-            target = int(value_str)
-            if operator == ">=":
-                ok = stat_value >= target
-            elif operator == ">":
-                ok = stat_value > target
-            elif operator == "<=":
-                ok = stat_value <= target
-            elif operator == "<":
-                ok = stat_value < target
-            elif operator == "===":
-                ok = stat_value == target
-            else:
-                ok = False
-            if not ok:
-                return False
-        return True
-    except Exception:
-        return False
+    return _compiled(condition)(stats)
+
+
+def _field(achievement, name):
+    return achievement[name] if isinstance(achievement, dict) else getattr(achievement, name)
+
+
+class CompiledAchievements:
+    """Achievement definitions with their conditions compiled, for checking
+    many combat records against the same set. `definitions_by_id` holds
+    plain dicts (`id`, `name`, `icon`, `description`, `condition`), so an
+    instance can outlive the session that loaded it."""
+
+    def __init__(self, achievement_definitions):
+        self.definitions_by_id = {}
+        self._predicates = []
+        for achievement in achievement_definitions:
+            definition = {
+                name: _field(achievement, name) for name in ("id", "name", "icon", "description", "condition")
+            }
+            self.definitions_by_id[definition["id"]] = definition
+            self._predicates.append((definition["id"], compile_condition(definition["condition"])))
+
+    def earned_ids(self, combat_record):
+        stats = compute_combat_stats(combat_record)
+        return [achievement_id for achievement_id, predicate in self._predicates if predicate(stats)]
 
 
 def check_achievements(combat_record, achievement_definitions):
     """achievement_definitions: list of dicts/objects with 'id' and 'condition'."""
     stats = compute_combat_stats(combat_record)
-    earned = []
-    for achievement in achievement_definitions:
-        condition = achievement["condition"] if isinstance(achievement, dict) else achievement.condition
-        achievement_id = achievement["id"] if isinstance(achievement, dict) else achievement.id
-        if check_condition(condition, stats):
-            earned.append(achievement_id)
-    return earned
+    return [
+        _field(achievement, "id")
+        for achievement in achievement_definitions
+        if check_condition(_field(achievement, "condition"), stats)
+    ]
 
 
 def find_new_achievements(previous_ids, current_ids):
@@ -114,14 +184,17 @@ def create_empty_combat_record():
         "missionsCompleted": 0,
         "missionsWithoutInjury": 0,
         "totalInjuriesHealed": 0,
+        "killStats": compute_kill_stats([]),
     }
 
 
 def add_kill(combat_record, kill):
     record = combat_record or create_empty_combat_record()
+    kill_stats = dict(get_kill_stats(record))
+    _count_kill(kill_stats, kill)
     kills = list(record.get("kills") or [])
     kills.append(kill)
-    return {**record, "kills": kills}
+    return {**record, "kills": kills, "killStats": kill_stats}
 
 
 def add_assists(combat_record, count):
@@ -133,6 +206,7 @@ def record_mission_completion(combat_record, was_injured):
     record = combat_record or create_empty_combat_record()
     return {
         **record,
+        "killStats": get_kill_stats(record),
         "missionsCompleted": (record.get("missionsCompleted") or 0) + 1,
         "missionsWithoutInjury": 0 if was_injured else (record.get("missionsWithoutInjury") or 0) + 1,
     }
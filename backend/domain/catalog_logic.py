@@ -0,0 +1,104 @@
+"""Parsing and change detection for mech catalog CSV rows.
+
+`normalize_catalog_row` maps a MekBay/MUL CSV row to `mech_catalog` column
+values; `parse_catalog_chunk` does that for a whole byte range of a CSV
+file (the process-pool task behind services/catalog_parse.py).
+`content_hash` fingerprints a row's imported column values so a re-import
+can leave rows whose content hasn't changed alone (no write, no
+`updated_at` bump). `catalog_entry_name` is the display name the API
+routes share. Kept free of DB/app imports so worker processes can
+run it.
+"""
+import csv
+import hashlib
+import io
+import json
+
+REQUIRED_HEADERS = {"chassis", "model", "mul_id", "BV", "tonnage"}
+
+
+def validate_header(fieldnames):
+    if not fieldnames:
+        return False
+    return REQUIRED_HEADERS.issubset(set(fieldnames))
+
+
+def parse_int(value):
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def catalog_entry_name(chassis, model):
+    return f"{chassis} {model}" if model else chassis
+
+
+def normalize_catalog_row(row):
+    """Map one MekBay/MUL CSV row (a `csv.DictReader` dict) to
+    `mech_catalog` column values, or None if it has no chassis."""
+    chassis = (row.get("chassis") or "").strip()
+    if not chassis:
+        return None
+    walk = parse_int(row.get("walk")) or 0
+    jump = parse_int(row.get("jump")) or 0
+    return {
+        "mul_id": parse_int(row.get("mul_id")),
+        "chassis": chassis,
+        "model": (row.get("model") or "").strip(),
+        "bv": parse_int(row.get("BV")) or 0,
+        "tonnage": parse_int(row.get("tonnage")) or 0,
+        "year": parse_int(row.get("year")),
+        "techbase": (row.get("techBase") or "").strip() or None,
+        "role": (row.get("role") or "").strip() or None,
+        "walk": walk,
+        "max_walk": parse_int(row.get("maxWalk")) or walk,
+        "jump": jump,
+        "max_jump": parse_int(row.get("maxJump")) or jump,
+        "heat": parse_int(row.get("heat")) or 0,
+        "dissipation": parse_int(row.get("dissipation")) or 0,
+        "dissipation_efficiency": parse_int(row.get("dissipationEfficiency")) or 0,
+        "components": (row.get("components") or "").strip(),
+    }
+
+
+# Column order of the row tuples `parse_catalog_chunk` returns.
+CATALOG_COLUMNS = (
+    "mul_id", "chassis", "model", "bv", "tonnage", "year", "techbase", "role", "walk", "max_walk",
+    "jump", "max_jump", "heat", "dissipation", "dissipation_efficiency", "components",
+)
+
+
+def parse_catalog_chunk(data, fieldnames):
+    """Parse and normalize a chunk of CSV records (UTF-8 bytes that start
+    and end on record boundaries, header excluded). Returns
+    `(row count, skipped count, [row tuples in CATALOG_COLUMNS order])` -
+    tuples rather than dicts keep the result cheap to send back from a
+    worker process."""
+    rows = skipped = 0
+    values_list = []
+    for row in csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=fieldnames):
+        rows += 1
+        values = normalize_catalog_row(row)
+        if values is None:
+            skipped += 1
+            continue
+        values_list.append(tuple(values[column] for column in CATALOG_COLUMNS))
+    return rows, skipped, values_list
+
+
+# Bookkeeping columns that aren't part of a row's content.
+NON_CONTENT_COLUMNS = {"id", "updated_at", "content_hash", "source"}
+
+
+def content_hash(values):
+    """SHA-1 over the row's content columns, as given in `values` (a dict of
+    `mech_catalog` column values)."""
+    items = sorted((key, value) for key, value in values.items() if key not in NON_CONTENT_COLUMNS)
+    payload = json.dumps(items, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,47 @@
+"""Parser for the mech catalog's `components` text blob.
+
+MekBay/MUL exports flatten a unit's equipment into one string:
+
+    "2xER Medium Laser:LA, 1xHeavy PPC:RA, 1x XL Engine:Engine, ..."
+
+`parse_components` turns that into normalized `(item, location, count)`
+tuples for the `mech_catalog_components` table. Kept free of DB/app imports
+so bulk imports can run it inside a process pool.
+"""
+import re
+
+_ENTRY_RE = re.compile(r"^(?:(\d+)\s*x\s*)?(.+?)\s*$", re.IGNORECASE)
+
+# The export repeats its armor/structure/engine summary entries, so for these
+# pseudo-locations a repeated entry is the same item, not a second copy.
+SYSTEM_LOCATIONS = {"Armor", "Structure", "Engine"}
+
+
+def parse_components(text):
+    parsed = {}
+    for raw_entry in (text or "").split(","):
+        raw_entry = raw_entry.strip()
+        if not raw_entry:
+            continue
+        if ":" in raw_entry:
+            raw_entry, location = raw_entry.rsplit(":", 1)
+            location = location.strip()
+        else:
+            location = ""
+        match = _ENTRY_RE.match(raw_entry)
+        if not match or not match.group(2):
+            continue
+        count = int(match.group(1)) if match.group(1) else 1
+        item = match.group(2)
+        key = (item.lower(), location)
+        _, previous = parsed.get(key, (item, 0))
+        if location in SYSTEM_LOCATIONS:
+            parsed[key] = (item, max(previous, count))
+        else:
+            parsed[key] = (item, previous + count)
+    return [(item, location, count) for (_, location), (item, count) in parsed.items()]
+
+
+def parse_components_many(texts):
+    """Batch form of `parse_components`, used as the process-pool task."""
+    return [parse_components(text) for text in texts]
@@ -13,7 +13,12 @@ from database import SessionLocal
 from models import DowntimeAction
 
 
-async def load_downtime_actions():
+async def load_downtime_actions(session=None):
+    """All downtime actions, read through `session` if given - request
+    handlers pass theirs, so a request never holds two pool connections at
+    once (under load that exhausts the pool)."""
+    if session is not None:
+        return (await session.execute(select(DowntimeAction))).scalars().all()
     async with SessionLocal() as session:
         result = await session.execute(select(DowntimeAction))
         return result.scalars().all()
@@ -29,8 +34,8 @@ def _action_to_dict(action):
     }
 
 
-async def get_action(category, action_id):
-    actions = await load_downtime_actions()
+async def get_action(category, action_id, session=None):
+    actions = await load_downtime_actions(session)
     lookup = {a.id: a for a in actions if a.category == category}
     action = lookup.get(action_id)
     return _action_to_dict(action) if action else None
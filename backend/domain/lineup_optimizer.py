@@ -0,0 +1,141 @@
+"""Best lineup under BV / tonnage / unit-count budgets (the lance builder).
+
+`optimize_lineup` picks subsets of units maximising total BV subject to an
+optional BV cap, tonnage limit and min/max unit count - a 0/1 knapsack with
+side constraints, solved by depth-first branch and bound. Units are
+explored in descending BV order, and a partial lineup is only extended
+while an upper bound on what it can still reach beats the K-th best lineup
+found so far. The bound is the smallest of:
+
+- the BV cap;
+- the best `slots` BVs left (prefix sums over the BV-sorted units);
+- the fractional-knapsack (LP) relaxation on the tonnage left, walking the
+  remaining units in BV-per-ton order (precomputed per start position).
+
+Each subset is visited at most once, so the K results are distinct. The
+search stops at `time_limit` seconds and returns the best lineups found so
+far with `optimal` False. Units are `(key, bv, tonnage)` tuples - callers
+pass pilot-adjusted BVs (`build_lineup_tables` in domain/missions_logic.py).
+"""
+import heapq
+import time
+
+TIME_CHECK_INTERVAL = 256
+
+
+class _TimeUp(Exception):
+    pass
+
+
+def _ratio_key(unit):
+    _, bv, tonnage = unit
+    return (-(bv / tonnage) if tonnage > 0 else float("-inf"), -bv)
+
+
+def optimize_lineup(
+    units,
+    max_bv=None,
+    max_tonnage=None,
+    min_units=0,
+    max_units=None,
+    required=(),
+    top_k=5,
+    time_limit=0.5,
+    clock=time.monotonic,
+):
+    """Up to `top_k` best lineups as `{"lineups": [(keys, bv, tonnage)],
+    "optimal": bool, "nodes": int}`, highest BV first (equal BVs lightest
+    first). Units whose key is in `required` are in every lineup; if they
+    alone break a budget there is no lineup at all."""
+    required = set(required)
+    base = [unit for unit in units if unit[0] in required]
+    base_keys = tuple(key for key, _, _ in base)
+    base_bv = sum(bv for _, bv, _ in base)
+    base_tonnage = sum(tonnage for _, _, tonnage in base)
+    result = {"lineups": [], "optimal": True, "nodes": 0}
+    if (
+        (max_bv is not None and base_bv > max_bv)
+        or (max_tonnage is not None and base_tonnage > max_tonnage)
+        or (max_units is not None and len(base) > max_units)
+    ):
+        return result
+
+    free = sorted((unit for unit in units if unit[0] not in required), key=lambda unit: (-unit[1], unit[2]))
+    count = len(free)
+    keys = [key for key, _, _ in free]
+    bvs = [bv for _, bv, _ in free]
+    tonnages = [tonnage for _, _, tonnage in free]
+    # prefix[i]: BV of the i highest-BV free units.
+    prefix = [0]
+    for bv in bvs:
+        prefix.append(prefix[-1] + bv)
+    by_ratio = [sorted(free[i:], key=_ratio_key) for i in range(count + 1)] if max_tonnage is not None else None
+
+    slots_cap = count if max_units is None else max_units - len(base)
+    deadline = clock() + time_limit
+    best = []  # min-heap of (bv, -tonnage, keys)
+    nodes = 0
+
+    def lp_bound(start, tonnage_room):
+        bound = 0
+        for _, bv, tonnage in by_ratio[start]:
+            if tonnage <= tonnage_room:
+                bound += bv
+                tonnage_room -= tonnage
+            else:
+                return bound + bv * tonnage_room / tonnage
+        return bound
+
+    def record(chosen, bv, tonnage):
+        entry = (bv, -tonnage, base_keys + tuple(keys[i] for i in chosen))
+        if len(best) < top_k:
+            heapq.heappush(best, entry)
+        elif entry[:2] > best[0][:2]:
+            heapq.heapreplace(best, entry)
+
+    def search(start, chosen, bv, tonnage):
+        nonlocal nodes
+        nodes += 1
+        if nodes % TIME_CHECK_INTERVAL == 0 and clock() > deadline:
+            raise _TimeUp
+        if len(base) + len(chosen) >= min_units:
+            record(chosen, base_bv + bv, base_tonnage + tonnage)
+        slots = slots_cap - len(chosen)
+        for i in range(start, count):
+            if slots <= 0 or len(base) + len(chosen) + count - i < min_units:
+                return
+            new_bv = bv + bvs[i]
+            new_tonnage = tonnage + tonnages[i]
+            if max_bv is not None and base_bv + new_bv > max_bv:
+                continue
+            if max_tonnage is not None and base_tonnage + new_tonnage > max_tonnage:
+                continue
+            if len(best) == top_k:
+                # Best total reachable through unit i: i itself plus the
+                # best extension among the units after it.
+                bound = base_bv + bv + prefix[min(count, i + slots)] - prefix[i]
+                if bound < best[0][0]:
+                    # Units are in BV order, so no later i does better.
+                    return
+                if max_bv is not None:
+                    bound = min(bound, max_bv)
+                if max_tonnage is not None:
+                    bound = min(
+                        bound, base_bv + new_bv + lp_bound(i + 1, max_tonnage - base_tonnage - new_tonnage)
+                    )
+                if bound < best[0][0]:
+                    continue
+            chosen.append(i)
+            search(i + 1, chosen, new_bv, new_tonnage)
+            chosen.pop()
+
+    try:
+        search(0, [], 0, 0)
+    except _TimeUp:
+        result["optimal"] = False
+    result["nodes"] = nodes
+    result["lineups"] = [
+        (list(lineup_keys), bv, -neg_tonnage)
+        for bv, neg_tonnage, lineup_keys in sorted(best, key=lambda entry: (-entry[0], -entry[1]))
+    ]
+    return result
@@ -53,3 +53,65 @@ def calculate_mission_total_bv(mechs_by_id, pilots_by_id, mech_ids, elementals_b
             elemental_bv += elemental.bv or 0
 
     return mech_bv + elemental_bv
+
+
+def build_lineup_tables(mechs_by_id, pilots_by_id, elementals_by_id):
+    """Per-unit lookup maps for evaluating many lineups of one force:
+    `({mech_id: (available, adjusted_bv, tonnage)}, {elemental_id:
+    (available, bv)})`. Each unit's pilot-adjusted BV and availability is
+    computed once here, so a lineup then only costs one dict lookup per
+    unit."""
+    mech_table = {}
+    for mech_id, mech in mechs_by_id.items():
+        pilot = pilots_by_id.get(mech.pilot_id) if mech.pilot_id else None
+        mech_table[mech_id] = (
+            is_mech_available_for_mission(mech, pilot),
+            get_mech_adjusted_bv(mech, pilot),
+            mech.weight or 0,
+        )
+    elemental_table = {
+        elemental_id: (is_elemental_available_for_mission(elemental), elemental.bv or 0)
+        for elemental_id, elemental in elementals_by_id.items()
+    }
+    return mech_table, elemental_table
+
+
+def evaluate_lineup(mech_table, elemental_table, mech_ids, elemental_ids):
+    """Availability, BV and tonnage of one lineup - the same totals as
+    `calculate_mission_total_bv`/`calculate_mission_total_tonnage`. Unknown
+    ids are reported in `unknownMechs`/`unknownElementals` and make the
+    lineup unavailable."""
+    total_bv = 0
+    total_tonnage = 0
+    unavailable_mechs, unknown_mechs = [], []
+    for mech_id in mech_ids:
+        entry = mech_table.get(mech_id)
+        if entry is None:
+            unknown_mechs.append(mech_id)
+            continue
+        available, bv, tonnage = entry
+        total_bv += bv
+        total_tonnage += tonnage
+        if not available:
+            unavailable_mechs.append(mech_id)
+
+    unavailable_elementals, unknown_elementals = [], []
+    for elemental_id in elemental_ids:
+        entry = elemental_table.get(elemental_id)
+        if entry is None:
+            unknown_elementals.append(elemental_id)
+            continue
+        available, bv = entry
+        total_bv += bv
+        if not available:
+            unavailable_elementals.append(elemental_id)
+
+    return {
+        "available": not (unavailable_mechs or unknown_mechs or unavailable_elementals or unknown_elementals),
+        "totalBv": total_bv,
+        "totalTonnage": total_tonnage,
+        "unavailableMechs": unavailable_mechs,
+        "unavailableElementals": unavailable_elementals,
+        "unknownMechs": unknown_mechs,
+        "unknownElementals": unknown_elementals,
+    }
@@ -0,0 +1,115 @@
+"""Random opposing forces drawn from the mech catalog, balanced on BV.
+
+`OpForPool` holds the catalog once, sorted by BV, and hands out the BV
+array of any filter combination (era, techbase, role, per-unit tonnage,
+OpFor skill) - built on first use and cached, so repeated generation with
+the same filters never rescans the catalog.
+
+`generate_opfor` fills `count` slots one at a time. Each slot draws a
+random unit (bisect on the sorted array) from the band of BVs that still
+lets the remaining slots land the total inside `[low, high]` - given the
+pool's cheapest and dearest unit - narrowed to around an even share of the
+BV left so OpFors don't come out as one monster plus filler. The last slot
+therefore always lands inside the tolerance if any unit fits. Duplicate
+designs are allowed, as on the table. Everything draws from the caller's
+`random.Random`, so a seed reproduces the same OpFors.
+"""
+import bisect
+from collections import OrderedDict
+
+from domain.mechs_logic import get_adjusted_bv
+
+FILTER_CACHE_SIZE = 64
+# How far a slot may stray from an even share of the BV still to spend.
+SHARE_SPREAD = 0.35
+ATTEMPTS_PER_CANDIDATE = 20
+
+
+class OpForPool:
+    def __init__(self, rows):
+        """`rows` have `id`, `mul_id`, `chassis`, `model`, `bv`, `tonnage`,
+        `year`, `techbase` and `role` attributes."""
+        self.entries = sorted((row for row in rows if row.bv and row.bv > 0), key=lambda row: (row.bv, row.id))
+        self._filtered = OrderedDict()
+
+    def filtered(
+        self,
+        min_year=None,
+        max_year=None,
+        techbases=(),
+        roles=(),
+        min_tonnage=None,
+        max_tonnage=None,
+        gunnery=4,
+        piloting=5,
+    ):
+        """`(entries, bvs)` of the units passing the filters, both sorted
+        by their pilot-adjusted BV at `gunnery`/`piloting`. Units without a
+        year only pass when no era is given."""
+        key = (min_year, max_year, tuple(sorted(techbases)), tuple(sorted(roles)))
+        key += (min_tonnage, max_tonnage, gunnery, piloting)
+        if key in self._filtered:
+            self._filtered.move_to_end(key)
+            return self._filtered[key]
+        techbases, roles = set(techbases), set(roles)
+        entries = [
+            entry
+            for entry in self.entries
+            if (min_year is None or (entry.year is not None and entry.year >= min_year))
+            and (max_year is None or (entry.year is not None and entry.year <= max_year))
+            and (not techbases or entry.techbase in techbases)
+            and (not roles or entry.role in roles)
+            and (min_tonnage is None or (entry.tonnage or 0) >= min_tonnage)
+            and (max_tonnage is None or (entry.tonnage or 0) <= max_tonnage)
+        ]
+        # The skill multiplier is the same for every unit, so adjusting
+        # keeps the BV order.
+        result = (entries, [get_adjusted_bv(entry.bv, gunnery, piloting) for entry in entries])
+        self._filtered[key] = result
+        if len(self._filtered) > FILTER_CACHE_SIZE:
+            self._filtered.popitem(last=False)
+        return result
+
+
+def generate_opfor(bvs, count, low, high, rng, tonnages=None, max_tonnage=None):
+    """Indices into `bvs` (sorted ascending) of `count` units whose BVs sum
+    to within `[low, high]`, or None if this draw didn't find one. With
+    `max_tonnage`, `tonnages[i]` must sum to at most that."""
+    if not bvs or count < 1:
+        return None
+    cheapest, dearest = bvs[0], bvs[-1]
+    picks = []
+    total = 0
+    for slot in range(count):
+        left = count - slot - 1
+        band_low = low - total - left * dearest
+        band_high = high - total - left * cheapest
+        share = ((low + high) / 2 - total) / (left + 1)
+        window_low = max(band_low, share * (1 - SHARE_SPREAD))
+        window_high = min(band_high, share * (1 + SHARE_SPREAD))
+        if window_low > window_high:
+            window_low, window_high = band_low, band_high
+        start = bisect.bisect_left(bvs, window_low)
+        end = bisect.bisect_right(bvs, window_high)
+        if start >= end:
+            return None
+        pick = rng.randrange(start, end)
+        picks.append(pick)
+        total += bvs[pick]
+    if max_tonnage is not None and sum(tonnages[i] for i in picks) > max_tonnage:
+        return None
+    return picks
+
+
+def generate_opfors(bvs, count, low, high, rng, candidates, tonnages=None, max_tonnage=None):
+    """Up to `candidates` distinct OpFors (as sorted index lists) from
+    `generate_opfor`, giving up after `ATTEMPTS_PER_CANDIDATE` draws per
+    candidate asked for."""
+    found = {}
+    for _ in range(candidates * ATTEMPTS_PER_CANDIDATE):
+        picks = generate_opfor(bvs, count, low, high, rng, tonnages, max_tonnage)
+        if picks is not None:
+            found.setdefault(tuple(sorted(picks)), None)
+            if len(found) == candidates:
+                break
+    return [list(picks) for picks in found]
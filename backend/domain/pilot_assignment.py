@@ -0,0 +1,180 @@
+"""Optimal pilot-to-mech pairing for a roster.
+
+`adjusted_bv_matrix` builds the mech x pilot matrix of pilot-adjusted BVs
+(`mechs_logic.get_adjusted_bv` for every pair), vectorised with NumPy when
+it is installed and with plain lists otherwise - the values are identical
+(both round half up from the same float products). NumPy is optional: it is
+not in requirements.txt and nothing else depends on it.
+
+`solve_assignment` pairs them up with the Hungarian algorithm (shortest
+augmenting paths with potentials, O(n^3)). The matrix is padded to square
+with "no pilot"/"no mech" dummies, and every real pair carries a large
+bonus so the smaller side is always fully paired - otherwise minimising
+would just leave every mech empty. Objectives:
+
+- `maximize` / `minimize` total adjusted BV: one Hungarian run each;
+- `target`: total BV as close as possible to `target_bv`. That isn't a
+  linear assignment objective: out of range it's the nearer extreme
+  (exact), otherwise both extremes are walked towards the target by
+  pairwise pilot swaps until no swap gets closer, keeping the better end
+  point. A local search: close, but not guaranteed to be the closest
+  pairing.
+"""
+from domain.mechs_logic import get_adjusted_bv, get_bv_multiplier
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+
+OBJECTIVES = ("maximize", "minimize", "target")
+MAX_SWAP_ROUNDS = 1000
+
+
+def _multiplier(gunnery, piloting):
+    # get_adjusted_bv leaves the BV unscaled for a pilot without skills.
+    if gunnery is None or piloting is None:
+        return 1.0
+    return get_bv_multiplier(gunnery, piloting)
+
+
+def adjusted_bv_matrix(mech_bvs, pilot_skills):
+    """`matrix[i][j]`: BV of mech `i` (base BV `mech_bvs[i]`) piloted by
+    pilot `j` (`pilot_skills[j] = (gunnery, piloting)`)."""
+    if np is None or not mech_bvs or not pilot_skills:
+        return [[get_adjusted_bv(bv, gunnery, piloting) for gunnery, piloting in pilot_skills] for bv in mech_bvs]
+    bvs = np.array([bv or 0 for bv in mech_bvs], dtype=np.float64)
+    multipliers = np.array([_multiplier(g, p) for g, p in pilot_skills], dtype=np.float64)
+    matrix = np.floor(np.outer(bvs, multipliers) + 0.5).astype(np.int64)
+    return matrix.tolist()
+
+
+def hungarian(cost):
+    """Minimum-cost perfect matching of a square cost matrix. Returns
+    `assignment` with `assignment[row] = column`."""
+    size = len(cost)
+    inf = float("inf")
+    u = [0] * (size + 1)
+    v = [0] * (size + 1)
+    # match[column] = row (1-based; 0 = free).
+    match = [0] * (size + 1)
+    way = [0] * (size + 1)
+    for row in range(1, size + 1):
+        match[0] = row
+        column = 0
+        min_to = [inf] * (size + 1)
+        used = [False] * (size + 1)
+        while True:
+            used[column] = True
+            current = match[column]
+            delta, next_column = inf, 0
+            row_cost = cost[current - 1]
+            u_current = u[current]
+            for j in range(1, size + 1):
+                if not used[j]:
+                    reduced = row_cost[j - 1] - u_current - v[j]
+                    if reduced < min_to[j]:
+                        min_to[j] = reduced
+                        way[j] = column
+                    if min_to[j] < delta:
+                        delta, next_column = min_to[j], j
+            for j in range(size + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_to[j] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+    assignment = [0] * size
+    for column in range(1, size + 1):
+        if match[column]:
+            assignment[match[column] - 1] = column - 1
+    return assignment
+
+
+def _square_values(matrix, rows, columns):
+    size = max(rows, columns)
+    return [[matrix[i][j] if i < rows and j < columns else None for j in range(size)] for i in range(size)]
+
+
+def _extreme(values, sign):
+    """Hungarian for `sign` 1 (maximize) or -1 (minimize), pairing as many
+    real mech/pilot pairs as possible."""
+    bonus = sum(abs(value) for row in values for value in row if value is not None) + 1
+    cost = [[0 if value is None else -sign * value - bonus for value in row] for row in values]
+    return hungarian(cost)
+
+
+def _total(values, assignment):
+    return sum(values[i][j] or 0 for i, j in enumerate(assignment))
+
+
+def _swap_towards(values, assignment, target_bv):
+    """Pairwise swaps of assigned columns, best improvement first, until no
+    swap brings the total closer to `target_bv`."""
+    assignment = list(assignment)
+    total = _total(values, assignment)
+    size = len(assignment)
+    for _ in range(MAX_SWAP_ROUNDS):
+        gap = abs(total - target_bv)
+        best_gap, best_swap = gap, None
+        for a in range(size):
+            col_a = assignment[a]
+            current_a = values[a][col_a] or 0
+            for b in range(a + 1, size):
+                col_b = assignment[b]
+                delta = (
+                    (values[a][col_b] or 0) + (values[b][col_a] or 0) - current_a - (values[b][col_b] or 0)
+                )
+                candidate_gap = abs(total + delta - target_bv)
+                if candidate_gap < best_gap:
+                    best_gap, best_swap = candidate_gap, (a, b, delta)
+        if best_swap is None:
+            break
+        a, b, delta = best_swap
+        assignment[a], assignment[b] = assignment[b], assignment[a]
+        total += delta
+        if best_gap == 0:
+            break
+    return assignment
+
+
+def solve_assignment(matrix, objective="maximize", target_bv=None):
+    """Pair mechs (rows) with pilots (columns) of `matrix`. Returns
+    `(pairs, total)`: `pairs` is a list of `(mech index, pilot index)`,
+    one per real pair - every mech if there are enough pilots, every pilot
+    otherwise - and `total` their summed BV."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}")
+    rows = len(matrix)
+    columns = len(matrix[0]) if rows else 0
+    if not rows or not columns:
+        return [], 0
+    values = _square_values(matrix, rows, columns)
+    if objective == "maximize":
+        assignment = _extreme(values, 1)
+    elif objective == "minimize":
+        assignment = _extreme(values, -1)
+    else:
+        if target_bv is None:
+            raise ValueError("A target BV is required for the target objective")
+        highest = _extreme(values, 1)
+        lowest = _extreme(values, -1)
+        high_total, low_total = _total(values, highest), _total(values, lowest)
+        if target_bv >= high_total:
+            assignment = highest
+        elif target_bv <= low_total:
+            assignment = lowest
+        else:
+            assignment = min(
+                (_swap_towards(values, start, target_bv) for start in (highest, lowest)),
+                key=lambda candidate: abs(_total(values, candidate) - target_bv),
+            )
+    pairs = [(i, j) for i, j in enumerate(assignment) if i < rows and j < columns]
+    return pairs, sum(matrix[i][j] for i, j in pairs)
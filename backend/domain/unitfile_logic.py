@@ -0,0 +1,281 @@
+"""Parsers for MegaMek unit files (`.mtf` mechs, `.blk` everything else).
+
+`parse_mtf`/`parse_blk` map a unit file's text to `mech_catalog` column
+values (`UNIT_FILE_COLUMNS` - every imported CSV column except `bv`, which
+unit files don't carry: MegaMek computes it), or None for a file without a
+chassis. `components` is built in the MUL export's format
+("2xMedium Laser:LA, 1xXL Engine:Engine, ...") from the weapon list plus
+engine/armor/structure, so domain/components_logic.py indexes it the same
+way. `heat` is the summed heat of the weapons found in `WEAPON_HEAT`
+(unknown weapons count as 0), `dissipation` comes from the heat sinks.
+
+`read_unit_files` is the process-pool task behind
+services/unitfile_import.py.
+"""
+import hashlib
+import re
+from collections import Counter
+
+from domain.catalog_logic import CATALOG_COLUMNS, parse_int
+
+UNIT_FILE_COLUMNS = tuple(column for column in CATALOG_COLUMNS if column != "bv")
+
+MTF_LOCATIONS = {
+    "head": "HD",
+    "center torso": "CT",
+    "left torso": "LT",
+    "right torso": "RT",
+    "left arm": "LA",
+    "right arm": "RA",
+    "left leg": "LL",
+    "right leg": "RL",
+    "center leg": "CL",
+    "front left leg": "FLL",
+    "front right leg": "FRL",
+    "rear left leg": "RLL",
+    "rear right leg": "RRL",
+}
+
+# Heat per shot, keyed by `_weapon_key`. Inner Sphere values; Clan
+# variants mostly match.
+WEAPON_HEAT = {
+    "smalllaser": 1, "mediumlaser": 3, "largelaser": 8,
+    "ersmalllaser": 2, "ermediumlaser": 5, "erlargelaser": 12,
+    "smallpulselaser": 2, "mediumpulselaser": 4, "largepulselaser": 10,
+    "ermicrolaser": 1, "microlaser": 1, "micropulselaser": 1,
+    "ppc": 10, "erppc": 15, "lightppc": 5, "heavyppc": 15, "snubnoseppc": 10,
+    "flamer": 3, "erflamer": 4, "machinegun": 0, "lightmachinegun": 0, "heavymachinegun": 0,
+    "ac2": 1, "ac5": 1, "ac10": 3, "ac20": 7,
+    "autocannon2": 1, "autocannon5": 1, "autocannon10": 3, "autocannon20": 7,
+    "ultraac2": 1, "ultraac5": 1, "ultraac10": 4, "ultraac20": 8,
+    "uac2": 1, "uac5": 1, "uac10": 4, "uac20": 8,
+    "lb2xac": 1, "lb5xac": 1, "lb10xac": 2, "lb20xac": 6,
+    "lbxac2": 1, "lbxac5": 1, "lbxac10": 2, "lbxac20": 6,
+    "rotaryac2": 1, "rotaryac5": 1, "rac2": 1, "rac5": 1,
+    "lrm5": 2, "lrm10": 4, "lrm15": 5, "lrm20": 6,
+    "srm2": 2, "srm4": 3, "srm6": 4,
+    "streaksrm2": 2, "streaksrm4": 3, "streaksrm6": 4,
+    "mrm10": 4, "mrm20": 6, "mrm30": 10, "mrm40": 12,
+    "atm3": 2, "atm6": 4, "atm9": 6, "atm12": 8,
+    "gaussrifle": 1, "lightgaussrifle": 1, "heavygaussrifle": 2,
+}
+
+_INTERNAL_PREFIX_RE = re.compile(r"^(?:IS|CL|Clan\s*)(?=[A-Z])")
+# Word boundaries inside an internal name: "mL" in "MediumLaser", "RM" in
+# "ERMedium", "M2" in "LRM20".
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=\d)")
+_REAR_RE = re.compile(r"\s*\((?:R|Rear)\)\s*$", re.IGNORECASE)
+_BLK_TAG_RE = re.compile(r"^<([^/>][^>]*)>$")
+
+
+def _display_name(name):
+    """MegaMek internal names ("ISERMediumLaser") lose their tech prefix
+    and get spaced out ("ER Medium Laser"); everything else is kept as
+    written."""
+    name = _REAR_RE.sub("", name.strip())
+    if " " not in name:
+        name = _INTERNAL_PREFIX_RE.sub("", name)
+        name = _CAMEL_RE.sub(" ", name)
+    return name
+
+
+def _weapon_key(name):
+    return re.sub(r"[^a-z0-9]", "", _display_name(name).lower())
+
+
+def weapon_heat(name):
+    return WEAPON_HEAT.get(_weapon_key(name), 0)
+
+
+def _techbase(text):
+    text = (text or "").strip().lower()
+    if not text:
+        return None
+    if text.startswith("mixed"):
+        return "Mixed"
+    if text.startswith("clan"):
+        return "Clan"
+    return "Inner Sphere"
+
+
+def _dissipation(count, kind):
+    kind = (kind or "").lower()
+    return count * (2 if "double" in kind or "laser" in kind else 1)
+
+
+def _system_name(text, suffix):
+    """"300 XL Engine(IS)" -> "XL Engine"; "Ferro-Fibrous(Inner Sphere)"
+    -> "Ferro-Fibrous Armor"; "IS Endo Steel" -> "Endo Steel Structure"."""
+    text = re.sub(r"\(.*?\)", "", text or "")
+    text = re.sub(r"^\s*\d+\s*", "", text)
+    text = re.sub(r"^(?:IS|Clan)\s+", "", text.strip())
+    if not text:
+        return None
+    return text if text.lower().endswith(suffix.lower()) else f"{text} {suffix}"
+
+
+def _components_text(weapons, systems):
+    """`weapons` is a Counter of `(item, location)`; `systems` a list of
+    `(item, location)` pairs."""
+    entries = [f"{count}x{item}:{location}" for (item, location), count in weapons.items()]
+    entries.extend(f"1x{item}:{location}" for item, location in systems if item)
+    return ", ".join(entries)
+
+
+def _catalog_values(chassis, model, weapons, systems, **fields):
+    walk = fields.get("walk") or 0
+    jump = fields.get("jump") or 0
+    heat = sum(weapon_heat(item) * count for (item, _), count in weapons.items())
+    dissipation = fields.get("dissipation") or 0
+    return {
+        "mul_id": fields.get("mul_id"),
+        "chassis": chassis,
+        "model": model,
+        "tonnage": fields.get("tonnage") or 0,
+        "year": fields.get("year"),
+        "techbase": fields.get("techbase"),
+        "role": fields.get("role") or None,
+        "walk": walk,
+        "max_walk": walk,
+        "jump": jump,
+        "max_jump": jump,
+        "heat": heat,
+        "dissipation": dissipation,
+        "dissipation_efficiency": dissipation - heat,
+        "components": _components_text(weapons, systems),
+    }
+
+
+def parse_mtf(text):
+    """`mech_catalog` values for a MegaMek `.mtf` mech file, or None."""
+    fields = {}
+    weapons = Counter()
+    lines = iter(text.splitlines())
+    for line in lines:
+        line = line.strip()
+        if ":" not in line:
+            continue
+        key, _, value = line.partition(":")
+        key = key.strip().lower()
+        value = value.strip()
+        if key == "weapons":
+            for _ in range(parse_int(value) or 0):
+                entry = next(lines, "").strip()
+                item, _, location = entry.partition(",")
+                location = location.split(",")[0].strip()
+                if item.strip():
+                    weapons[(_display_name(item), MTF_LOCATIONS.get(location.lower(), location))] += 1
+        elif key not in fields:
+            fields[key] = value
+
+    chassis = fields.get("chassis", "")
+    if not chassis:
+        return None
+    heat_sinks = fields.get("heat sinks", "")
+    sink_count = parse_int(heat_sinks.split()[0]) if heat_sinks.split() else 0
+    systems = [
+        (_system_name(fields.get("engine"), "Engine"), "Engine"),
+        (_system_name(fields.get("armor"), "Armor"), "Armor"),
+        (_system_name(fields.get("structure"), "Structure"), "Structure"),
+    ]
+    return _catalog_values(
+        chassis,
+        fields.get("model", ""),
+        weapons,
+        systems,
+        mul_id=parse_int(fields.get("mul id")),
+        tonnage=parse_int(fields.get("mass")),
+        year=parse_int(fields.get("era")) or parse_int(fields.get("year")),
+        techbase=_techbase(fields.get("techbase")),
+        role=fields.get("role"),
+        walk=parse_int(fields.get("walk mp")),
+        jump=parse_int(fields.get("jump mp")),
+        dissipation=_dissipation(sink_count or 0, heat_sinks),
+    )
+
+
+def _blk_blocks(text):
+    """`{tag: [lines]}` for a `.blk` file's `<Tag>...</Tag>` blocks."""
+    blocks = {}
+    tag = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if tag is not None and line == f"</{tag}>":
+            tag = None
+            continue
+        match = _BLK_TAG_RE.match(line)
+        if tag is None and match:
+            tag = match.group(1)
+            blocks[tag] = []
+        elif tag is not None:
+            blocks[tag].append(line)
+    return blocks
+
+
+def parse_blk(text):
+    """`mech_catalog` values for a MegaMek `.blk` unit file (vehicles,
+    battle armor, ...), or None."""
+    blocks = _blk_blocks(text)
+
+    def first(tag):
+        lines = blocks.get(tag) or []
+        return lines[0] if lines else None
+
+    chassis = (first("Name") or "").strip()
+    if not chassis:
+        return None
+    weapons = Counter()
+    for tag, lines in blocks.items():
+        if tag.endswith(" Equipment"):
+            location = tag[:-len(" Equipment")]
+            for item in lines:
+                item = item.split(":")[0]
+                if item.strip() and "ammo" not in item.lower():
+                    weapons[(_display_name(item), location)] += 1
+    sink_type = parse_int(first("sink_type"))
+    return _catalog_values(
+        chassis,
+        (first("Model") or "").strip(),
+        weapons,
+        [],
+        mul_id=parse_int(first("mul id:")),
+        tonnage=parse_int(first("tonnage")),
+        year=parse_int(first("year")),
+        techbase=_techbase(first("type")),
+        role=first("role"),
+        walk=parse_int(first("cruiseMP")),
+        jump=parse_int(first("jumpingMP")),
+        dissipation=_dissipation(parse_int(first("heatsinks")) or 0, "double" if sink_type else "single"),
+    )
+
+
+def parse_unit_file(name, data):
+    """Parse a unit file's bytes by its extension; None if it has no
+    chassis or isn't a unit file."""
+    text = data.decode("utf-8", errors="replace")
+    suffix = name.lower().rsplit(".", 1)[-1]
+    if suffix == "mtf":
+        return parse_mtf(text)
+    if suffix == "blk":
+        return parse_blk(text)
+    return None
+
+
+def read_unit_files(paths):
+    """Read, hash and parse unit files. Returns one `(sha256, values,
+    error)` tuple per path, `values` as a tuple in `UNIT_FILE_COLUMNS`
+    order (or None) - cheap to send back from a worker process."""
+    results = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            values = parse_unit_file(str(path), data)
+        except Exception as exc:
+            results.append((None, None, str(exc)))
+            continue
+        row = tuple(values[column] for column in UNIT_FILE_COLUMNS) if values else None
+        results.append((hashlib.sha256(data).hexdigest(), row, None if values else "No chassis found"))
+    return results
@@ -0,0 +1,48 @@
+"""Operational tool for importing a MegaMek unit-file tree (.mtf/.blk) into
+the mech_catalog table - e.g. MegaMek's data/mekfiles folder - alongside
+the MUL CSV importers.
+
+Only files that changed since the last scan (size/mtime, then SHA-256) are
+parsed - in a process pool when MEK_CATALOG_PARSE_WORKERS > 1, in-process
+otherwise - and upserted through the same bulk upsert as the CSV import
+(services/unitfile_import.py). Rows from the MUL export are left alone,
+and BV isn't in unit files, so rows a scan wrote earlier keep theirs.
+
+Usage:
+    cd backend && python import_unit_files.py /path/to/megamek/data/mekfiles
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import SessionLocal, engine
+from services.unitfile_import import scan_unit_directory
+
+
+async def main(root):
+    try:
+        async with SessionLocal() as session:
+            summary = await scan_unit_directory(session, root, commit=True)
+    except NotADirectoryError as exc:
+        print(f"Unit file import failed: {exc}")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+    for error in summary["errors"]:
+        print(f"  skipped {error['path']}: {error['error']}", file=sys.stderr)
+    print(
+        f"Unit file import done. {summary['files']} files: {summary['parsedFiles']} parsed, "
+        f"{summary['unchangedFiles']} unchanged, {summary['removedFiles']} gone since the last scan. "
+        f"Created {summary['created']}, updated {summary['updated']}, unchanged {summary['unchanged']}."
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python import_unit_files.py <unit-file-directory>")
+        sys.exit(1)
+    asyncio.run(main(Path(sys.argv[1])))
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy import String, Integer, Boolean, Float, Text, JSON, LargeBinary, ForeignKey
+from sqlalchemy import String, Integer, Boolean, Float, Text, JSON, LargeBinary, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from database import Base
@@ -158,6 +158,48 @@ class PilotAchievement(Base):
     earned_at: Mapped[str] = mapped_column(String, nullable=True)
 
 
+class PilotKill(Base):
+    """One kill from a pilot's combat record, mirrored out of
+    `Pilot.combat_record["kills"]` (which stays the API contract) so kills
+    can be queried across pilots and forces. See services/pilot_kills.py."""
+
+    __tablename__ = "pilot_kills"
+    __table_args__ = (Index("ix_pilot_kills_force_id_weight_class", "force_id", "weight_class"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    pilot_id: Mapped[str] = mapped_column(String, ForeignKey("pilots.id"), index=True)
+    force_id: Mapped[str] = mapped_column(String, ForeignKey("forces.id"), index=True)
+    # The mission's name, as recorded on the kill.
+    mission: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    date: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    mech_model: Mapped[str] = mapped_column(String, default="")
+    tonnage: Mapped[int] = mapped_column(Integer, default=0)
+    # light | medium | heavy | assault, NULL outside the classes
+    weight_class: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+
+
+class PilotStats(Base):
+    """Per-pilot leaderboard rollup: kill totals from `pilot_kills`, mission
+    counters from the combat record and the number of achievements, kept up
+    to date on every write touching them. Every stat is indexed so a
+    leaderboard page is an index walk. See services/pilot_stats.py."""
+
+    __tablename__ = "pilot_stats"
+
+    pilot_id: Mapped[str] = mapped_column(String, ForeignKey("pilots.id"), primary_key=True)
+    force_id: Mapped[str] = mapped_column(String, ForeignKey("forces.id"), index=True)
+    kills: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    tonnage_destroyed: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    max_tonnage_kill: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    light_kills: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    medium_kills: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    heavy_kills: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    assault_kills: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    missions_completed: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    missions_without_injury: Mapped[int] = mapped_column(Integer, default=0, index=True)
+    achievements: Mapped[int] = mapped_column(Integer, default=0, index=True)
+
+
 class SpChoice(Base):
     __tablename__ = "sp_choices"
 
@@ -206,6 +248,17 @@ class DowntimeAction(Base):
 
 class MechCatalogEntry(Base):
     __tablename__ = "mech_catalog"
+    # Conflict target for bulk upserts of rows that have no MUL ID (see
+    # services/catalog_import.py).
+    __table_args__ = (
+        Index(
+            "uq_mech_catalog_chassis_model_without_mul_id",
+            "chassis",
+            "model",
+            unique=True,
+            sqlite_where=text("mul_id IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     mul_id: Mapped[int] = mapped_column(Integer, unique=True, nullable=True, index=True)
@@ -224,4 +277,110 @@ class MechCatalogEntry(Base):
     dissipation: Mapped[int] = mapped_column(Integer, default=0)
     dissipation_efficiency: Mapped[int] = mapped_column(Integer, default=0)
     components: Mapped[str] = mapped_column(Text, default="")
+    # domain.catalog_logic.content_hash of the imported columns; re-imports
+    # skip rows whose hash is unchanged.
+    content_hash: Mapped[str] = mapped_column(String, nullable=True)
+    # Which importer wrote the row: "mul" (CSV/NDJSON exports) or
+    # "unit_file". Unit files never overwrite a "mul" row.
+    source: Mapped[str] = mapped_column(String, default="mul", server_default="mul")
     updated_at: Mapped[str] = mapped_column(String, default="")
+
+
+class MechCatalogComponent(Base):
+    """One normalized line of a catalog entry's `components` text (e.g.
+    `2xER Medium Laser:LA` -> item "ER Medium Laser", location "LA", count
+    2), rebuilt by the catalog importers - see services/catalog_components.py.
+    `item` compares case-insensitively so equipment queries can use the
+    index."""
+
+    __tablename__ = "mech_catalog_components"
+    __table_args__ = (Index("ix_mech_catalog_components_item_catalog_id", "item", "catalog_id"),)
+
+    catalog_id: Mapped[int] = mapped_column(Integer, ForeignKey("mech_catalog.id"), primary_key=True)
+    item: Mapped[str] = mapped_column(String(collation="NOCASE"), primary_key=True)
+    location: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    count: Mapped[int] = mapped_column(Integer, default=1)
+
+
+class CatalogImportJob(Base):
+    """One mech catalog import run - a background Admin upload job or a
+    watched-folder drop - see services/catalog_jobs.py. Kept after
+    completion as the persisted import history."""
+
+    __tablename__ = "catalog_import_jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    filename: Mapped[str] = mapped_column(String, default="")
+    # admin | watcher
+    source: Mapped[str] = mapped_column(String, default="admin", server_default="admin")
+    # queued | running | succeeded | failed | cancelled | interrupted, plus
+    # duplicate for a drop skipped because its checksum was already imported
+    status: Mapped[str] = mapped_column(String, default="queued", index=True)
+    sha256: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    dry_run: Mapped[bool] = mapped_column(Boolean, default=False)
+    total_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    bytes_read: Mapped[int] = mapped_column(Integer, default=0)
+    rows: Mapped[int] = mapped_column(Integer, default=0)
+    created: Mapped[int] = mapped_column(Integer, default=0)
+    updated: Mapped[int] = mapped_column(Integer, default=0)
+    unchanged: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
+    diff: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[str] = mapped_column(String, default="", index=True)
+    started_at: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    finished_at: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    duration_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    rows_per_second: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class UnitFileState(Base):
+    """Last-seen state of a MegaMek unit file (.mtf/.blk) imported into the
+    catalog, so re-scans of the unit-file tree skip files whose size/mtime
+    - or failing that, content hash - haven't changed. See
+    services/unitfile_import.py."""
+
+    __tablename__ = "unit_file_states"
+
+    path: Mapped[str] = mapped_column(String, primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, default=0)
+    mtime_ns: Mapped[int] = mapped_column(Integer, default=0)
+    sha256: Mapped[str] = mapped_column(String, default="")
+    scanned_at: Mapped[str] = mapped_column(String, default="")
+
+
+class IdempotencyKey(Base):
+    """A client `Idempotency-Key` seen on a write endpoint and the response
+    it produced, replayed for retries within the TTL. See
+    services/idempotency.py."""
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String, default="")
+    # Both stay NULL between the write committing and the response being
+    # stored.
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[str] = mapped_column(String, default="", index=True)
+
+
+class AchievementBackfillJob(Base):
+    """One run re-evaluating achievement definitions against every pilot's
+    combat record, started when definitions change. See
+    services/achievement_backfill.py."""
+
+    __tablename__ = "achievement_backfill_jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    # NULL: every definition.
+    achievement_ids: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
+    # queued | running | succeeded | failed | interrupted
+    status: Mapped[str] = mapped_column(String, default="queued", index=True)
+    total_pilots: Mapped[int] = mapped_column(Integer, default=0)
+    pilots_processed: Mapped[int] = mapped_column(Integer, default=0)
+    awarded: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[str] = mapped_column(String, default="", index=True)
+    started_at: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    finished_at: Mapped[Optional[str]] = mapped_column(String, nullable=True)
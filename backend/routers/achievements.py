@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_session
 from models import Pilot, AchievementDefinition, PilotAchievement
+from services import pilot_stats
 
 router = APIRouter(prefix="/api")
 
@@ -78,6 +79,7 @@ async def add_pilot_achievement(
 
     link = PilotAchievement(pilot_id=pilot_id, achievement_id=payload.achievementId, earned_at=payload.earnedAt)
     session.add(link)
+    await pilot_stats.refresh(session, [pilot_id])
     await session.commit()
     await session.refresh(link)
     return pilot_achievement_to_dict(link, definition)
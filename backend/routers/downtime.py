@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +10,8 @@ from models import Force, Mech, Elemental, Pilot, PilotAchievement
 from serializers import mech_to_dict, elemental_to_dict, pilot_to_dict
 from domain.downtime_logic import get_action, evaluate_downtime_cost
 from domain.achievements_logic import record_injuries_healed
+from services import idempotency
+from services.warchest import adjust_warchest
 
 router = APIRouter(prefix="/api")
 
@@ -21,14 +23,22 @@ class DowntimeActionIn(BaseModel):
 
 @router.post("/mechs/{mech_id}/downtime")
 async def apply_mech_downtime(
-    mech_id: str, payload: DowntimeActionIn, session: AsyncSession = Depends(get_session)
+    mech_id: str,
+    payload: DowntimeActionIn,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_session),
 ):
+    replay = await idempotency.begin(session, idempotency_key, request, payload)
+    if replay is not None:
+        return replay
+
     mech = await session.get(Mech, mech_id)
     if not mech:
         raise HTTPException(status_code=404, detail="Mech not found")
     force = await session.get(Force, mech.force_id)
 
-    action = await get_action("mechActions", payload.actionId)
+    action = await get_action("mechActions", payload.actionId, session)
     if not action:
         raise HTTPException(status_code=404, detail="Unknown mech downtime action")
 
@@ -47,22 +57,32 @@ async def apply_mech_downtime(
     if action.get("makesUnavailable"):
         mech.status = "Repairing" if action["id"] == "repair-structure" else "Unavailable"
 
-    force.current_warchest = force.current_warchest - cost
-    await session.commit()
+    await adjust_warchest(session, force, -cost)
 
-    return {"mech": mech_to_dict(mech), "currentWarchest": force.current_warchest, "cost": cost}
+    body = {"mech": mech_to_dict(mech), "currentWarchest": force.current_warchest, "cost": cost}
+    await idempotency.record(session, idempotency_key, 200, body)
+    await session.commit()
+    return body
 
 
 @router.post("/elementals/{elemental_id}/downtime")
 async def apply_elemental_downtime(
-    elemental_id: str, payload: DowntimeActionIn, session: AsyncSession = Depends(get_session)
+    elemental_id: str,
+    payload: DowntimeActionIn,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_session),
 ):
+    replay = await idempotency.begin(session, idempotency_key, request, payload)
+    if replay is not None:
+        return replay
+
     elemental = await session.get(Elemental, elemental_id)
     if not elemental:
         raise HTTPException(status_code=404, detail="Elemental not found")
     force = await session.get(Force, elemental.force_id)
 
-    action = await get_action("elementalActions", payload.actionId)
+    action = await get_action("elementalActions", payload.actionId, session)
     if not action:
         raise HTTPException(status_code=404, detail="Unknown elemental downtime action")
 
@@ -89,22 +109,32 @@ async def apply_elemental_downtime(
         elemental.suits_destroyed = 0
         elemental.status = "Repairing"
 
-    force.current_warchest = force.current_warchest - cost
-    await session.commit()
+    await adjust_warchest(session, force, -cost)
 
-    return {"elemental": elemental_to_dict(elemental), "currentWarchest": force.current_warchest, "cost": cost}
+    body = {"elemental": elemental_to_dict(elemental), "currentWarchest": force.current_warchest, "cost": cost}
+    await idempotency.record(session, idempotency_key, 200, body)
+    await session.commit()
+    return body
 
 
 @router.post("/pilots/{pilot_id}/downtime")
 async def apply_pilot_downtime(
-    pilot_id: str, payload: DowntimeActionIn, session: AsyncSession = Depends(get_session)
+    pilot_id: str,
+    payload: DowntimeActionIn,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_session),
 ):
+    replay = await idempotency.begin(session, idempotency_key, request, payload)
+    if replay is not None:
+        return replay
+
     pilot = await session.get(Pilot, pilot_id)
     if not pilot:
         raise HTTPException(status_code=404, detail="Pilot not found")
     force = await session.get(Force, pilot.force_id)
 
-    action = await get_action("pilotActions", payload.actionId)
+    action = await get_action("pilotActions", payload.actionId, session)
     if not action:
         raise HTTPException(status_code=404, detail="Unknown pilot downtime action")
 
@@ -136,14 +166,16 @@ async def apply_pilot_downtime(
             pilot.combat_record = record_injuries_healed(pilot.combat_record, injuries_to_heal)
         pilot.injuries = 0
 
-    force.current_warchest = force.current_warchest - cost
-    await session.commit()
+    await adjust_warchest(session, force, -cost)
 
     links = (
         await session.execute(select(PilotAchievement).where(PilotAchievement.pilot_id == pilot_id))
     ).scalars().all()
-    return {
+    body = {
         "pilot": pilot_to_dict(pilot, [l.achievement_id for l in links]),
         "currentWarchest": force.current_warchest,
         "cost": cost,
     }
+    await idempotency.record(session, idempotency_key, 200, body)
+    await session.commit()
+    return body
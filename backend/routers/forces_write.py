@@ -16,7 +16,9 @@ from models import (
     ForceSnapshot,
     ForceSpecialAbility,
     PilotAchievement,
+    PilotKill,
     PilotSpaAssignment,
+    PilotStats,
     MissionSpPurchase,
 )
 from serializers import resolve_image
@@ -138,6 +140,8 @@ async def delete_force(force_id: str, session: AsyncSession = Depends(get_sessio
     if mission_ids:
         await session.execute(delete(MissionSpPurchase).where(MissionSpPurchase.mission_id.in_(mission_ids)))
 
+    await session.execute(delete(PilotKill).where(PilotKill.force_id == force_id))
+    await session.execute(delete(PilotStats).where(PilotStats.force_id == force_id))
     await session.execute(delete(ForceSpecialAbility).where(ForceSpecialAbility.force_id == force_id))
     await session.execute(delete(Mission).where(Mission.force_id == force_id))
     await session.execute(delete(Mech).where(Mech.force_id == force_id))
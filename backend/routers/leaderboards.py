@@ -0,0 +1,125 @@
+"""Pilot leaderboard and kill board, across forces or for one force.
+
+Read from the `pilot_stats` rollup (services/pilot_stats.py) - one row
+per pilot, maintained on every write that changes a pilot's kills,
+mission counters or achievements - rather than from each pilot's combat
+record JSON. Each stat column is indexed, so a page is an index walk plus
+two primary-key lookups per row (pilot and force names).
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_session
+from models import Force, Pilot, PilotStats
+
+router = APIRouter(prefix="/api", tags=["leaderboards"])
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# API name -> rollup column; every one is a valid `sort`.
+STATS = {
+    "kills": PilotStats.kills,
+    "tonnageDestroyed": PilotStats.tonnage_destroyed,
+    "maxTonnageKill": PilotStats.max_tonnage_kill,
+    "lightKills": PilotStats.light_kills,
+    "mediumKills": PilotStats.medium_kills,
+    "heavyKills": PilotStats.heavy_kills,
+    "assaultKills": PilotStats.assault_kills,
+    "missionsCompleted": PilotStats.missions_completed,
+    "missionsWithoutInjury": PilotStats.missions_without_injury,
+    "achievements": PilotStats.achievements,
+}
+KILL_STATS = ("kills", "tonnageDestroyed", "maxTonnageKill", "lightKills", "mediumKills", "heavyKills", "assaultKills")
+
+
+def _force_totals_columns():
+    return [
+        (func.max if name == "maxTonnageKill" else func.sum)(STATS[name]).label(name)
+        for name in KILL_STATS + ("achievements",)
+    ]
+
+
+@router.get("/leaderboards")
+async def get_leaderboards(
+    force_id: Optional[str] = Query(None, alias="forceId"),
+    sort: str = "kills",
+    page: int = Query(1, ge=1),
+    page_size: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, alias="pageSize"),
+    session: AsyncSession = Depends(get_session),
+):
+    """Pilots ranked by `sort` (highest first, ties by pilot id), campaign-wide
+    or within `forceId`, plus each force's kill totals."""
+    if sort not in STATS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(STATS)}")
+    if force_id is not None and not await session.get(Force, force_id):
+        raise HTTPException(status_code=404, detail="Force not found")
+    force_filter = [PilotStats.force_id == force_id] if force_id is not None else []
+
+    rows = (
+        await session.execute(
+            select(
+                PilotStats.pilot_id,
+                Pilot.name,
+                PilotStats.force_id,
+                Force.name.label("force_name"),
+                *(column.label(name) for name, column in STATS.items()),
+            )
+            .join(Pilot, Pilot.id == PilotStats.pilot_id)
+            .join(Force, Force.id == PilotStats.force_id)
+            .where(*force_filter)
+            .order_by(desc(STATS[sort]), PilotStats.pilot_id)
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+        )
+    ).mappings().all()
+    total = (await session.execute(select(func.count()).select_from(PilotStats).where(*force_filter))).scalar()
+
+    # Grouped on the force_id index alone; names are joined onto the totals.
+    totals = (
+        select(PilotStats.force_id, func.count().label("pilots"), *_force_totals_columns())
+        .where(*force_filter)
+        .group_by(PilotStats.force_id)
+        .subquery()
+    )
+    force_totals = (
+        await session.execute(
+            select(totals, Force.name)
+            .join(Force, Force.id == totals.c.force_id)
+            .order_by(desc(totals.c.kills), Force.name)
+        )
+    ).mappings().all()
+
+    first_rank = (page - 1) * page_size + 1
+    return {
+        "sort": sort,
+        "forceId": force_id,
+        "pilots": {
+            "items": [
+                {
+                    "rank": first_rank + index,
+                    "pilotId": row["pilot_id"],
+                    "pilotName": row["name"],
+                    "forceId": row["force_id"],
+                    "forceName": row["force_name"],
+                    **{name: row[name] for name in STATS},
+                }
+                for index, row in enumerate(rows)
+            ],
+            "total": total,
+            "page": page,
+            "pageSize": page_size,
+        },
+        "forces": [
+            {
+                "forceId": row["force_id"],
+                "forceName": row["name"],
+                "pilots": row["pilots"],
+                **{name: row[name] for name in KILL_STATS + ("achievements",)},
+            }
+            for row in force_totals
+        ],
+    }
@@ -0,0 +1,165 @@
+"""Server-side lineup evaluation for the mission builder.
+
+`POST /api/forces/{id}/lineup/evaluate` takes any number of candidate
+lineups (mech/elemental id lists) and returns, per lineup, whether every
+unit can deploy plus its pilot-adjusted BV and tonnage - the same numbers
+as `domain/missions_logic.py` (and frontend/src/lib/missions.js). The
+force's units are loaded once, only the columns the maths needs, and turned
+into per-unit lookup tables (`build_lineup_tables`), so hundreds of
+candidates cost a dict lookup per unit each.
+
+`POST /api/forces/{id}/lineup/optimize` is the lance builder: the top-K
+highest-BV lineups of deployable units under a BV cap, tonnage limit and
+unit count, from the branch-and-bound search in
+domain/lineup_optimizer.py (bounded by `timeLimitMs`).
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_session
+from models import Force, Mech, Pilot, Elemental
+from domain.missions_logic import build_lineup_tables, evaluate_lineup
+from domain.lineup_optimizer import optimize_lineup
+
+router = APIRouter(prefix="/api", tags=["lineups"])
+
+MAX_LINEUPS = 1000
+MAX_TOP_K = 20
+MAX_TIME_LIMIT_MS = 5000
+
+
+class LineupIn(BaseModel):
+    assignedMechs: List[str] = []
+    assignedElementals: List[str] = []
+
+
+class LineupEvaluateIn(BaseModel):
+    lineups: List[LineupIn]
+
+
+class LineupOptimizeIn(BaseModel):
+    maxBv: Optional[int] = None
+    maxTonnage: Optional[int] = None
+    minUnits: int = 0
+    maxUnits: Optional[int] = None
+    includeElementals: bool = False
+    requiredMechs: List[str] = []
+    requiredElementals: List[str] = []
+    excludedMechs: List[str] = []
+    excludedElementals: List[str] = []
+    topK: int = 5
+    timeLimitMs: int = 500
+
+
+async def load_lineup_tables(session, force_id):
+    """`build_lineup_tables` for a force's whole roster, in three narrow
+    queries (no image blobs or logs)."""
+    mechs = (
+        await session.execute(
+            select(Mech.id, Mech.status, Mech.pilot_id, Mech.bv, Mech.weight).where(Mech.force_id == force_id)
+        )
+    ).all()
+    pilots = (
+        await session.execute(
+            select(Pilot.id, Pilot.gunnery, Pilot.piloting, Pilot.injuries).where(Pilot.force_id == force_id)
+        )
+    ).all()
+    elementals = (
+        await session.execute(
+            select(Elemental.id, Elemental.status, Elemental.suits_destroyed, Elemental.bv).where(
+                Elemental.force_id == force_id
+            )
+        )
+    ).all()
+    return build_lineup_tables(
+        {m.id: m for m in mechs},
+        {p.id: p for p in pilots},
+        {e.id: e for e in elementals},
+    )
+
+
+async def _get_force_or_404(session, force_id):
+    force = await session.get(Force, force_id)
+    if not force:
+        raise HTTPException(status_code=404, detail="Force not found")
+    return force
+
+
+@router.post("/forces/{force_id}/lineup/evaluate")
+async def evaluate_lineups(
+    force_id: str, payload: LineupEvaluateIn, session: AsyncSession = Depends(get_session)
+):
+    await _get_force_or_404(session, force_id)
+    if len(payload.lineups) > MAX_LINEUPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LINEUPS} lineups per request")
+    mech_table, elemental_table = await load_lineup_tables(session, force_id)
+    return {
+        "lineups": [
+            evaluate_lineup(mech_table, elemental_table, lineup.assignedMechs, lineup.assignedElementals)
+            for lineup in payload.lineups
+        ]
+    }
+
+
+@router.post("/forces/{force_id}/lineup/optimize")
+async def optimize_lineups(
+    force_id: str, payload: LineupOptimizeIn, session: AsyncSession = Depends(get_session)
+):
+    await _get_force_or_404(session, force_id)
+    if not 1 <= payload.topK <= MAX_TOP_K:
+        raise HTTPException(status_code=400, detail=f"topK must be between 1 and {MAX_TOP_K}")
+    if not 0 < payload.timeLimitMs <= MAX_TIME_LIMIT_MS:
+        raise HTTPException(status_code=400, detail=f"timeLimitMs must be between 1 and {MAX_TIME_LIMIT_MS}")
+    if payload.minUnits < 0 or (payload.maxUnits is not None and payload.maxUnits < 0):
+        raise HTTPException(status_code=400, detail="minUnits and maxUnits can't be negative")
+    if payload.maxUnits is not None and payload.minUnits > payload.maxUnits:
+        raise HTTPException(status_code=400, detail="minUnits can't be greater than maxUnits")
+    mech_table, elemental_table = await load_lineup_tables(session, force_id)
+
+    excluded = {("mech", i) for i in payload.excludedMechs} | {("elemental", i) for i in payload.excludedElementals}
+    required = {("mech", i) for i in payload.requiredMechs} | {("elemental", i) for i in payload.requiredElementals}
+    units = [
+        (("mech", mech_id), bv, tonnage)
+        for mech_id, (available, bv, tonnage) in mech_table.items()
+        if available
+    ]
+    if payload.includeElementals or payload.requiredElementals:
+        units.extend(
+            (("elemental", elemental_id), bv, 0)
+            for elemental_id, (available, bv) in elemental_table.items()
+            if available
+        )
+    units = [unit for unit in units if unit[0] not in excluded or unit[0] in required]
+    missing = required - {key for key, _, _ in units}
+    if missing:
+        ids = ", ".join(sorted(unit_id for _, unit_id in missing))
+        raise HTTPException(status_code=400, detail=f"Required unit(s) not available for a mission: {ids}")
+
+    result = optimize_lineup(
+        units,
+        max_bv=payload.maxBv,
+        max_tonnage=payload.maxTonnage,
+        min_units=payload.minUnits,
+        max_units=payload.maxUnits,
+        required=required,
+        top_k=payload.topK,
+        time_limit=payload.timeLimitMs / 1000,
+    )
+    return {
+        "lineups": [
+            {
+                "assignedMechs": [unit_id for kind, unit_id in keys if kind == "mech"],
+                "assignedElementals": [unit_id for kind, unit_id in keys if kind == "elemental"],
+                "totalBv": total_bv,
+                "totalTonnage": total_tonnage,
+            }
+            for keys, total_bv, total_tonnage in result["lineups"]
+        ],
+        "optimal": result["optimal"],
+        "candidates": len(units),
+        "nodesExplored": result["nodes"],
+    }
@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_session
-from models import MechCatalogEntry
+from domain.catalog_logic import catalog_entry_name
+from models import MechCatalogEntry, MechCatalogComponent
+from services.catalog_jobs import count_jobs, job_to_dict, list_jobs
+from services.catalog_search import fuzzy_search
 import watcher
 
 router = APIRouter(prefix="/api")
 
 MAX_RESULTS = 50
 MIN_SEARCH_LENGTH = 2
-
-
-def catalog_entry_name(chassis, model):
-    return f"{chassis} {model}" if model else chassis
+MAX_QUERY_RESULTS = 500
+HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
 
 
 def catalog_entry_to_dict(entry):
@@ -40,10 +44,13 @@ def catalog_entry_to_dict(entry):
 
 
 @router.get("/mech-catalog")
-async def search_mech_catalog(search: str = "", session: AsyncSession = Depends(get_session)):
+async def search_mech_catalog(search: str = "", fuzzy: bool = False, session: AsyncSession = Depends(get_session)):
     if len(search.strip()) < MIN_SEARCH_LENGTH:
         return []
 
+    if fuzzy:
+        return [catalog_entry_to_dict(e) for e in await fuzzy_search(session, search, MAX_RESULTS)]
+
     search_lower = search.strip().lower()
     entries = (await session.execute(select(MechCatalogEntry))).scalars().all()
 
@@ -58,6 +65,59 @@ async def search_mech_catalog(search: str = "", session: AsyncSession = Depends(
     return [catalog_entry_to_dict(e) for e in matches[:MAX_RESULTS]]
 
 
+@router.get("/mech-catalog/query")
+async def query_mech_catalog(
+    item: List[str] = Query([]),
+    min_tonnage: Optional[int] = Query(None, alias="minTonnage"),
+    max_tonnage: Optional[int] = Query(None, alias="maxTonnage"),
+    max_year: Optional[int] = Query(None, alias="maxYear"),
+    techbase: Optional[str] = None,
+    min_jump: Optional[int] = Query(None, alias="minJump"),
+    limit: int = Query(MAX_RESULTS, ge=1, le=MAX_QUERY_RESULTS),
+    session: AsyncSession = Depends(get_session),
+):
+    """Structured catalog query backed by the indexed
+    `mech_catalog_components` table, e.g. "3050-legal, <= 55 tons, jumps,
+    carries an ER PPC": `?item=ER PPC&maxYear=3050&maxTonnage=55&minJump=1`.
+    Every `item` must be present (anywhere on the unit, case-insensitive)."""
+    query = select(MechCatalogEntry)
+    for item_name in item:
+        query = query.where(
+            MechCatalogEntry.id.in_(
+                select(MechCatalogComponent.catalog_id).where(MechCatalogComponent.item == item_name.strip())
+            )
+        )
+    if min_tonnage is not None:
+        query = query.where(MechCatalogEntry.tonnage >= min_tonnage)
+    if max_tonnage is not None:
+        query = query.where(MechCatalogEntry.tonnage <= max_tonnage)
+    if max_year is not None:
+        query = query.where(MechCatalogEntry.year <= max_year)
+    if techbase:
+        query = query.where(MechCatalogEntry.techbase == techbase)
+    if min_jump is not None:
+        query = query.where(MechCatalogEntry.jump >= min_jump)
+
+    query = query.order_by(MechCatalogEntry.chassis, MechCatalogEntry.model).limit(limit)
+    entries = (await session.execute(query)).scalars().all()
+    return [catalog_entry_to_dict(e) for e in entries]
+
+
 @router.get("/mech-catalog/import-status")
-async def get_mech_catalog_import_status():
-    return watcher.get_status()
+async def get_mech_catalog_import_status(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE, alias="pageSize"),
+    session: AsyncSession = Depends(get_session),
+):
+    """Watched-folder state, the import queue, and a page of the persisted
+    import history (every run, newest first)."""
+    jobs = await list_jobs(session, limit=page_size, offset=(page - 1) * page_size)
+    return {
+        **watcher.get_status(),
+        "history": {
+            "items": [job_to_dict(job) for job in jobs],
+            "total": await count_jobs(session),
+            "page": page,
+            "pageSize": page_size,
+        },
+    }
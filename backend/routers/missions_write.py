@@ -1,7 +1,7 @@
 import uuid
 from typing import Optional, List, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from pydantic import BaseModel
 from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,13 +15,13 @@ from models import (
     Mission,
     MissionSpPurchase,
     SpChoice,
-    AchievementDefinition,
     PilotAchievement,
 )
 from serializers import mission_to_dict, mech_to_dict, elemental_to_dict, pilot_to_dict
+from services import achievement_rules, idempotency, pilot_kills, pilot_stats
+from services.warchest import adjust_warchest
 from domain.missions_logic import calculate_mission_total_tonnage
 from domain.achievements_logic import (
-    check_achievements,
     find_new_achievements,
     create_empty_combat_record,
     add_kill,
@@ -36,6 +36,17 @@ def _new_id(prefix):
     return f"{prefix}-{uuid.uuid4().hex[:12]}"
 
 
+async def _load_force_entities(session, model, ids, force_id):
+    """`{id: entity}` for the given ids that belong to `force_id`, in one
+    `IN` query."""
+    if not ids:
+        return {}
+    rows = (
+        await session.execute(select(model).where(model.id.in_(list(ids)), model.force_id == force_id))
+    ).scalars().all()
+    return {row.id: row for row in rows}
+
+
 class ObjectiveIn(BaseModel):
     id: Optional[str] = None
     title: str = ""
@@ -121,16 +132,27 @@ _UPDATE_FIELD_MAP = {
 
 @router.post("/forces/{force_id}/missions", status_code=201)
 async def create_mission(
-    force_id: str, payload: MissionCreateIn, session: AsyncSession = Depends(get_session)
+    force_id: str,
+    payload: MissionCreateIn,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_session),
 ):
+    replay = await idempotency.begin(session, idempotency_key, request, payload)
+    if replay is not None:
+        return replay
+
     force = await session.get(Force, force_id)
     if not force:
         raise HTTPException(status_code=404, detail="Force not found")
 
     timestamp = force.current_date
 
-    mechs = (await session.execute(select(Mech).where(Mech.force_id == force_id))).scalars().all()
-    mechs_by_id = {m.id: m for m in mechs}
+    # Only the assigned units (and their pilots) are touched, so only they
+    # are loaded - not the whole roster.
+    assigned_mech_ids = set(payload.assignedMechs)
+    mechs_by_id = await _load_force_entities(session, Mech, assigned_mech_ids, force_id)
+    mechs = list(mechs_by_id.values())
     total_tonnage = calculate_mission_total_tonnage(mechs_by_id, payload.assignedMechs)
 
     mission_id = payload.id or _new_id("mission")
@@ -155,31 +177,24 @@ async def create_mission(
     )
     session.add(mission)
 
-    assigned_mech_ids = set(payload.assignedMechs)
     for mech in mechs:
-        if mech.id in assigned_mech_ids:
-            log = list(mech.activity_log or [])
-            log.append(
-                {"timestamp": timestamp, "action": f"Assigned to mission: {payload.name}", "mission": payload.name, "cost": 0}
-            )
-            mech.activity_log = log
+        log = list(mech.activity_log or [])
+        log.append(
+            {"timestamp": timestamp, "action": f"Assigned to mission: {payload.name}", "mission": payload.name, "cost": 0}
+        )
+        mech.activity_log = log
 
-    elementals = (
-        await session.execute(select(Elemental).where(Elemental.force_id == force_id))
-    ).scalars().all()
-    assigned_elemental_ids = set(payload.assignedElementals)
-    for elemental in elementals:
-        if elemental.id in assigned_elemental_ids:
-            log = list(elemental.activity_log or [])
-            log.append(
-                {"timestamp": timestamp, "action": f"Assigned to mission: {payload.name}", "mission": payload.name, "cost": 0}
-            )
-            elemental.activity_log = log
+    elementals_by_id = await _load_force_entities(session, Elemental, set(payload.assignedElementals), force_id)
+    for elemental in elementals_by_id.values():
+        log = list(elemental.activity_log or [])
+        log.append(
+            {"timestamp": timestamp, "action": f"Assigned to mission: {payload.name}", "mission": payload.name, "cost": 0}
+        )
+        elemental.activity_log = log
 
-    pilots = (await session.execute(select(Pilot).where(Pilot.force_id == force_id))).scalars().all()
-    pilots_by_id = {p.id: p for p in pilots}
+    pilots_by_id = await _load_force_entities(session, Pilot, {m.pilot_id for m in mechs if m.pilot_id}, force_id)
     for mech in mechs:
-        if mech.id in assigned_mech_ids and mech.pilot_id:
+        if mech.pilot_id:
             pilot = pilots_by_id.get(mech.pilot_id)
             if pilot:
                 log = list(pilot.activity_log or [])
@@ -194,11 +209,17 @@ async def create_mission(
                 )
                 pilot.activity_log = log
 
-    force.current_warchest = force.current_warchest - payload.cost
+    await adjust_warchest(session, force, -payload.cost)
+
+    choice_ids = {choice_in.choiceId for choice_in in payload.spPurchases}
+    choices_by_id = {}
+    if choice_ids:
+        choices = (await session.execute(select(SpChoice).where(SpChoice.id.in_(choice_ids)))).scalars().all()
+        choices_by_id = {choice.id: choice for choice in choices}
 
     created_purchases = []
     for choice_in in payload.spPurchases:
-        choice = await session.get(SpChoice, choice_in.choiceId)
+        choice = choices_by_id.get(choice_in.choiceId)
         if not choice:
             raise HTTPException(status_code=404, detail=f"SP choice '{choice_in.choiceId}' not found in catalog")
         purchase = MissionSpPurchase(
@@ -211,8 +232,12 @@ async def create_mission(
         session.add(purchase)
         created_purchases.append(purchase)
 
+    # Flushed first so the response carries the column defaults.
+    await session.flush()
+    body = mission_to_dict(mission, created_purchases)
+    await idempotency.record(session, idempotency_key, 201, body)
     await session.commit()
-    return mission_to_dict(mission, created_purchases)
+    return body
 
 
 @router.put("/missions/{mission_id}")
@@ -259,8 +284,16 @@ async def delete_mission(mission_id: str, session: AsyncSession = Depends(get_se
 
 @router.post("/missions/{mission_id}/complete")
 async def complete_mission(
-    mission_id: str, payload: MissionCompletionIn, session: AsyncSession = Depends(get_session)
+    mission_id: str,
+    payload: MissionCompletionIn,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_session),
 ):
+    replay = await idempotency.begin(session, idempotency_key, request, payload)
+    if replay is not None:
+        return replay
+
     mission = await session.get(Mission, mission_id)
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
@@ -270,10 +303,14 @@ async def complete_mission(
     force = await session.get(Force, mission.force_id)
     timestamp = force.current_date
 
+    mechs_by_id = await _load_force_entities(session, Mech, payload.mechs, force.id)
+    elementals_by_id = await _load_force_entities(session, Elemental, payload.elementals, force.id)
+    pilots_by_id = await _load_force_entities(session, Pilot, payload.pilots, force.id)
+
     updated_mechs = []
     for mech_id, mech_data in payload.mechs.items():
-        mech = await session.get(Mech, mech_id)
-        if not mech or mech.force_id != force.id:
+        mech = mechs_by_id.get(mech_id)
+        if not mech:
             continue
         if mech_data.status is not None:
             mech.status = mech_data.status
@@ -281,8 +318,8 @@ async def complete_mission(
 
     updated_elementals = []
     for elemental_id, e_data in payload.elementals.items():
-        elemental = await session.get(Elemental, elemental_id)
-        if not elemental or elemental.force_id != force.id:
+        elemental = elementals_by_id.get(elemental_id)
+        if not elemental:
             continue
         if e_data.status is not None:
             elemental.status = e_data.status
@@ -292,14 +329,27 @@ async def complete_mission(
             elemental.suits_destroyed = max(0, min(6, e_data.suitsDestroyed))
         updated_elementals.append(elemental)
 
-    achievement_defs = (await session.execute(select(AchievementDefinition))).scalars().all()
+    rules = await achievement_rules.get_rules(session)
+
+    achievement_ids_by_pilot = {pilot_id: [] for pilot_id in pilots_by_id}
+    if pilots_by_id:
+        links = (
+            await session.execute(
+                select(PilotAchievement)
+                .where(PilotAchievement.pilot_id.in_(list(pilots_by_id)))
+                .order_by(PilotAchievement.id)
+            )
+        ).scalars().all()
+        for link in links:
+            achievement_ids_by_pilot[link.pilot_id].append(link.achievement_id)
 
     new_achievements_by_pilot = []
     updated_pilots = []
+    kill_rows = []
 
     for pilot_id, p_data in payload.pilots.items():
-        pilot = await session.get(Pilot, pilot_id)
-        if not pilot or pilot.force_id != force.id:
+        pilot = pilots_by_id.get(pilot_id)
+        if not pilot:
             continue
 
         previous_injuries = pilot.injuries or 0
@@ -310,32 +360,29 @@ async def complete_mission(
         combat_record = record_mission_completion(combat_record, was_injured)
 
         for kill in p_data.kills:
-            combat_record = add_kill(
-                combat_record,
-                {"mechModel": kill.mechModel, "tonnage": kill.tonnage, "mission": mission.name, "date": timestamp},
-            )
+            kill = {"mechModel": kill.mechModel, "tonnage": kill.tonnage, "mission": mission.name, "date": timestamp}
+            combat_record = add_kill(combat_record, kill)
+            kill_rows.append(pilot_kills.kill_values(pilot_id, pilot.force_id, kill))
 
         if p_data.assists:
             combat_record = add_assists(combat_record, p_data.assists)
 
-        current_achievement_ids = check_achievements(combat_record, achievement_defs)
+        current_achievement_ids = rules.earned_ids(combat_record)
 
-        previous_links = (
-            await session.execute(select(PilotAchievement).where(PilotAchievement.pilot_id == pilot_id))
-        ).scalars().all()
-        previous_achievement_ids = [link.achievement_id for link in previous_links]
+        previous_achievement_ids = achievement_ids_by_pilot[pilot_id]
 
         earned_new = find_new_achievements(previous_achievement_ids, current_achievement_ids)
         earned_details = []
         for achievement_id in earned_new:
             session.add(PilotAchievement(pilot_id=pilot_id, achievement_id=achievement_id, earned_at=timestamp))
-            definition = next((a for a in achievement_defs if a.id == achievement_id), None)
+            previous_achievement_ids.append(achievement_id)
+            definition = rules.definitions_by_id.get(achievement_id)
             earned_details.append(
                 {
                     "id": achievement_id,
-                    "name": definition.name if definition else achievement_id,
-                    "icon": definition.icon if definition else None,
-                    "description": definition.description if definition else None,
+                    "name": definition["name"] if definition else achievement_id,
+                    "icon": definition["icon"] if definition else None,
+                    "description": definition["description"] if definition else None,
                 }
             )
 
@@ -349,27 +396,25 @@ async def complete_mission(
         updated_pilots.append(pilot)
 
     mission.objectives = [o.model_dump() for o in payload.objectives]
+    await pilot_kills.add_kills(session, kill_rows)
+    await pilot_stats.refresh(session, [pilot.id for pilot in updated_pilots])
+
     mission.recap = payload.recap
     mission.completed = True
     mission.completed_at = timestamp
 
     reward = sum(o.wpReward for o in payload.objectives if o.achieved and o.wpReward and o.wpReward > 0)
-    force.current_warchest = force.current_warchest + reward
-
-    await session.commit()
-
-    pilots_response = []
-    for pilot in updated_pilots:
-        links = (
-            await session.execute(select(PilotAchievement).where(PilotAchievement.pilot_id == pilot.id))
-        ).scalars().all()
-        pilots_response.append(pilot_to_dict(pilot, [l.achievement_id for l in links]))
+    await adjust_warchest(session, force, reward)
 
     sp_purchases = (
         await session.execute(select(MissionSpPurchase).where(MissionSpPurchase.mission_id == mission_id))
     ).scalars().all()
 
-    return {
+    # The links loaded above plus the ones just added are exactly what's
+    # stored now - no need to re-read them per pilot.
+    pilots_response = [pilot_to_dict(pilot, achievement_ids_by_pilot[pilot.id]) for pilot in updated_pilots]
+
+    body = {
         "mission": mission_to_dict(mission, sp_purchases),
         "currentWarchest": force.current_warchest,
         "reward": reward,
@@ -378,3 +423,6 @@ async def complete_mission(
         "pilots": pilots_response,
         "newAchievements": new_achievements_by_pilot,
     }
+    await idempotency.record(session, idempotency_key, 200, body)
+    await session.commit()
+    return body
@@ -0,0 +1,132 @@
+"""OpFor generator: `POST /api/forces/{id}/missions/opfor/generate`.
+
+Draws candidate opposing forces from the mech catalog that hit a BV target
+within a tolerance (domain/opfor_logic.py, over the cached catalog pool in
+services/opfor_pool.py). The era defaults to the force's current year, so
+an OpFor never fields designs that don't exist yet; pass `maxYear`
+explicitly to override. Each unit comes back in the mission's
+`opForUnits` shape, so a candidate can be dropped straight into a mission.
+The `seed` is echoed back - sending it again reproduces the same
+candidates as long as the catalog hasn't changed.
+"""
+import random
+import re
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_session
+from models import Force
+from domain.catalog_logic import catalog_entry_name
+from domain.opfor_logic import generate_opfors
+from services.opfor_pool import get_pool
+
+router = APIRouter(prefix="/api", tags=["opfor"])
+
+MAX_UNITS = 24
+MAX_CANDIDATES = 50
+
+_YEAR_RE = re.compile(r"\d{4}")
+
+
+class OpForGenerateIn(BaseModel):
+    targetBv: int
+    tolerance: float = 0.05
+    unitCount: int = 4
+    candidates: int = 5
+    minYear: Optional[int] = None
+    maxYear: Optional[int] = None
+    techbases: List[str] = []
+    roles: List[str] = []
+    minUnitTonnage: Optional[int] = None
+    maxUnitTonnage: Optional[int] = None
+    maxTonnage: Optional[int] = None
+    gunnery: int = 4
+    piloting: int = 5
+    seed: Optional[int] = None
+
+
+def _force_year(force):
+    match = _YEAR_RE.match(force.current_date or "")
+    return int(match.group()) if match else None
+
+
+@router.post("/forces/{force_id}/missions/opfor/generate")
+async def generate_opfor_candidates(
+    force_id: str, payload: OpForGenerateIn, session: AsyncSession = Depends(get_session)
+):
+    force = await session.get(Force, force_id)
+    if not force:
+        raise HTTPException(status_code=404, detail="Force not found")
+    if payload.targetBv <= 0:
+        raise HTTPException(status_code=400, detail="targetBv must be positive")
+    if not 0 <= payload.tolerance <= 1:
+        raise HTTPException(status_code=400, detail="tolerance must be between 0 and 1")
+    if not 1 <= payload.unitCount <= MAX_UNITS:
+        raise HTTPException(status_code=400, detail=f"unitCount must be between 1 and {MAX_UNITS}")
+    if not 1 <= payload.candidates <= MAX_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"candidates must be between 1 and {MAX_CANDIDATES}")
+
+    max_year = payload.maxYear if payload.maxYear is not None else _force_year(force)
+    pool = await get_pool(session)
+    entries, bvs = pool.filtered(
+        min_year=payload.minYear,
+        max_year=max_year,
+        techbases=payload.techbases,
+        roles=payload.roles,
+        min_tonnage=payload.minUnitTonnage,
+        max_tonnage=payload.maxUnitTonnage,
+        gunnery=payload.gunnery,
+        piloting=payload.piloting,
+    )
+    seed = payload.seed if payload.seed is not None else random.SystemRandom().randrange(2**32)
+    low = round(payload.targetBv * (1 - payload.tolerance))
+    high = round(payload.targetBv * (1 + payload.tolerance))
+    found = generate_opfors(
+        bvs,
+        payload.unitCount,
+        low,
+        high,
+        random.Random(seed),
+        payload.candidates,
+        tonnages=[entry.tonnage or 0 for entry in entries] if payload.maxTonnage is not None else None,
+        max_tonnage=payload.maxTonnage,
+    )
+
+    candidates = []
+    for number, picks in enumerate(found):
+        total_bv = sum(bvs[i] for i in picks)
+        candidates.append(
+            {
+                "units": [
+                    {
+                        "id": f"opfor-{seed:x}-{number}-{slot}",
+                        "name": catalog_entry_name(entries[i].chassis, entries[i].model),
+                        "tonnage": entries[i].tonnage or 0,
+                        "baseBv": entries[i].bv,
+                        "gunnery": payload.gunnery,
+                        "piloting": payload.piloting,
+                        "status": "active",
+                        "catalogId": entries[i].id,
+                        "mulId": entries[i].mul_id,
+                        "techbase": entries[i].techbase,
+                        "role": entries[i].role,
+                        "year": entries[i].year,
+                    }
+                    for slot, i in enumerate(picks)
+                ],
+                "totalBv": total_bv,
+                "totalTonnage": sum(entries[i].tonnage or 0 for i in picks),
+                "deviation": total_bv - payload.targetBv,
+            }
+        )
+    candidates.sort(key=lambda candidate: abs(candidate["deviation"]))
+    return {
+        "seed": seed,
+        "poolSize": len(entries),
+        "maxYear": max_year,
+        "bvRange": [low, high],
+        "candidates": candidates,
+    }
@@ -0,0 +1,124 @@
+"""Pilot-to-mech assignment solver.
+
+`POST /api/forces/{id}/pilot-assignment` proposes which pilot should sit
+in which mech to maximise, minimise or hit a target total pilot-adjusted
+BV (domain/pilot_assignment.py), and returns the `pilotId` changes that
+takes. With `apply` the changes are written in one transaction.
+
+By default every mech that isn't destroyed and every pilot who isn't dead
+(6 injuries) takes part, except pilots sitting in a mech outside the
+chosen `mechIds` - and, when only `pilotIds` is given, mechs held by a
+pilot outside it, so the rest of the roster stays seated. A pilot named
+explicitly in `pilotIds` is taken out of whatever mech they sit in, and
+that mech shows up in `changes` with an empty `toPilotId`.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_session
+from models import Force, Mech, Pilot
+from domain.mechs_logic import get_mech_adjusted_bv
+from domain.pilot_assignment import OBJECTIVES, adjusted_bv_matrix, solve_assignment
+
+router = APIRouter(prefix="/api", tags=["pilot-assignment"])
+
+
+class PilotAssignmentIn(BaseModel):
+    objective: str = "maximize"
+    targetBv: Optional[int] = None
+    mechIds: Optional[List[str]] = None
+    pilotIds: Optional[List[str]] = None
+    apply: bool = False
+
+
+def _select_ids(requested, eligible, label):
+    if requested is None:
+        return [unit_id for unit_id in eligible]
+    unknown = [unit_id for unit_id in requested if unit_id not in eligible]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not assignable {label}(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+@router.post("/forces/{force_id}/pilot-assignment")
+async def solve_pilot_assignment(
+    force_id: str, payload: PilotAssignmentIn, session: AsyncSession = Depends(get_session)
+):
+    force = await session.get(Force, force_id)
+    if not force:
+        raise HTTPException(status_code=404, detail="Force not found")
+    if payload.objective not in OBJECTIVES:
+        raise HTTPException(status_code=400, detail=f"objective must be one of: {', '.join(OBJECTIVES)}")
+    if payload.objective == "target" and payload.targetBv is None:
+        raise HTTPException(status_code=400, detail="targetBv is required for the target objective")
+
+    mechs = {
+        m.id: m
+        for m in (
+            await session.execute(select(Mech.id, Mech.status, Mech.pilot_id, Mech.bv).where(Mech.force_id == force_id))
+        ).all()
+    }
+    pilots = {
+        p.id: p
+        for p in (
+            await session.execute(
+                select(Pilot.id, Pilot.gunnery, Pilot.piloting, Pilot.injuries).where(Pilot.force_id == force_id)
+            )
+        ).all()
+    }
+    living = {p.id: p for p in pilots.values() if p.injuries != 6}
+    pilot_ids = None if payload.pilotIds is None else _select_ids(payload.pilotIds, living, "pilot")
+    assignable = {m.id: m for m in mechs.values() if m.status != "Destroyed"}
+    if payload.mechIds is None and pilot_ids is not None:
+        chosen_pilots = set(pilot_ids)
+        assignable = {m.id: m for m in assignable.values() if not m.pilot_id or m.pilot_id in chosen_pilots}
+    mech_ids = _select_ids(payload.mechIds, assignable, "mech")
+    selected_mechs = set(mech_ids)
+    if pilot_ids is None:
+        seated_elsewhere = {m.pilot_id for m in mechs.values() if m.pilot_id and m.id not in selected_mechs}
+        pilot_ids = [pilot_id for pilot_id in living if pilot_id not in seated_elsewhere]
+
+    matrix = adjusted_bv_matrix(
+        [mechs[mech_id].bv for mech_id in mech_ids],
+        [(pilots[pilot_id].gunnery, pilots[pilot_id].piloting) for pilot_id in pilot_ids],
+    )
+    pairs, total_bv = solve_assignment(matrix, payload.objective, payload.targetBv)
+
+    new_pilot = {mech_id: "" for mech_id in mech_ids}
+    for mech_index, pilot_index in pairs:
+        new_pilot[mech_ids[mech_index]] = pilot_ids[pilot_index]
+    moved_pilots = set(pilot_ids)
+    for mech in mechs.values():
+        if mech.id not in selected_mechs and mech.pilot_id in moved_pilots:
+            new_pilot[mech.id] = ""
+    changes = [
+        {"mechId": mech_id, "fromPilotId": mechs[mech_id].pilot_id or "", "toPilotId": pilot_id}
+        for mech_id, pilot_id in new_pilot.items()
+        if (mechs[mech_id].pilot_id or "") != pilot_id
+    ]
+
+    if payload.apply and changes:
+        await session.execute(
+            update(Mech), [{"id": change["mechId"], "pilot_id": change["toPilotId"]} for change in changes]
+        )
+        await session.commit()
+
+    return {
+        "objective": payload.objective,
+        "targetBv": payload.targetBv,
+        "totalBv": total_bv,
+        "previousTotalBv": sum(
+            get_mech_adjusted_bv(mechs[mech_id], pilots.get(mechs[mech_id].pilot_id))
+            for mech_id in mech_ids
+            if mechs[mech_id].pilot_id
+        ),
+        "assignments": [
+            {"mechId": mech_ids[i], "pilotId": pilot_ids[j], "adjustedBv": matrix[i][j]} for i, j in pairs
+        ],
+        "changes": changes,
+        "applied": bool(payload.apply and changes),
+    }
@@ -7,8 +7,10 @@ from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_session
-from models import Force, Mech, Pilot, PilotAchievement, PilotSpaAssignment
+from domain.achievements_logic import with_kill_stats
+from models import Force, Mech, Pilot, PilotAchievement, PilotKill, PilotSpaAssignment, PilotStats
 from serializers import pilot_to_dict
+from services import pilot_kills, pilot_stats
 
 router = APIRouter(prefix="/api")
 
@@ -67,10 +69,13 @@ async def create_pilot(force_id: str, payload: PilotCreateIn, session: AsyncSess
         history=payload.history,
         warchest_cost=payload.warchestCost,
         activity_log=payload.activityLog if payload.activityLog is not None else [],
-        combat_record=payload.combatRecord,
+        combat_record=with_kill_stats(payload.combatRecord),
         achievements=[],
     )
     session.add(pilot)
+    await session.flush()
+    await pilot_kills.replace_pilot_kills(session, pilot.id, force_id, pilot.combat_record, existing=False)
+    await pilot_stats.refresh(session, [pilot.id])
     await session.commit()
     return pilot_to_dict(pilot, [])
 
@@ -82,7 +87,13 @@ async def update_pilot(pilot_id: str, payload: PilotUpdateIn, session: AsyncSess
         raise HTTPException(status_code=404, detail="Pilot not found")
 
     for key, value in payload.model_dump(exclude_unset=True).items():
+        if key == "combatRecord":
+            # The client's record may carry edited kills without matching stats.
+            value = with_kill_stats(value)
         setattr(pilot, _FIELD_MAP[key], value)
+        if key == "combatRecord":
+            await pilot_kills.replace_pilot_kills(session, pilot.id, pilot.force_id, value)
+            await pilot_stats.refresh(session, [pilot.id])
 
     await session.commit()
     links = (
@@ -100,11 +111,14 @@ async def delete_pilot(pilot_id: str, session: AsyncSession = Depends(get_sessio
     # Documented cascade behavior for deleting a pilot:
     # - PilotAchievement / PilotSpaAssignment link rows are removed (the
     #   pilot's own combat record, including kills, is embedded JSON on the
-    #   pilot itself and is simply deleted with it - no other row references
-    #   it, so kill-board/achievement *catalogs* are never touched).
+    #   pilot itself and is simply deleted with it, along with its
+    #   `pilot_kills` mirror rows and `pilot_stats` rollup - kill-board/
+    #   achievement *catalogs* are never touched).
     # - Any mech piloted by this pilot is unassigned (pilot_id cleared), not
     #   deleted - the mech survives without a pilot.
     await session.execute(delete(PilotAchievement).where(PilotAchievement.pilot_id == pilot_id))
+    await session.execute(delete(PilotKill).where(PilotKill.pilot_id == pilot_id))
+    await session.execute(delete(PilotStats).where(PilotStats.pilot_id == pilot_id))
     await session.execute(delete(PilotSpaAssignment).where(PilotSpaAssignment.pilot_id == pilot_id))
     await session.execute(update(Mech).where(Mech.pilot_id == pilot_id).values(pilot_id=""))
     await session.delete(pilot)
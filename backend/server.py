@@ -12,6 +12,7 @@ from sqlalchemy import text
 from database import engine
 from migration_harness import run_migrations
 import watcher
+from services import achievement_backfill, catalog_jobs
 from admin.router import router as admin_router
 from admin.sp_choices import router as admin_sp_choices_router
 from admin.downtime_actions import router as admin_downtime_actions_router
@@ -32,11 +33,17 @@ from routers.downtime import router as downtime_router
 from routers.downtime_actions import router as downtime_actions_router
 from routers.force_snapshots import router as force_snapshots_router
 from routers.images import router as images_router
+from routers.lineups import router as lineups_router
+from routers.pilot_assignment import router as pilot_assignment_router
+from routers.opfor import router as opfor_router
+from routers.leaderboards import router as leaderboards_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await asyncio.get_event_loop().run_in_executor(None, run_migrations)
+    await catalog_jobs.mark_interrupted_jobs()
+    await achievement_backfill.mark_interrupted_jobs()
     watcher.start_watcher(asyncio.get_event_loop())
     yield
     watcher.stop_watcher()
@@ -104,3 +111,7 @@ app.include_router(downtime_router)
 app.include_router(downtime_actions_router)
 app.include_router(force_snapshots_router)
 app.include_router(images_router)
+app.include_router(lineups_router)
+app.include_router(pilot_assignment_router)
+app.include_router(opfor_router)
+app.include_router(leaderboards_router)
@@ -0,0 +1,199 @@
+"""Background re-evaluation of achievement definitions for existing pilots.
+
+Achievements are otherwise only checked when a pilot completes a mission,
+so a definition added or edited through the Admin CRUD
+(admin/achievements.py) would never reach pilots who already qualify.
+Every such write queues an `achievement_backfill_jobs` row here and runs it
+as an asyncio task off the request path; the Admin panel polls the job.
+
+A job compiles the definitions it covers (`CompiledAchievements`), then
+walks the pilots in pages of `PAGE_SIZE` (keyset on id, reading only id,
+combat record and the force's current date - used as `earned_at`, as in
+mission completion). Each page's new `PilotAchievement` links are inserted
+in one executemany together with the job's progress, so a job's counters
+always match what it committed. Inserts skip links that already exist or
+whose definition was deleted meanwhile, so a mission completion racing the
+job never produces a duplicate. Jobs run one at a time. Pilots without a
+combat record are skipped, and links are only ever added - a definition
+made stricter doesn't take achievements back, like mission completion.
+
+Jobs still queued/running when the process stops are marked `interrupted`
+on the next start-up; re-running the re-evaluation picks up from scratch
+(it's idempotent).
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, text, update
+
+from database import SessionLocal
+from domain.achievements_logic import CompiledAchievements
+from models import AchievementBackfillJob, AchievementDefinition, Force, Pilot, PilotAchievement
+from services import pilot_stats
+
+logger = logging.getLogger("achievement_backfill")
+
+PAGE_SIZE = 500
+MAX_HISTORY = 20
+ACTIVE_STATUSES = ("queued", "running")
+
+_INSERT_LINK = text(
+    "INSERT INTO pilot_achievements (pilot_id, achievement_id, earned_at) "
+    "SELECT :pilot_id, :achievement_id, :earned_at "
+    "WHERE NOT EXISTS ("
+    "SELECT 1 FROM pilot_achievements WHERE pilot_id = :pilot_id AND achievement_id = :achievement_id"
+    ") "
+    "AND EXISTS (SELECT 1 FROM achievement_definitions WHERE id = :achievement_id)"
+)
+
+_run_lock = asyncio.Lock()
+_tasks = set()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "achievementIds": job.achievement_ids,
+        "status": job.status,
+        "totalPilots": job.total_pilots,
+        "pilotsProcessed": job.pilots_processed,
+        "awarded": job.awarded,
+        "error": job.error,
+        "createdAt": job.created_at,
+        "startedAt": job.started_at,
+        "finishedAt": job.finished_at,
+    }
+
+
+async def start_backfill(session, achievement_ids=None):
+    """Queue a re-evaluation of `achievement_ids` (every definition if
+    None) for all pilots and start it in the background."""
+    job = AchievementBackfillJob(
+        id=f"achievements-{uuid.uuid4().hex[:12]}",
+        achievement_ids=list(achievement_ids) if achievement_ids is not None else None,
+        status="queued",
+        total_pilots=0,
+        pilots_processed=0,
+        awarded=0,
+        created_at=_now(),
+    )
+    session.add(job)
+    await session.commit()
+    task = asyncio.get_running_loop().create_task(_run_job(job.id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def _update_job(job_id, **values):
+    async with SessionLocal() as session:
+        await session.execute(
+            update(AchievementBackfillJob).where(AchievementBackfillJob.id == job_id).values(**values)
+        )
+        await session.commit()
+
+
+async def _run_job(job_id):
+    async with _run_lock:
+        try:
+            await _backfill(job_id)
+        except Exception as exc:
+            logger.exception("Achievement backfill job %s failed", job_id)
+            await _update_job(job_id, status="failed", error=str(exc), finished_at=_now())
+
+
+async def _backfill(job_id):
+    async with SessionLocal() as session:
+        job = await session.get(AchievementBackfillJob, job_id)
+        query = select(AchievementDefinition)
+        if job.achievement_ids is not None:
+            query = query.where(AchievementDefinition.id.in_(job.achievement_ids))
+        rules = CompiledAchievements((await session.execute(query)).scalars().all())
+        achievement_ids = list(rules.definitions_by_id)
+        total = (await session.execute(select(func.count()).select_from(Pilot))).scalar()
+        job.status, job.started_at, job.total_pilots = "running", _now(), total
+        await session.commit()
+
+        processed = awarded = 0
+        last_id = ""
+        while True:
+            page = (
+                await session.execute(
+                    select(Pilot.id, Pilot.combat_record, Force.current_date)
+                    .join(Force, Force.id == Pilot.force_id)
+                    .where(Pilot.id > last_id)
+                    .order_by(Pilot.id)
+                    .limit(PAGE_SIZE)
+                )
+            ).all()
+            if not page:
+                break
+            last_id = page[-1].id
+            pilot_ids = [row.id for row in page]
+            existing = set(
+                (
+                    await session.execute(
+                        select(PilotAchievement.pilot_id, PilotAchievement.achievement_id).where(
+                            PilotAchievement.pilot_id.in_(pilot_ids),
+                            PilotAchievement.achievement_id.in_(achievement_ids),
+                        )
+                    )
+                ).tuples()
+            )
+            links = [
+                {"pilot_id": row.id, "achievement_id": achievement_id, "earned_at": row.current_date}
+                for row in page
+                if row.combat_record
+                for achievement_id in rules.earned_ids(row.combat_record)
+                if (row.id, achievement_id) not in existing
+            ]
+            if links:
+                awarded += (await session.execute(_INSERT_LINK, links)).rowcount
+                await pilot_stats.refresh(session, [link["pilot_id"] for link in links])
+            processed += len(page)
+            await session.execute(
+                update(AchievementBackfillJob)
+                .where(AchievementBackfillJob.id == job_id)
+                .values(pilots_processed=processed, awarded=awarded)
+            )
+            await session.commit()
+
+        await session.execute(
+            update(AchievementBackfillJob)
+            .where(AchievementBackfillJob.id == job_id)
+            .values(status="succeeded", pilots_processed=processed, awarded=awarded, finished_at=_now())
+        )
+        await session.commit()
+
+
+async def get_job(session, job_id):
+    return await session.get(AchievementBackfillJob, job_id)
+
+
+async def list_jobs(session, limit=MAX_HISTORY):
+    """Newest first."""
+    return (
+        await session.execute(
+            select(AchievementBackfillJob)
+            .order_by(AchievementBackfillJob.created_at.desc(), AchievementBackfillJob.id)
+            .limit(limit)
+        )
+    ).scalars().all()
+
+
+async def mark_interrupted_jobs():
+    """Called on start-up: any job still queued/running belonged to a
+    previous process and will never finish."""
+    async with SessionLocal() as session:
+        await session.execute(
+            update(AchievementBackfillJob)
+            .where(AchievementBackfillJob.status.in_(ACTIVE_STATUSES))
+            .values(status="interrupted", error="The server restarted before this job finished.", finished_at=_now())
+        )
+        await session.commit()
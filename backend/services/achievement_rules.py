@@ -0,0 +1,34 @@
+"""Compiled achievement definitions shared by mission completion.
+
+The `achievement_definitions` table is small and only changes through the
+admin CRUD (admin/achievements.py), so it is loaded and compiled
+(`CompiledAchievements`, domain/achievements_logic.py) on first use and
+kept until `invalidate()` - called by every admin write once it has
+committed. A load that raced with an invalidation is used for that request
+but not kept.
+"""
+from sqlalchemy import select
+
+from domain.achievements_logic import CompiledAchievements
+from models import AchievementDefinition
+
+_rules = None
+_generation = 0
+
+
+async def get_rules(session):
+    global _rules
+    if _rules is not None:
+        return _rules
+    generation = _generation
+    definitions = (await session.execute(select(AchievementDefinition))).scalars().all()
+    rules = CompiledAchievements(definitions)
+    if generation == _generation:
+        _rules = rules
+    return rules
+
+
+def invalidate():
+    global _rules, _generation
+    _generation += 1
+    _rules = None
@@ -0,0 +1,50 @@
+"""Keeps `mech_catalog_components` in sync with `MechCatalogEntry.components`.
+
+Importers call `replace_components` with the catalog rows they just wrote;
+each row's component lines are re-parsed (domain/components_logic.py) and
+swapped in with set-based DELETE/INSERTs. Large batches - a full MUL export
+is several thousand rows - are parsed in the import's process pool
+(services/process_pool.py), when it has one, so the string work doesn't
+hold up the event loop or the import.
+"""
+from sqlalchemy import delete, insert
+
+from domain.components_logic import parse_components, parse_components_many
+from models import MechCatalogComponent
+
+PROCESS_POOL_MIN_ROWS = 1000
+PARSE_CHUNK_SIZE = 500
+DB_CHUNK_SIZE = 500
+
+
+async def parse_components_bulk(texts, pool=None):
+    """`parse_components` over many texts, in `pool` (an `ImportPool`) when
+    it's enabled and the batch is big enough to be worth shipping out."""
+    if pool is None or not pool.enabled or len(texts) < PROCESS_POOL_MIN_ROWS:
+        return [parse_components(text) for text in texts]
+
+    chunks = [texts[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(texts), PARSE_CHUNK_SIZE)]
+    results = await pool.map(parse_components_many, chunks)
+    return [parsed for chunk in results for parsed in chunk]
+
+
+async def replace_components(session, components_by_catalog_id, pool=None):
+    """Re-derive the component rows for the given `{catalog_id: components
+    text}` mapping. Runs inside the caller's transaction."""
+    catalog_ids = list(components_by_catalog_id)
+    if not catalog_ids:
+        return
+    parsed = await parse_components_bulk([components_by_catalog_id[cid] or "" for cid in catalog_ids], pool)
+
+    for i in range(0, len(catalog_ids), DB_CHUNK_SIZE):
+        await session.execute(
+            delete(MechCatalogComponent).where(MechCatalogComponent.catalog_id.in_(catalog_ids[i:i + DB_CHUNK_SIZE]))
+        )
+
+    rows = [
+        {"catalog_id": catalog_id, "item": item, "location": location, "count": count}
+        for catalog_id, components in zip(catalog_ids, parsed)
+        for item, location, count in components
+    ]
+    for i in range(0, len(rows), DB_CHUNK_SIZE * 10):
+        await session.execute(insert(MechCatalogComponent), rows[i:i + DB_CHUNK_SIZE * 10])
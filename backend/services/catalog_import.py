@@ -0,0 +1,324 @@
+"""Set-based upsert of mech catalog rows, shared by every import path
+(`import_mech_catalog.py`, the watched folder in `watcher.py`, and the
+Admin upload).
+
+Rows are written in chunks of `CHUNK_SIZE` with one
+`INSERT ... ON CONFLICT DO UPDATE ... RETURNING id` per chunk instead of a
+SELECT + ORM mutation per row:
+
+- rows with a `mul_id` conflict on the unique `mul_id` index;
+- rows without one conflict on `(chassis, model)` through the partial unique
+  index `uq_mech_catalog_chassis_model_without_mul_id` (`WHERE mul_id IS
+  NULL`), so re-imports stay idempotent for them too.
+
+Created vs. updated counts come from the statement results: ids are
+monotonically assigned, so a returned id above the table's max id before
+the chunk is a new row, anything else was an update. Each row also stores a
+`content_hash` of its imported columns (domain/catalog_logic.py) and the
+ON CONFLICT update only fires when it differs, so re-importing an
+unchanged export writes nothing and those rows are counted as unchanged
+(chunk size minus RETURNING rows). Rows also record their `source`: a MUL
+export (`mul`, every CSV/NDJSON path) overwrites any row, while unit files
+(`unit_file`, services/unitfile_import.py) only create rows and update
+their own - a MUL row's BV, components and heat are never replaced by the
+unit-file parser's approximations, and a unit-file row the MUL export
+later covers becomes a MUL row. Rows left alone that way count as
+unchanged, so alternating imports settle. Component rows
+(`mech_catalog_components`) are only re-derived for rows whose `components`
+text actually changed, batched so large imports can parse them in the
+import's process pool.
+
+`stream_catalog_import` is the one import engine on top of that: it reads a
+MekBay/MUL CSV (plain, gzipped, zipped, or as NDJSON) incrementally from any
+binary stream (an open file, an upload's spooled file) through the parse
+stage in services/catalog_parse.py (header validated once; large plain CSVs
+parsed in a process pool, shared with the components parse), writes each
+parsed batch and yields a progress dict after it, so memory stays bounded
+by the batch size whatever the file size. With `commit=True` each
+batch is committed as it lands (re-imports are idempotent, so an import
+that fails halfway is fixed by re-running it); otherwise everything runs in
+the caller's transaction. `dry_run=True` computes the would-be diff from
+a read-only pre-select instead of writing.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, or_, tuple_
+from sqlalchemy.dialects.sqlite import insert
+
+from domain.catalog_logic import content_hash
+from models import MechCatalogEntry
+from services.catalog_components import replace_components
+from services.catalog_parse import PARSE_WORKERS, CatalogImportError, catalog_format, iter_catalog_batches
+from services.process_pool import ImportPool
+
+CHUNK_SIZE = 500
+COMPONENTS_BATCH_SIZE = 2000
+DRY_RUN_DIFF_LIMIT = 500
+# Rows read from the CSV per engine batch - large enough to reach the
+# components process-pool threshold on a first import.
+BATCH_SIZE = 2000
+
+
+def _row_key(values):
+    if values["mul_id"] is not None:
+        return ("mul_id", values["mul_id"])
+    return ("chassis_model", values["chassis"], values["model"])
+
+
+async def _existing_rows(session, values_list, keyed_on_mul_id, *columns):
+    """`{row key: row}` for the rows of a chunk that already exist, with the
+    key columns plus `columns` selected."""
+    key_columns = (MechCatalogEntry.mul_id, MechCatalogEntry.chassis, MechCatalogEntry.model)
+    if keyed_on_mul_id:
+        where = (MechCatalogEntry.mul_id.in_([v["mul_id"] for v in values_list]),)
+    else:
+        where = (
+            MechCatalogEntry.mul_id.is_(None),
+            tuple_(MechCatalogEntry.chassis, MechCatalogEntry.model).in_(
+                [(v["chassis"], v["model"]) for v in values_list]
+            ),
+        )
+    rows = (await session.execute(select(*key_columns, *columns).where(*where))).all()
+    return {_row_key(row._mapping): row for row in rows}
+
+
+async def _upsert_chunk(session, values_list, keyed_on_mul_id):
+    """One INSERT ... ON CONFLICT for rows sharing the same conflict target.
+    Returns `(created, updated, unchanged, {id: components})`, the latter
+    only for rows whose components text is new or changed."""
+    max_id_before = (await session.execute(select(func.max(MechCatalogEntry.id)))).scalar() or 0
+    track_components = "components" in values_list[0]
+    previous = (
+        await _existing_rows(session, values_list, keyed_on_mul_id, MechCatalogEntry.components)
+        if track_components
+        else {}
+    )
+
+    # Executed "executemany"-style with the rows as parameters: SQLAlchemy
+    # batches them into multi-row VALUES itself (insertmanyvalues) while the
+    # statement compiles once and stays cached across chunks.
+    stmt = insert(MechCatalogEntry.__table__)
+    update_columns = {
+        column: stmt.excluded[column] for column in values_list[0] if column not in ("mul_id", "chassis", "model")
+    }
+    if keyed_on_mul_id:
+        update_columns["chassis"] = stmt.excluded.chassis
+        update_columns["model"] = stmt.excluded.model
+        conflict_target = {"index_elements": [MechCatalogEntry.mul_id]}
+    else:
+        conflict_target = {
+            "index_elements": [MechCatalogEntry.chassis, MechCatalogEntry.model],
+            "index_where": MechCatalogEntry.mul_id.is_(None),
+        }
+    # Rows whose content hash is unchanged, or that belong to the MUL export
+    # when this isn't one, are left alone entirely - no write, no updated_at
+    # bump - and so are missing from RETURNING.
+    table = MechCatalogEntry.__table__
+    stmt = stmt.on_conflict_do_update(
+        **conflict_target,
+        set_=update_columns,
+        where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash)
+        & or_(stmt.excluded.source == "mul", table.c.source == stmt.excluded.source),
+    )
+    returned = (
+        await session.execute(
+            stmt.returning(MechCatalogEntry.id, MechCatalogEntry.mul_id, MechCatalogEntry.chassis, MechCatalogEntry.model),
+            values_list,
+        )
+    ).all()
+
+    created = sum(1 for row in returned if row.id > max_id_before)
+    changed_components = {}
+    if track_components:
+        by_key = {_row_key(values): values["components"] for values in values_list}
+        for row in returned:
+            key = _row_key(row._mapping)
+            existing = previous.get(key)
+            if existing is None or existing.components != by_key[key]:
+                changed_components[row.id] = by_key[key]
+    return created, len(returned) - created, len(values_list) - len(returned), changed_components
+
+
+def _dedupe(pending):
+    """Collapse rows sharing a key within a batch - the last occurrence wins.
+    Returns `(with mul_id, without mul_id, number of dropped duplicates)`."""
+    deduped = {}
+    for values in pending:
+        deduped[_row_key(values)] = values
+    with_mul_id = [v for v in deduped.values() if v["mul_id"] is not None]
+    without_mul_id = [v for v in deduped.values() if v["mul_id"] is None]
+    return with_mul_id, without_mul_id, len(pending) - len(deduped)
+
+
+def _chunks(values_list):
+    for i in range(0, len(values_list), CHUNK_SIZE):
+        yield values_list[i:i + CHUNK_SIZE]
+
+
+async def bulk_upsert_catalog_rows(session, values_iter, pool=None, source="mul"):
+    """Upsert normalized catalog rows (dicts of `mech_catalog` column values,
+    all with the same keys - see `normalize_catalog_row`) from `source`.
+    Columns not present in the dicts are left untouched on existing rows.
+    Runs inside the caller's transaction and returns `(created, updated,
+    unchanged)`. `pool` is the import's `ImportPool`, for the components
+    parse."""
+    created = updated = unchanged = 0
+    pending = []
+    components_by_id = {}
+
+    async def flush_pending():
+        nonlocal created, updated, unchanged
+        with_mul_id, without_mul_id, duplicates = _dedupe(pending)
+        # A dropped duplicate counts as an update of the row its surviving
+        # occurrence created/updated.
+        updated += duplicates
+        now = datetime.now(timezone.utc).isoformat()
+        for values_list, keyed_on_mul_id in ((with_mul_id, True), (without_mul_id, False)):
+            if not values_list:
+                continue
+            values_list = [
+                {**v, "source": source, "content_hash": content_hash(v), "updated_at": now} for v in values_list
+            ]
+            chunk_created, chunk_updated, chunk_unchanged, chunk_components = await _upsert_chunk(
+                session, values_list, keyed_on_mul_id
+            )
+            created += chunk_created
+            updated += chunk_updated
+            unchanged += chunk_unchanged
+            components_by_id.update(chunk_components)
+        pending.clear()
+
+    async def flush_components():
+        await replace_components(session, components_by_id, pool)
+        components_by_id.clear()
+
+    for values in values_iter:
+        pending.append(values)
+        if len(pending) >= CHUNK_SIZE:
+            await flush_pending()
+            if len(components_by_id) >= COMPONENTS_BATCH_SIZE:
+                await flush_components()
+    if pending:
+        await flush_pending()
+    await flush_components()
+    return created, updated, unchanged
+
+
+def _camel(column):
+    head, *rest = column.split("_")
+    return head + "".join(word.capitalize() for word in rest)
+
+
+def _diff_entry(values):
+    return {"mulId": values["mul_id"], "chassis": values["chassis"], "model": values["model"]}
+
+
+async def diff_catalog_rows(session, values_list, seen=None):
+    """Dry-run counterpart of `bulk_upsert_catalog_rows`: classify rows as
+    created/updated/unchanged without writing anything, deduplicating and
+    counting in the same `CHUNK_SIZE` steps. Returns
+    `(created, updated, unchanged, diff)` where `diff` lists the would-be
+    created rows and, for updated rows, their changed columns as
+    `{column: {"from": ..., "to": ...}}`. `seen` (`{row key: values}`)
+    carries the rows earlier batches of the same stream would have written,
+    so a key repeated across batches is compared with those rather than
+    with the table; it's updated in place."""
+    seen = {} if seen is None else seen
+    created = updated = unchanged = 0
+    diff = {"created": [], "updated": []}
+    content_columns = [
+        column
+        for column in MechCatalogEntry.__table__.c
+        if column.name in values_list[0] and column.name not in ("mul_id", "chassis", "model")
+    ]
+    for pending in _chunks(values_list):
+        with_mul_id, without_mul_id, duplicates = _dedupe(pending)
+        updated += duplicates
+        for group, keyed_on_mul_id in ((with_mul_id, True), (without_mul_id, False)):
+            unseen = [values for values in group if _row_key(values) not in seen]
+            existing = (
+                await _existing_rows(session, unseen, keyed_on_mul_id, MechCatalogEntry.content_hash, *content_columns)
+                if unseen
+                else {}
+            )
+            for values in group:
+                key = _row_key(values)
+                if key in seen:
+                    previous = seen[key]
+                    previous_hash = content_hash(previous)
+                elif key in existing:
+                    previous = existing[key]._mapping
+                    previous_hash = previous["content_hash"]
+                else:
+                    previous = None
+                seen[key] = values
+                if previous is None:
+                    created += 1
+                    diff["created"].append(_diff_entry(values))
+                elif previous_hash == content_hash(values):
+                    unchanged += 1
+                else:
+                    updated += 1
+                    changes = {
+                        _camel(column): {"from": previous[column], "to": value}
+                        for column, value in values.items()
+                        if previous[column] != value
+                    }
+                    diff["updated"].append({**_diff_entry(values), "changes": changes})
+    return created, updated, unchanged, diff
+
+
+async def stream_catalog_import(session, byte_stream, commit=False, dry_run=False, fmt="csv"):
+    """Import a catalog from a binary stream in format `fmt` (see
+    `catalog_parse.catalog_format`), yielding progress dicts
+    (`rows`, `created`, `updated`, `unchanged`, `skipped`, `bytesRead`,
+    `done`) after every batch; the last one has `done: True`. Raises
+    `CatalogImportError` before writing anything if the header is missing
+    required columns. With `dry_run` nothing is written and the progress
+    dicts also carry the would-be `diff` (see `diff_catalog_rows`), capped
+    at `DRY_RUN_DIFF_LIMIT` entries per kind. The caller's stream is left
+    open."""
+    progress = {
+        "rows": 0, "created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "bytesRead": 0, "done": False,
+    }
+    if dry_run:
+        progress["diff"] = {"created": [], "updated": []}
+        seen = {}
+
+    async def write_batch(batch, pool):
+        if dry_run:
+            created, updated, unchanged, diff = await diff_catalog_rows(session, batch, seen)
+            for kind, entries in diff.items():
+                room = DRY_RUN_DIFF_LIMIT - len(progress["diff"][kind])
+                progress["diff"][kind].extend(entries[:room])
+        else:
+            created, updated, unchanged = await bulk_upsert_catalog_rows(session, batch, pool)
+        if commit:
+            # For a dry run this just ends the read transaction, so it
+            # doesn't hold SQLite's shared lock across batches.
+            await session.commit()
+        progress["created"] += created
+        progress["updated"] += updated
+        progress["unchanged"] += unchanged
+
+    with ImportPool(PARSE_WORKERS) as pool:
+        async for parsed in iter_catalog_batches(byte_stream, BATCH_SIZE, fmt=fmt, pool=pool):
+            progress["rows"] += parsed.rows
+            progress["skipped"] += parsed.skipped
+            if parsed.values:
+                await write_batch(parsed.values, pool)
+            progress["bytesRead"] = parsed.bytes_read
+            if not parsed.last:
+                yield dict(progress)
+    progress["done"] = True
+    yield dict(progress)
+
+
+async def run_catalog_import(session, byte_stream, commit=False, dry_run=False, on_progress=None, fmt="csv"):
+    """Drain `stream_catalog_import`, optionally reporting each progress
+    event to `on_progress`, and return the final summary dict."""
+    summary = None
+    async for summary in stream_catalog_import(session, byte_stream, commit=commit, dry_run=dry_run, fmt=fmt):
+        if on_progress is not None:
+            on_progress(summary)
+    return summary
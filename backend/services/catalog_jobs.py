@@ -0,0 +1,345 @@
+"""Background mech catalog import jobs for the Admin upload.
+
+A large MUL export used to be imported inside the upload request, tying up
+the worker and running into proxy timeouts. Instead the upload is streamed
+to a spool file (`MEK_CATALOG_IMPORT_SPOOL_DIR`, default a folder in the
+system temp dir) as uploaded - still compressed for `.csv.gz`/`.zip` -
+its header is checked, and a `catalog_import_jobs` row is
+created and handed to an asyncio task; the endpoint returns the job id
+straight away and the Admin panel polls it.
+
+Jobs go through the shared catalog import queue (services/import_queue.py,
+alongside watched-folder drops) and run through `stream_catalog_import`
+(committing batch by batch); the job row is updated after every batch with rows/bytes
+processed and the running counts, so rate and ETA can be derived while it
+runs. Cancelling is cooperative: the runner stops at the next batch
+boundary, leaving the batches already committed in place (re-importing the
+file later just continues where it left off, since the import is
+idempotent). The job rows are the history and survive restarts; jobs that
+were still queued/running when the process stopped are marked
+`interrupted` on the next start-up.
+
+The same table is the persisted history of every catalog import run:
+watched-folder drops are recorded through `record_run` (source `watcher`),
+and each run keeps the file's SHA-256, its counts, duration and rows/sec.
+`find_imported_checksum` lets the watcher skip a drop whose exact bytes
+were already imported successfully (recorded as `duplicate`).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select, update, func
+
+from database import SessionLocal
+from domain.catalog_logic import validate_header
+from models import CatalogImportJob
+from services.catalog_import import CatalogImportError, catalog_format, stream_catalog_import
+from services.catalog_parse import read_catalog_headers
+from services.catalog_search import get_index
+from services.import_queue import import_queue
+
+logger = logging.getLogger("catalog_import_jobs")
+
+SPOOL_CHUNK_SIZE = 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_HISTORY = 20
+ACTIVE_STATUSES = ("queued", "running")
+
+_cancel_requested = set()
+
+
+def spool_dir():
+    return Path(os.environ.get("MEK_CATALOG_IMPORT_SPOOL_DIR") or Path(tempfile.gettempdir()) / "btforce-catalog-imports")
+
+
+def _spool_path(job_id):
+    return spool_dir() / f"{job_id}.upload"
+
+
+def _queue_key(job_id):
+    return f"admin-job:{job_id}"
+
+
+def new_job_id():
+    return f"import-{uuid.uuid4().hex[:12]}"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _check_headers(path, fmt):
+    with open(path, "rb") as f:
+        for member, fieldnames in read_catalog_headers(f, fmt):
+            if not validate_header(fieldnames):
+                where = f" in {member}" if member else ""
+                raise CatalogImportError(f"Missing required header column(s){where}. Found: {fieldnames}")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _rate(rows, duration_seconds):
+    if not duration_seconds or not rows:
+        return None
+    return round(rows / duration_seconds, 1)
+
+
+def job_to_dict(job):
+    result = {
+        "id": job.id,
+        "filename": job.filename,
+        "source": job.source,
+        "status": job.status,
+        "sha256": job.sha256,
+        "dryRun": job.dry_run,
+        "totalBytes": job.total_bytes,
+        "bytesRead": job.bytes_read,
+        "rows": job.rows,
+        "created": job.created,
+        "updated": job.updated,
+        "unchanged": job.unchanged,
+        "skipped": job.skipped,
+        "error": job.error,
+        "createdAt": job.created_at,
+        "startedAt": job.started_at,
+        "finishedAt": job.finished_at,
+        "durationSeconds": job.duration_seconds,
+        "rowsPerSecond": job.rows_per_second,
+        "etaSeconds": None,
+    }
+    if job.dry_run and job.diff is not None:
+        result["diff"] = job.diff
+    if job.started_at and job.duration_seconds is None:
+        # Still running (or interrupted) - derive the rate from the clock.
+        end = datetime.fromisoformat(job.finished_at) if job.finished_at else datetime.now(timezone.utc)
+        elapsed = (end - datetime.fromisoformat(job.started_at)).total_seconds()
+        if elapsed > 0 and job.rows:
+            result["rowsPerSecond"] = round(job.rows / elapsed, 1)
+        if job.status == "running" and elapsed > 0 and job.bytes_read:
+            remaining_bytes = max(job.total_bytes - job.bytes_read, 0)
+            result["etaSeconds"] = round(remaining_bytes / (job.bytes_read / elapsed), 1)
+    return result
+
+
+async def _update_job(job_id, **values):
+    async with SessionLocal() as session:
+        await session.execute(update(CatalogImportJob).where(CatalogImportJob.id == job_id).values(**values))
+        await session.commit()
+
+
+async def create_job(session, upload, dry_run=False):
+    """Spool `upload` (a FastAPI `UploadFile`), check its header and queue
+    a job for it. Raises `CatalogImportError` for a file that can't be
+    imported at all, and `ImportQueueFull` if the import queue is full."""
+    job_id = new_job_id()
+    fmt = catalog_format(upload.filename) or "csv"
+    path = _spool_path(job_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total_bytes = 0
+    digest = hashlib.sha256()
+    try:
+        with open(path, "wb") as spool:
+            while chunk := await upload.read(SPOOL_CHUNK_SIZE):
+                spool.write(chunk)
+                digest.update(chunk)
+                total_bytes += len(chunk)
+        _check_headers(path, fmt)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+
+    job = CatalogImportJob(
+        id=job_id,
+        filename=upload.filename or "",
+        source="admin",
+        status="queued",
+        sha256=digest.hexdigest(),
+        dry_run=dry_run,
+        total_bytes=total_bytes,
+        bytes_read=0,
+        rows=0,
+        created=0,
+        updated=0,
+        unchanged=0,
+        skipped=0,
+        created_at=_now(),
+    )
+    session.add(job)
+    await session.commit()
+    try:
+        await import_queue.submit(
+            _queue_key(job_id), lambda: _run_job(job_id, dry_run, fmt), source="admin", label=job.filename
+        )
+    except Exception:
+        await session.delete(job)
+        await session.commit()
+        path.unlink(missing_ok=True)
+        raise
+    return job
+
+
+async def _run_job(job_id, dry_run, fmt="csv"):
+    path = _spool_path(job_id)
+    try:
+        if job_id in _cancel_requested:
+            await _update_job(job_id, status="cancelled", finished_at=_now())
+            return
+        await _update_job(job_id, status="running", started_at=_now())
+        started = time.monotonic()
+        status, error, diff, rows = "succeeded", None, None, 0
+        async with SessionLocal() as session:
+            try:
+                with open(path, "rb") as f:
+                    events = stream_catalog_import(session, f, commit=True, dry_run=dry_run, fmt=fmt)
+                    try:
+                        async for progress in events:
+                            diff = progress.get("diff")
+                            rows = progress["rows"]
+                            await _update_job(
+                                job_id,
+                                rows=progress["rows"],
+                                bytes_read=progress["bytesRead"] or 0,
+                                created=progress["created"],
+                                updated=progress["updated"],
+                                unchanged=progress["unchanged"],
+                                skipped=progress["skipped"],
+                            )
+                            if job_id in _cancel_requested and not progress["done"]:
+                                status = "cancelled"
+                                break
+                    finally:
+                        await events.aclose()
+                if status == "succeeded" and not dry_run:
+                    # Rebuild the fuzzy search index now rather than on the next keystroke.
+                    await get_index(session)
+            except Exception as exc:
+                logger.exception("Mech catalog import job %s failed", job_id)
+                await session.rollback()
+                status, error = "failed", f"Failed to import CSV: {exc}"
+        duration = round(time.monotonic() - started, 3)
+        await _update_job(
+            job_id,
+            status=status,
+            error=error,
+            diff=diff,
+            finished_at=_now(),
+            duration_seconds=duration,
+            rows_per_second=_rate(rows, duration),
+        )
+    finally:
+        path.unlink(missing_ok=True)
+        _cancel_requested.discard(job_id)
+
+
+async def get_job(session, job_id):
+    return await session.get(CatalogImportJob, job_id)
+
+
+async def list_jobs(session, limit=MAX_HISTORY, offset=0):
+    """Import runs of every source, newest first."""
+    return (
+        await session.execute(
+            select(CatalogImportJob)
+            .order_by(CatalogImportJob.created_at.desc(), CatalogImportJob.id)
+            .limit(limit)
+            .offset(offset)
+        )
+    ).scalars().all()
+
+
+async def count_jobs(session):
+    return (await session.execute(select(func.count()).select_from(CatalogImportJob))).scalar()
+
+
+async def find_imported_checksum(session, sha256):
+    """The latest successful (non dry-run) import of a file with this
+    SHA-256, or None."""
+    return (
+        await session.execute(
+            select(CatalogImportJob)
+            .where(
+                CatalogImportJob.sha256 == sha256,
+                CatalogImportJob.status == "succeeded",
+                CatalogImportJob.dry_run.is_(False),
+            )
+            .order_by(CatalogImportJob.created_at.desc())
+            .limit(1)
+        )
+    ).scalars().first()
+
+
+def record_run(
+    session, filename, source, sha256, status, total_bytes=0, summary=None, error=None, started_at=None, duration=None
+):
+    """Add a finished import run (one that didn't go through a job) to the
+    history, in the caller's transaction. `summary` is the engine's final
+    progress dict."""
+    summary = summary or {}
+    rows = summary.get("rows", 0)
+    job = CatalogImportJob(
+        id=new_job_id(),
+        filename=filename,
+        source=source,
+        status=status,
+        sha256=sha256,
+        dry_run=False,
+        total_bytes=total_bytes,
+        bytes_read=summary.get("bytesRead") or 0,
+        rows=rows,
+        created=summary.get("created", 0),
+        updated=summary.get("updated", 0),
+        unchanged=summary.get("unchanged", 0),
+        skipped=summary.get("skipped", 0),
+        error=error,
+        created_at=started_at or _now(),
+        started_at=started_at,
+        finished_at=_now(),
+        duration_seconds=duration,
+        rows_per_second=_rate(rows, duration),
+    )
+    session.add(job)
+    return job
+
+
+async def cancel_job(session, job_id):
+    """Request cancellation. A queued job is cancelled right away; a running
+    one stops at its next batch boundary. Returns the job, or None if it
+    doesn't exist; finished jobs are returned unchanged."""
+    job = await session.get(CatalogImportJob, job_id)
+    if job is None or job.status not in ACTIVE_STATUSES:
+        return job
+    _cancel_requested.add(job_id)
+    if job.status == "queued" and await import_queue.cancel(_queue_key(job_id)):
+        # Never started, so the runner won't clean up after it.
+        _cancel_requested.discard(job_id)
+        _spool_path(job_id).unlink(missing_ok=True)
+        job.status = "cancelled"
+        job.finished_at = _now()
+        await session.commit()
+    return job
+
+
+async def mark_interrupted_jobs():
+    """Called on start-up: any job still queued/running belonged to a
+    previous process and will never finish."""
+    async with SessionLocal() as session:
+        await session.execute(
+            update(CatalogImportJob)
+            .where(CatalogImportJob.status.in_(ACTIVE_STATUSES))
+            .values(status="interrupted", error="The server restarted before this import finished.", finished_at=_now())
+        )
+        await session.commit()
+    for path in spool_dir().glob("import-*.upload"):
+        path.unlink(missing_ok=True)
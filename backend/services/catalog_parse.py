@@ -0,0 +1,357 @@
+"""Parse stage of the catalog import engine (services/catalog_import.py).
+
+`iter_catalog_batches` turns a CSV byte stream into batches of normalized
+`mech_catalog` column dicts for the DB writer. Small files (and streams
+that can't report their size) are parsed row by row on the calling thread.
+Large seekable files - a full MUL export with rich columns is several MB
+of pure-Python CSV parsing and int coercion - are split into byte ranges
+of `PARSE_CHUNK_BYTES` that end on record boundaries, parsed by
+`domain.catalog_logic.parse_catalog_chunk` in a process pool of
+`PARSE_WORKERS` workers, and handed back in file order (so later rows for
+the same key still win), with only a few chunks in flight at a time.
+
+Both knobs come from the environment: `MEK_CATALOG_PARSE_WORKERS` (default
+1, which disables the pool) and `MEK_CATALOG_PARSE_CHUNK_BYTES` (default
+1 MiB). The pool is opt-in: spawning workers and shipping chunks back costs
+more than it saves unless there are several idle cores - measure with
+backend/benchmarks/bench_catalog_parse.py before turning it on.
+
+Besides plain CSV (`fmt="csv"`), the stream may be a gzipped CSV
+(`csv.gz`), a zip archive whose `*.csv` members are imported in name order
+(`zip`), or newline-delimited JSON objects keyed like the CSV columns
+(`ndjson`). These are decompressed/decoded incrementally as they are read
+- the expanded file never touches the disk - and parsed row by row; their
+headers (every member's, for a zip) are checked with `validate_header`
+before anything is yielded. `bytesRead` counts bytes of the stream as
+given, i.e. compressed bytes, so progress is measured against the size on
+disk.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import zipfile
+from typing import List, NamedTuple, Optional
+
+from domain.catalog_logic import CATALOG_COLUMNS, normalize_catalog_row, parse_catalog_chunk, validate_header
+from services.process_pool import ImportPool
+
+PARSE_WORKERS = int(os.environ.get("MEK_CATALOG_PARSE_WORKERS") or 1)
+PARSE_CHUNK_BYTES = int(os.environ.get("MEK_CATALOG_PARSE_CHUNK_BYTES") or 1024 * 1024)
+
+# File name suffix -> format, longest first so ".csv.gz" wins over ".gz".
+CATALOG_FORMATS = ((".csv.gz", "csv.gz"), (".csv", "csv"), (".zip", "zip"), (".ndjson", "ndjson"))
+
+
+class CatalogImportError(ValueError):
+    """The CSV can't be imported at all (e.g. missing required columns)."""
+
+
+class ParsedBatch(NamedTuple):
+    rows: int
+    skipped: int
+    values: List[dict]
+    bytes_read: Optional[int]
+    last: bool
+
+
+def catalog_format(filename):
+    """The import format for a file name (`csv`, `csv.gz`, `zip` or
+    `ndjson`), or None if it isn't a catalog file."""
+    name = (filename or "").lower()
+    for suffix, fmt in CATALOG_FORMATS:
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def strip_catalog_suffix(filename):
+    """`filename` without its catalog format suffix ("mul.csv.gz" -> "mul")."""
+    for suffix, _ in CATALOG_FORMATS:
+        if filename.lower().endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def _header_error(fieldnames, member=None):
+    where = f" in {member}" if member else ""
+    return CatalogImportError(f"Missing required header column(s){where}. Found: {fieldnames}")
+
+
+def _stream_size(byte_stream):
+    """Bytes left in a seekable stream, or None."""
+    try:
+        if not byte_stream.seekable():
+            return None
+        position = byte_stream.tell()
+        size = byte_stream.seek(0, io.SEEK_END) - position
+        byte_stream.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _tell(byte_stream):
+    try:
+        return byte_stream.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _record_end(buf, start=0):
+    """Offset just past the first newline at or after `start` that isn't
+    inside a quoted field, or -1. `buf` must start on a record boundary."""
+    end = buf.find(b"\n", start)
+    while end >= 0 and buf.count(b'"', 0, end) % 2:
+        end = buf.find(b"\n", end + 1)
+    return end + 1 if end >= 0 else -1
+
+
+def _last_record_end(buf):
+    """Offset just past the last newline in `buf` that isn't inside a quoted
+    field, or -1. `buf` must start on a record boundary."""
+    end = buf.rfind(b"\n")
+    while end >= 0 and buf.count(b'"', 0, end) % 2:
+        end = buf.rfind(b"\n", 0, end)
+    return end + 1 if end >= 0 else -1
+
+
+def _read_byte_ranges(byte_stream, chunk_bytes):
+    """Yield `(header bytes, None)` once, then `(record bytes, stream
+    offset)` chunks that each hold whole records."""
+    buf = b""
+    header_sent = False
+    eof = False
+    while not eof or buf:
+        if not eof:
+            data = byte_stream.read(chunk_bytes)
+            eof = not data
+            buf += data
+        if not header_sent:
+            end = _record_end(buf)
+            if end < 0 and not eof:
+                continue
+            end = len(buf) if end < 0 else end
+            yield buf[:end], None
+            buf = buf[end:]
+            header_sent = True
+            continue
+        if eof:
+            if buf:
+                yield buf, _tell(byte_stream)
+            buf = b""
+            continue
+        if len(buf) < chunk_bytes:
+            continue
+        end = _last_record_end(buf)
+        if end <= 0:
+            # One record longer than a chunk - keep reading.
+            continue
+        yield buf[:end], _tell(byte_stream) - (len(buf) - end)
+        buf = buf[end:]
+
+
+def _batches(records, batch_size, progress_stream):
+    """Normalize `records` (CSV-style row dicts, or None for a record that
+    couldn't be decoded) into `ParsedBatch`es; the final one has
+    `last=True`."""
+    rows = skipped = 0
+    batch = []
+    for row in records:
+        rows += 1
+        values = normalize_catalog_row(row) if row is not None else None
+        if values is None:
+            skipped += 1
+            continue
+        batch.append(values)
+        if len(batch) >= batch_size:
+            yield ParsedBatch(rows, skipped, batch, _tell(progress_stream), False)
+            rows = skipped = 0
+            batch = []
+    yield ParsedBatch(rows, skipped, batch, _tell(progress_stream), True)
+
+
+def _csv_records(byte_stream, member=None):
+    """A `csv.DictReader` over a CSV byte stream, header already checked."""
+    text_stream = io.TextIOWrapper(byte_stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text_stream)
+        if not validate_header(reader.fieldnames):
+            raise _header_error(reader.fieldnames, member)
+        yield from reader
+    finally:
+        # Don't let the wrapper close the caller's stream.
+        text_stream.detach()
+
+
+def _ndjson_row(line):
+    """One NDJSON line as a CSV-style row dict (values as text, like
+    `csv.DictReader` gives them), or None if it isn't a JSON object."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    return {key: None if value is None else str(value) for key, value in record.items()}
+
+
+def _ndjson_records(byte_stream):
+    """CSV-style row dicts for an NDJSON byte stream; the first object's
+    keys are checked like a CSV header."""
+    text_stream = io.TextIOWrapper(byte_stream, encoding="utf-8-sig")
+    try:
+        lines = (line for line in text_stream if line.strip())
+        first = next(lines, None)
+        row = _ndjson_row(first) if first is not None else None
+        fieldnames = list(row) if row else None
+        if not validate_header(fieldnames):
+            raise _header_error(fieldnames)
+        yield row
+        for line in lines:
+            yield _ndjson_row(line)
+    finally:
+        text_stream.detach()
+
+
+def _zip_members(archive):
+    members = sorted(
+        info.filename
+        for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(".csv") and not info.filename.startswith("__MACOSX/")
+    )
+    if not members:
+        raise CatalogImportError("The zip archive contains no .csv files")
+    return members
+
+
+def _zip_headers(archive):
+    headers = []
+    for member in _zip_members(archive):
+        with archive.open(member) as f:
+            headers.append((member, _first_csv_header(f)))
+    return headers
+
+
+def _zip_records(archive, members):
+    for member in members:
+        with archive.open(member) as f:
+            yield from _csv_records(f, member)
+
+
+def read_catalog_headers(byte_stream, fmt="csv"):
+    """`[(member name or None, fieldnames)]` for every CSV/NDJSON source in
+    the stream - one, or one per `*.csv` member of a zip - reading only as
+    far as each header. Raises `CatalogImportError` for a stream that
+    can't be opened as `fmt`."""
+    try:
+        if fmt == "zip":
+            with zipfile.ZipFile(byte_stream) as archive:
+                return _zip_headers(archive)
+        if fmt == "ndjson":
+            text_stream = io.TextIOWrapper(byte_stream, encoding="utf-8-sig")
+            try:
+                first = next((line for line in text_stream if line.strip()), None)
+            finally:
+                text_stream.detach()
+            row = _ndjson_row(first) if first is not None else None
+            return [(None, list(row) if row else None)]
+        if fmt == "csv.gz":
+            with gzip.GzipFile(fileobj=byte_stream) as f:
+                return [(None, _first_csv_header(f))]
+        return [(None, _first_csv_header(byte_stream))]
+    except (OSError, EOFError, zipfile.BadZipFile, UnicodeDecodeError) as exc:
+        raise CatalogImportError(f"Could not read the file as {fmt}: {exc}")
+
+
+def _first_csv_header(byte_stream):
+    text_stream = io.TextIOWrapper(byte_stream, encoding="utf-8-sig", newline="")
+    try:
+        return next(csv.reader(text_stream), None)
+    finally:
+        text_stream.detach()
+
+
+async def _iter_sequential(byte_stream, batch_size):
+    for batch in _batches(_csv_records(byte_stream), batch_size, byte_stream):
+        yield batch
+
+
+async def _iter_decoded(byte_stream, batch_size, fmt):
+    """Sequential parse of a gzipped CSV, zip archive or NDJSON stream."""
+    try:
+        if fmt == "zip":
+            with zipfile.ZipFile(byte_stream) as archive:
+                headers = _zip_headers(archive)
+                for member, fieldnames in headers:
+                    if not validate_header(fieldnames):
+                        raise _header_error(fieldnames, member)
+                members = [member for member, _ in headers]
+                # The central directory after the last member is never read
+                # by the parse - count it once the last row is in.
+                end = byte_stream.seek(0, io.SEEK_END)
+                for batch in _batches(_zip_records(archive, members), batch_size, byte_stream):
+                    yield batch._replace(bytes_read=end) if batch.last else batch
+        elif fmt == "csv.gz":
+            with gzip.GzipFile(fileobj=byte_stream) as f:
+                for batch in _batches(_csv_records(f), batch_size, byte_stream):
+                    yield batch
+        else:
+            for batch in _batches(_ndjson_records(byte_stream), batch_size, byte_stream):
+                yield batch
+    except (OSError, EOFError, zipfile.BadZipFile, UnicodeDecodeError) as exc:
+        raise CatalogImportError(f"Could not read the file as {fmt}: {exc}")
+
+
+async def _iter_parallel(byte_stream, pool, chunk_bytes):
+    ranges = _read_byte_ranges(byte_stream, chunk_bytes)
+    header, _ = next(ranges, (b"", None))
+    fieldnames = next(csv.reader([header.decode("utf-8-sig")]), None)
+    if not validate_header(fieldnames):
+        raise _header_error(fieldnames)
+
+    in_flight = []
+    exhausted = False
+    while in_flight or not exhausted:
+        # Keep every worker busy plus one chunk queued, and no more, so
+        # memory stays bounded by a handful of chunks.
+        while not exhausted and len(in_flight) <= pool.workers:
+            chunk = next(ranges, None)
+            if chunk is None:
+                exhausted = True
+                break
+            data, bytes_read = chunk
+            in_flight.append((pool.run(parse_catalog_chunk, data, fieldnames), bytes_read))
+        if not in_flight:
+            break
+        future, bytes_read = in_flight.pop(0)
+        rows, skipped, tuples = await future
+        values = [dict(zip(CATALOG_COLUMNS, t)) for t in tuples]
+        yield ParsedBatch(rows, skipped, values, bytes_read, exhausted and not in_flight)
+
+
+async def iter_catalog_batches(byte_stream, batch_size, workers=None, chunk_bytes=None, fmt="csv", pool=None):
+    """Async-iterate `ParsedBatch`es for a catalog byte stream in format
+    `fmt` (see `catalog_format`); the final one has `last=True`. Raises
+    `CatalogImportError` before yielding anything if a header is missing
+    required columns. Large CSVs are parsed in `pool` (the import's
+    `ImportPool`), or in a pool of `workers` of its own."""
+    chunk_bytes = PARSE_CHUNK_BYTES if chunk_bytes is None else chunk_bytes
+    if fmt != "csv":
+        batches = _iter_decoded(byte_stream, batch_size, fmt)
+        async for batch in batches:
+            yield batch
+        return
+    with ImportPool(PARSE_WORKERS if workers is None else workers) as own_pool:
+        pool = own_pool if pool is None else pool
+        size = _stream_size(byte_stream)
+        if pool.enabled and size is not None and size > 2 * chunk_bytes:
+            batches = _iter_parallel(byte_stream, pool, chunk_bytes)
+        else:
+            batches = _iter_sequential(byte_stream, batch_size)
+        try:
+            async for batch in batches:
+                yield batch
+        except UnicodeDecodeError as exc:
+            raise CatalogImportError(f"Could not read the file as {fmt}: {exc}")
@@ -0,0 +1,224 @@
+"""Typo-tolerant fuzzy search over the mech catalog.
+
+The plain `GET /api/mech-catalog?search=...` path is a substring match, so
+"Maurader", "MAD3R" or "Marauder 3R" miss the Marauder MAD-3R entirely.
+This module keeps an in-memory index of normalized chassis/model tokens:
+
+- every catalog row contributes its chassis words, its model split on
+  punctuation and letter/digit boundaries ("MAD-3R" -> "mad", "3r"), and the
+  compact forms of both ("mad3r"), so model codes match however they're typed;
+- unique tokens live in a BK-tree keyed on Levenshtein distance (for typos)
+  plus a sorted list (for per-keystroke prefix matches on the last word).
+
+Each query word must match some token of an entry; entries are ranked by the
+summed distance of their best matches, then by name, and the result set is
+capped by the caller. The index is built once per catalog version: a cheap
+`count(*)/max(updated_at)` signature is checked on each search and the index
+is rebuilt only when an import (admin upload, watched folder or the manual
+script - possibly in another process) has changed the catalog.
+"""
+import asyncio
+import bisect
+import re
+
+from sqlalchemy import select, func
+
+from models import MechCatalogEntry
+
+WORD_CACHE_SIZE = 2048
+
+_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+_ALNUM_BOUNDARY_RE = re.compile(r"[a-z]+|[0-9]+")
+
+
+def normalize_words(text):
+    """Lowercase, drop quotes/apostrophes and split on anything that isn't a
+    letter or digit: "'Wing' Wraith" -> ["wing", "wraith"]."""
+    text = (text or "").lower().replace("'", "").replace('"', "")
+    return [w for w in _SPLIT_RE.split(text) if w]
+
+
+def entry_tokens(chassis, model):
+    tokens = set()
+    chassis_words = normalize_words(chassis)
+    model_words = normalize_words(model)
+    tokens.update(chassis_words)
+    tokens.update(model_words)
+    for word in model_words:
+        tokens.update(_ALNUM_BOUNDARY_RE.findall(word))
+    if len(chassis_words) > 1:
+        tokens.add("".join(chassis_words))
+    if model_words:
+        tokens.add("".join(model_words))
+    return tokens
+
+
+def max_distance(token):
+    """Edit-distance budget per query word - short words must match exactly
+    (or as a prefix), otherwise "3r" would match half the catalog."""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 5:
+        return 1
+    return 2
+
+
+def levenshtein(a, b):
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over unique tokens, for "all tokens within
+    distance d of this word" lookups without scanning the vocabulary."""
+
+    def __init__(self, words=()):
+        self._root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            node_word, children = node
+            distance = levenshtein(word, node_word)
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, radius):
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= radius:
+                found.append((node_word, distance))
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+class CatalogSearchIndex:
+    def __init__(self, entries):
+        """`entries`: iterable of `(id, chassis, model)` tuples."""
+        self.names = {}
+        self.postings = {}
+        for entry_id, chassis, model in entries:
+            self.names[entry_id] = f"{chassis} {model}".lower() if model else (chassis or "").lower()
+            for token in entry_tokens(chassis, model):
+                self.postings.setdefault(token, set()).add(entry_id)
+        self.sorted_tokens = sorted(self.postings)
+        self.tree = BKTree(self.sorted_tokens)
+        # Per-keystroke searches re-send the same leading words; remember
+        # their scores for the lifetime of this (immutable) index.
+        self._word_cache = {}
+
+    def _prefix_matches(self, word):
+        start = bisect.bisect_left(self.sorted_tokens, word)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(word):
+                break
+            yield token
+
+    def _score_word(self, word, allow_prefix):
+        """Best distance per entry id for a single query word."""
+        cache_key = (word, allow_prefix)
+        cached = self._word_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        scores = {}
+        for token, distance in self.tree.search(word, max_distance(word)):
+            for entry_id in self.postings[token]:
+                if distance < scores.get(entry_id, distance + 1):
+                    scores[entry_id] = distance
+        if allow_prefix:
+            # A word still being typed ranks just behind an exact hit.
+            for token in self._prefix_matches(word):
+                if token == word:
+                    continue
+                for entry_id in self.postings[token]:
+                    if 0.5 < scores.get(entry_id, 1):
+                        scores[entry_id] = 0.5
+        if len(self._word_cache) >= WORD_CACHE_SIZE:
+            self._word_cache.clear()
+        self._word_cache[cache_key] = scores
+        return scores
+
+    def search(self, query, limit):
+        """Return up to `limit` entry ids ranked by (total distance, name)."""
+        words = normalize_words(query)
+        if not words:
+            return []
+        totals = None
+        for index, word in enumerate(words):
+            scores = self._score_word(word, allow_prefix=index == len(words) - 1)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {eid: totals[eid] + score for eid, score in scores.items() if eid in totals}
+            if not totals:
+                return []
+        ranked = sorted(totals.items(), key=lambda item: (item[1], len(self.names[item[0]]), self.names[item[0]]))
+        return [entry_id for entry_id, _ in ranked[:limit]]
+
+
+_index = None
+_index_signature = None
+_index_lock = asyncio.Lock()
+
+
+async def catalog_signature(session):
+    row = (
+        await session.execute(select(func.count(MechCatalogEntry.id), func.max(MechCatalogEntry.updated_at)))
+    ).one()
+    return tuple(row)
+
+
+async def get_index(session):
+    """Return the current index, rebuilding it if the catalog changed since
+    it was built."""
+    global _index, _index_signature
+    signature = await catalog_signature(session)
+    if _index is not None and signature == _index_signature:
+        return _index
+    async with _index_lock:
+        if _index is None or signature != _index_signature:
+            rows = (
+                await session.execute(select(MechCatalogEntry.id, MechCatalogEntry.chassis, MechCatalogEntry.model))
+            ).all()
+            # ~0.5s for a full MUL catalog - keep it off the event loop.
+            loop = asyncio.get_running_loop()
+            _index = await loop.run_in_executor(None, CatalogSearchIndex, rows)
+            _index_signature = signature
+    return _index
+
+
+async def fuzzy_search(session, query, limit):
+    """Fuzzy-ranked catalog rows for `query`, at most `limit` of them."""
+    index = await get_index(session)
+    ids = index.search(query, limit)
+    if not ids:
+        return []
+    rows = (await session.execute(select(MechCatalogEntry).where(MechCatalogEntry.id.in_(ids)))).scalars().all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[entry_id] for entry_id in ids if entry_id in by_id]
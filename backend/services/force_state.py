@@ -19,9 +19,13 @@ from models import (
     SpecialAbility,
     ForceSpecialAbility,
     PilotAchievement,
+    PilotKill,
+    PilotStats,
     MissionSpPurchase,
 )
+from domain.achievements_logic import with_kill_stats
 from serializers import force_detail_to_dict, decode_image_data_uri
+from services import pilot_kills, pilot_stats
 
 
 def _resolve_image_fields_for_restore(image_value):
@@ -156,6 +160,8 @@ async def deserialize_force(session, force_id, data):
     if mission_ids:
         await session.execute(delete(MissionSpPurchase).where(MissionSpPurchase.mission_id.in_(mission_ids)))
 
+    await session.execute(delete(PilotKill).where(PilotKill.force_id == force_id))
+    await session.execute(delete(PilotStats).where(PilotStats.force_id == force_id))
     await session.execute(delete(ForceSpecialAbility).where(ForceSpecialAbility.force_id == force_id))
     await session.execute(delete(Mission).where(Mission.force_id == force_id))
     await session.execute(delete(Mech).where(Mech.force_id == force_id))
@@ -205,7 +211,12 @@ async def deserialize_force(session, force_id, data):
             )
         )
 
+    kill_rows = []
     for p in data.get("pilots", []) or []:
+        combat_record = with_kill_stats(p.get("combatRecord"))
+        kill_rows.extend(
+            pilot_kills.kill_values(p["id"], force_id, kill) for kill in (combat_record or {}).get("kills") or []
+        )
         session.add(
             Pilot(
                 id=p["id"],
@@ -218,7 +229,7 @@ async def deserialize_force(session, force_id, data):
                 history=p.get("history", ""),
                 warchest_cost=p.get("warchestCost", 0),
                 activity_log=p.get("activityLog", []) or [],
-                combat_record=p.get("combatRecord"),
+                combat_record=combat_record,
                 achievements=[],
             )
         )
@@ -262,5 +273,8 @@ async def deserialize_force(session, force_id, data):
         if a.get("id") is not None:
             session.add(ForceSpecialAbility(force_id=force_id, ability_id=a["id"]))
 
+    await session.flush()
+    await pilot_kills.add_kills(session, kill_rows)
+    await pilot_stats.refresh(session, [p["id"] for p in data.get("pilots", []) or []])
     await session.commit()
     return await serialize_force(session, force_id)
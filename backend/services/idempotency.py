@@ -0,0 +1,97 @@
+"""`Idempotency-Key` support for the mission and downtime write endpoints.
+
+A retried `POST /missions/{id}/complete` or downtime action used to apply
+twice (debiting the warchest again) or answer 409 although the first call
+had gone through. When the client sends an `Idempotency-Key` header:
+
+- `begin` reserves the key by inserting its `idempotency_keys` row in the
+  endpoint's own transaction, before any work. A concurrent duplicate
+  blocks on SQLite's write lock at that insert and then hits the primary
+  key, so only one of them ever writes.
+- `record` puts the response on that row just before the endpoint's
+  commit, so the key, its response and the write commit together or not
+  at all. A request that fails - with an error, or by the process dying
+  halfway - leaves no key behind, and the retry runs for real.
+- A later request with the same key and the same method, path and body gets
+  the stored response replayed (with an `Idempotent-Replayed: true`
+  header). The same key on a different request is a 422; a key whose first
+  request hasn't stored its response yet is a 409 the client can retry.
+
+Keys expire after `IDEMPOTENCY_KEY_TTL_HOURS` (default 24); expired rows
+are purged as new keys come in.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from models import IdempotencyKey
+
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS") or 24)
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def _fingerprint(request, payload):
+    body = payload.model_dump() if payload is not None else None
+    text = json.dumps([request.method, request.url.path, body], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _cutoff():
+    return (datetime.now(timezone.utc) - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)).isoformat()
+
+
+def _replay(row, fingerprint):
+    if row.fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if row.status_code is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+    return JSONResponse(content=row.response, status_code=row.status_code, headers={REPLAY_HEADER: "true"})
+
+
+async def begin(session, key, request, payload=None):
+    """Reserve `key` for this request in the session's transaction.
+    Returns None to go ahead, or the stored response to return instead."""
+    if key is None:
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+    fingerprint = _fingerprint(request, payload)
+    cutoff = _cutoff()
+    row = await session.get(IdempotencyKey, key)
+    if row is not None:
+        if row.created_at >= cutoff:
+            return _replay(row, fingerprint)
+        await session.delete(row)
+        await session.flush()
+
+    await session.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+    session.add(
+        IdempotencyKey(key=key, fingerprint=fingerprint, created_at=datetime.now(timezone.utc).isoformat())
+    )
+    try:
+        await session.flush()
+    except IntegrityError:
+        # A concurrent request with the same key committed first.
+        await session.rollback()
+        row = await session.get(IdempotencyKey, key, populate_existing=True)
+        return _replay(row, fingerprint)
+    return None
+
+
+async def record(session, key, status_code, body):
+    """Put the response of a request `begin` let through on its key row,
+    to be committed with the endpoint's write. Returns `body`."""
+    if key is None:
+        return body
+    row = await session.get(IdempotencyKey, key)
+    if row is not None:
+        row.status_code = status_code
+        row.response = body
+    return body
@@ -0,0 +1,138 @@
+"""Single ordered queue for mech catalog imports.
+
+Every catalog import that runs inside the app - files dropped into the
+watched folder (watcher.py) and Admin upload jobs (services/catalog_jobs.py)
+- goes through `import_queue`, so imports never fight each other over
+SQLite's single write lock:
+
+- at most `MEK_CATALOG_IMPORT_CONCURRENCY` imports run at once (default 1);
+- at most `MEK_CATALOG_IMPORT_QUEUE_MAX` imports wait (default 50). Past
+  that, `submit(..., wait=True)` (the watcher) waits for room - backpressure
+  rather than an unbounded pile of coroutines - and `wait=False` (Admin
+  uploads) raises `ImportQueueFull`;
+- submitting a key that is already waiting (the same dropped file, say)
+  collapses into the waiting entry instead of queueing it twice.
+
+The queue lives on the app's event loop; `status()` feeds the queued and
+in-flight imports into `watcher.get_status()`.
+"""
+import asyncio
+import collections
+import logging
+import os
+from datetime import datetime, timezone
+
+logger = logging.getLogger("catalog_import_queue")
+
+IMPORT_CONCURRENCY = int(os.environ.get("MEK_CATALOG_IMPORT_CONCURRENCY") or 1)
+IMPORT_QUEUE_MAX = int(os.environ.get("MEK_CATALOG_IMPORT_QUEUE_MAX") or 50)
+
+
+class ImportQueueFull(Exception):
+    pass
+
+
+class QueueEntry:
+    def __init__(self, key, run, source, label, done):
+        self.key = key
+        self.run = run
+        self.source = source
+        self.label = label
+        self.enqueued_at = datetime.now(timezone.utc).isoformat()
+        self.started_at = None
+        # Resolved (with None) once the import has run, or was cancelled.
+        self.done = done
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "source": self.source,
+            "label": self.label,
+            "enqueuedAt": self.enqueued_at,
+            "startedAt": self.started_at,
+        }
+
+
+class ImportQueue:
+    def __init__(self, concurrency=IMPORT_CONCURRENCY, max_depth=IMPORT_QUEUE_MAX):
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+        self._loop = None
+        self._reset()
+
+    def _reset(self):
+        self._pending = collections.OrderedDict()
+        self._in_flight = []
+        self._workers = []
+        self._changed = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        # First use, or the previous loop is gone (e.g. between test runs).
+        self._reset()
+        self._loop = loop
+        self._changed = asyncio.Condition()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def submit(self, key, run, source, label=None, wait=False):
+        """Queue `run` (a coroutine function taking no arguments) under
+        `key`. Returns the `QueueEntry` - an already-waiting one if `key`
+        is queued. Raises `ImportQueueFull` when the queue is at capacity
+        and `wait` is false."""
+        self._ensure_started()
+        async with self._changed:
+            if key in self._pending:
+                return self._pending[key]
+            if len(self._pending) >= self.max_depth:
+                if not wait:
+                    raise ImportQueueFull(f"The import queue is full ({self.max_depth} waiting)")
+                await self._changed.wait_for(lambda: len(self._pending) < self.max_depth or key in self._pending)
+                if key in self._pending:
+                    return self._pending[key]
+            entry = QueueEntry(key, run, source, label, self._loop.create_future())
+            self._pending[key] = entry
+            self._changed.notify_all()
+            return entry
+
+    async def cancel(self, key):
+        """Drop a still-waiting entry. Returns whether one was dropped."""
+        if self._changed is None:
+            return False
+        async with self._changed:
+            entry = self._pending.pop(key, None)
+            if entry is None:
+                return False
+            entry.done.set_result(None)
+            self._changed.notify_all()
+            return True
+
+    async def _worker(self):
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._pending)
+                _, entry = self._pending.popitem(last=False)
+                entry.started_at = datetime.now(timezone.utc).isoformat()
+                self._in_flight.append(entry)
+                # A slot opened up for anyone waiting in submit().
+                self._changed.notify_all()
+            try:
+                await entry.run()
+            except Exception:
+                logger.exception("Queued catalog import %s failed", entry.key)
+            finally:
+                self._in_flight.remove(entry)
+                if not entry.done.done():
+                    entry.done.set_result(None)
+
+    def status(self):
+        return {
+            "concurrency": self.concurrency,
+            "maxDepth": self.max_depth,
+            "inFlight": [entry.to_dict() for entry in self._in_flight],
+            "queued": [entry.to_dict() for entry in self._pending.values()],
+        }
+
+
+import_queue = ImportQueue()
@@ -0,0 +1,45 @@
+"""The mech catalog as an OpFor pool (domain/opfor_logic.py).
+
+Built once per catalog version, like the fuzzy search index: the same
+`count(*)/max(updated_at)` signature (services/catalog_search.py) is
+checked per request and the pool - with its cached per-filter BV arrays -
+is only rebuilt after an import changed the catalog.
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from domain.opfor_logic import OpForPool
+from models import MechCatalogEntry
+from services.catalog_search import catalog_signature
+
+_pool = None
+_pool_signature = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool(session):
+    global _pool, _pool_signature
+    signature = await catalog_signature(session)
+    if _pool is not None and signature == _pool_signature:
+        return _pool
+    async with _pool_lock:
+        if _pool is None or signature != _pool_signature:
+            rows = (
+                await session.execute(
+                    select(
+                        MechCatalogEntry.id,
+                        MechCatalogEntry.mul_id,
+                        MechCatalogEntry.chassis,
+                        MechCatalogEntry.model,
+                        MechCatalogEntry.bv,
+                        MechCatalogEntry.tonnage,
+                        MechCatalogEntry.year,
+                        MechCatalogEntry.techbase,
+                        MechCatalogEntry.role,
+                    )
+                )
+            ).all()
+            _pool = OpForPool(rows)
+            _pool_signature = signature
+    return _pool
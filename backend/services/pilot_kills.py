@@ -0,0 +1,45 @@
+"""The `pilot_kills` table, kept in step with pilots' combat records.
+
+`Pilot.combat_record["kills"]` remains what the API reads and writes
+(`pilot_to_dict`, the frontend's `addKill`); `pilot_kills` mirrors it one row
+per kill, indexed by pilot, force, mission and weight class, for questions
+across pilots ("most assault kills", "every kill in mission X") that would
+otherwise parse every pilot's JSON.
+
+Every write of a combat record goes through here: mission completion adds
+the kills it appends (`add_kills`), pilot create/update and snapshot
+restores replace the pilot's rows from the record they store
+(`replace_pilot_kills`), and pilot/force deletes remove them.
+"""
+from sqlalchemy import delete, insert
+
+from domain.achievements_logic import get_weight_class
+from models import PilotKill
+
+
+def kill_values(pilot_id, force_id, kill):
+    tonnage = kill.get("tonnage") or 0
+    return {
+        "pilot_id": pilot_id,
+        "force_id": force_id,
+        "mission": kill.get("mission"),
+        "date": kill.get("date"),
+        "mech_model": kill.get("mechModel") or "",
+        "tonnage": tonnage,
+        "weight_class": get_weight_class(tonnage),
+    }
+
+
+async def add_kills(session, rows):
+    """Bulk-insert `kill_values` rows in the caller's transaction."""
+    if rows:
+        await session.execute(insert(PilotKill), rows)
+
+
+async def replace_pilot_kills(session, pilot_id, force_id, combat_record, existing=True):
+    """Make the pilot's rows match `combat_record`. `existing=False` skips
+    the delete for a pilot that can't have rows yet."""
+    if existing:
+        await session.execute(delete(PilotKill).where(PilotKill.pilot_id == pilot_id))
+    kills = (combat_record or {}).get("kills") or []
+    await add_kills(session, [kill_values(pilot_id, force_id, kill) for kill in kills])
@@ -0,0 +1,87 @@
+"""The `pilot_stats` leaderboard rollup (routers/leaderboards.py).
+
+One row per pilot with its kill totals (from `pilot_kills`), mission
+counters (from the combat record) and achievement count (from
+`pilot_achievements`), so the leaderboard reads a few thousand narrow rows
+instead of grouping every kill on each request.
+
+`refresh` recomputes the rows of the given pilots from those sources in
+the caller's transaction - with aggregate queries restricted to those
+pilots - and is called wherever one of them changes: mission completion,
+pilot create/update, snapshot restores, manual achievement awards, the
+achievement backfill and definition deletes. Pilot and force deletes drop
+the rows along with the pilots.
+"""
+from sqlalchemy import case, delete, func, insert, select
+
+from models import Pilot, PilotAchievement, PilotKill, PilotStats
+
+WEIGHT_CLASSES = ("light", "medium", "heavy", "assault")
+# Chunked to stay well under SQLite's bound-parameter limit.
+REFRESH_CHUNK_SIZE = 500
+
+_COLUMNS = [
+    "pilot_id",
+    "force_id",
+    "kills",
+    "tonnage_destroyed",
+    "max_tonnage_kill",
+    *(f"{weight_class}_kills" for weight_class in WEIGHT_CLASSES),
+    "missions_completed",
+    "missions_without_injury",
+    "achievements",
+]
+
+
+async def refresh(session, pilot_ids):
+    """Recompute the `pilot_stats` rows of `pilot_ids` (flushing pending
+    ORM changes first). Ids of pilots that no longer exist just lose their
+    row."""
+    pilot_ids = sorted(set(pilot_ids))
+    if not pilot_ids:
+        return
+    await session.flush()
+    for start in range(0, len(pilot_ids), REFRESH_CHUNK_SIZE):
+        chunk = pilot_ids[start:start + REFRESH_CHUNK_SIZE]
+        await session.execute(delete(PilotStats).where(PilotStats.pilot_id.in_(chunk)))
+        await session.execute(insert(PilotStats).from_select(_COLUMNS, _rollup(chunk)))
+
+
+def _rollup(pilot_ids):
+    kills = (
+        select(
+            PilotKill.pilot_id,
+            func.count().label("kills"),
+            func.sum(PilotKill.tonnage).label("tonnage"),
+            func.max(PilotKill.tonnage).label("max_tonnage"),
+            *(
+                func.sum(case((PilotKill.weight_class == weight_class, 1), else_=0)).label(weight_class)
+                for weight_class in WEIGHT_CLASSES
+            ),
+        )
+        .where(PilotKill.pilot_id.in_(pilot_ids))
+        .group_by(PilotKill.pilot_id)
+        .subquery()
+    )
+    achievements = (
+        select(PilotAchievement.pilot_id, func.count().label("count"))
+        .where(PilotAchievement.pilot_id.in_(pilot_ids))
+        .group_by(PilotAchievement.pilot_id)
+        .subquery()
+    )
+    return (
+        select(
+            Pilot.id,
+            Pilot.force_id,
+            func.coalesce(kills.c.kills, 0),
+            func.coalesce(kills.c.tonnage, 0),
+            func.coalesce(kills.c.max_tonnage, 0),
+            *(func.coalesce(kills.c[weight_class], 0) for weight_class in WEIGHT_CLASSES),
+            func.coalesce(Pilot.combat_record["missionsCompleted"].as_integer(), 0),
+            func.coalesce(Pilot.combat_record["missionsWithoutInjury"].as_integer(), 0),
+            func.coalesce(achievements.c.count, 0),
+        )
+        .outerjoin(kills, kills.c.pilot_id == Pilot.id)
+        .outerjoin(achievements, achievements.c.pilot_id == Pilot.id)
+        .where(Pilot.id.in_(pilot_ids))
+    )
@@ -0,0 +1,48 @@
+"""The process pool behind the catalog importers' CPU-bound parsing.
+
+One `ImportPool` serves a whole import: CSV byte ranges
+(services/catalog_parse.py), `components` texts
+(services/catalog_components.py) and unit files
+(services/unitfile_import.py) all go to the same workers, instead of each
+stage - or each batch - spawning its own. The workers are only started on
+first use, since most imports are small enough never to need them, and are
+shut down when the import ends. A pool of one worker is disabled: callers
+check `enabled` and parse on their own thread.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ImportPool:
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+
+    @property
+    def enabled(self):
+        return self.workers > 1
+
+    def run(self, fn, *args):
+        """`fn(*args)` in a worker, as an awaitable."""
+        if self._executor is None:
+            # spawn, not fork: the app process runs watchdog/executor threads.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def map(self, fn, chunks):
+        """`[fn(chunk) for chunk in chunks]`, spread over the workers."""
+        return await asyncio.gather(*(self.run(fn, chunk) for chunk in chunks))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
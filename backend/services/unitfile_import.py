@@ -0,0 +1,150 @@
+"""Import a MegaMek unit-file tree (`.mtf`/`.blk`) into the mech catalog.
+
+`scan_unit_directory` walks a directory, parses the unit files
+(domain/unitfile_logic.py) and feeds them through the same set-based
+upsert as the CSV importers (`bulk_upsert_catalog_rows` in
+services/catalog_import.py) as source `unit_file`: they add the units the
+MUL export doesn't have and keep those up to date, but never overwrite a
+row a MUL import wrote (those count as unchanged). `bv` isn't in unit
+files; new rows get 0.
+
+Re-scans are incremental: `unit_file_states` remembers each file's size,
+mtime and SHA-256. Files whose size/mtime match are skipped without being
+opened; files that were touched but hash the same are only re-stamped.
+Only the rest are upserted, and the row-level `content_hash` check then
+skips rows whose parsed values didn't change either. Big scans (a full
+MegaMek mechfiles tree is thousands of files) are read and parsed in a
+process pool of `PARSE_WORKERS` (`MEK_CATALOG_PARSE_WORKERS`), in chunks of
+`FILES_PER_TASK` files, and written in batches of `FILES_PER_BATCH`.
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from domain.unitfile_logic import UNIT_FILE_COLUMNS, read_unit_files
+from models import UnitFileState
+from services.catalog_import import bulk_upsert_catalog_rows
+from services.catalog_parse import PARSE_WORKERS
+from services.process_pool import ImportPool
+
+UNIT_FILE_SUFFIXES = (".mtf", ".blk")
+PROCESS_POOL_MIN_FILES = 200
+FILES_PER_TASK = 100
+FILES_PER_BATCH = 1000
+ERROR_LIMIT = 100
+
+
+def _walk(root):
+    """`{resolved path: (size, mtime_ns)}` for the unit files under `root`."""
+    found = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(UNIT_FILE_SUFFIXES):
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+async def _read_all(paths, pool):
+    if pool is None:
+        return await asyncio.to_thread(read_unit_files, paths)
+    tasks = [paths[i:i + FILES_PER_TASK] for i in range(0, len(paths), FILES_PER_TASK)]
+    results = await pool.map(read_unit_files, tasks)
+    return [result for chunk in results for result in chunk]
+
+
+async def _save_states(session, states):
+    if not states:
+        return
+    stmt = insert(UnitFileState)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UnitFileState.path],
+            set_={column: stmt.excluded[column] for column in ("size", "mtime_ns", "sha256", "scanned_at")},
+        ),
+        states,
+    )
+
+
+async def scan_unit_directory(session, root, commit=False, workers=None):
+    """Import the unit files under `root`. Runs inside the caller's
+    transaction unless `commit` is set (then each batch is committed as it
+    lands). Returns a summary dict: file counts (`files`, `unchangedFiles`,
+    `parsedFiles`, `removedFiles`), row counts (`created`, `updated`,
+    `unchanged`) and up to `ERROR_LIMIT` `errors` as `{path, error}`."""
+    root = Path(root).resolve()
+    if not root.is_dir():
+        raise NotADirectoryError(f"Not a directory: {root}")
+    workers = PARSE_WORKERS if workers is None else workers
+    found = await asyncio.to_thread(_walk, str(root))
+
+    prefix = str(root) + os.sep
+    known = {
+        state.path: state
+        for state in (
+            await session.execute(select(UnitFileState).where(UnitFileState.path.startswith(prefix, autoescape=True)))
+        ).scalars()
+    }
+    changed = sorted(
+        path
+        for path, (size, mtime_ns) in found.items()
+        if path not in known or (known[path].size, known[path].mtime_ns) != (size, mtime_ns)
+    )
+    summary = {
+        "files": len(found),
+        "unchangedFiles": len(found) - len(changed),
+        "parsedFiles": 0,
+        "removedFiles": 0,
+        "created": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "errors": [],
+    }
+
+    with ImportPool(workers) as pool:
+        use_pool = pool.enabled and len(changed) >= PROCESS_POOL_MIN_FILES
+        for start in range(0, len(changed), FILES_PER_BATCH):
+            batch = changed[start:start + FILES_PER_BATCH]
+            results = await _read_all(batch, pool if use_pool else None)
+            now = datetime.now(timezone.utc).isoformat()
+            values_list = []
+            states = []
+            for path, (sha256, row, error) in zip(batch, results):
+                if sha256 is None:
+                    # Unreadable - no state, so the next scan retries it.
+                    summary["errors"].append({"path": path, "error": error})
+                    continue
+                size, mtime_ns = found[path]
+                states.append({"path": path, "size": size, "mtime_ns": mtime_ns, "sha256": sha256, "scanned_at": now})
+                if path in known and known[path].sha256 == sha256:
+                    summary["unchangedFiles"] += 1
+                    continue
+                summary["parsedFiles"] += 1
+                if row is None:
+                    summary["errors"].append({"path": path, "error": error})
+                    continue
+                values_list.append(dict(zip(UNIT_FILE_COLUMNS, row)))
+
+            created, updated, unchanged = await bulk_upsert_catalog_rows(
+                session, values_list, pool, source="unit_file"
+            )
+            summary["created"] += created
+            summary["updated"] += updated
+            summary["unchanged"] += unchanged
+            await _save_states(session, states)
+            if commit:
+                await session.commit()
+
+    removed = [path for path in known if path not in found]
+    for start in range(0, len(removed), FILES_PER_BATCH):
+        await session.execute(delete(UnitFileState).where(UnitFileState.path.in_(removed[start:start + FILES_PER_BATCH])))
+    summary["removedFiles"] = len(removed)
+    if commit:
+        await session.commit()
+    del summary["errors"][ERROR_LIMIT:]
+    return summary
@@ -0,0 +1,34 @@
+"""Atomic warchest updates.
+
+Every write path that spends or earns WP used to read the force, compute
+`current_warchest +/- amount` in Python and write it back on commit, so two
+concurrent requests for the same force could both read the old balance and
+one of the changes was lost. `adjust_warchest` applies the change in SQL
+instead - `UPDATE forces SET current_warchest = current_warchest + :delta
+... RETURNING current_warchest` - inside the caller's transaction, and
+puts the returned balance on the loaded `Force` without marking it dirty,
+so the response shows the real balance and the commit doesn't write a
+stale one back.
+
+Absolute sets (editing the warchest on the force itself, restoring a
+snapshot) still go through the ORM - they're meant to overwrite.
+"""
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import Force
+
+
+async def adjust_warchest(session, force, delta):
+    """Add `delta` (negative to spend) to `force`'s warchest. Returns the
+    new balance."""
+    balance = (
+        await session.execute(
+            update(Force.__table__)
+            .where(Force.__table__.c.id == force.id)
+            .values(current_warchest=Force.__table__.c.current_warchest + delta)
+            .returning(Force.__table__.c.current_warchest)
+        )
+    ).scalar_one()
+    set_committed_value(force, "current_warchest", balance)
+    return balance
@@ -0,0 +1,208 @@
+import asyncio
+import random
+import time
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from server import app
+from database import SessionLocal
+from domain.achievements_logic import (
+    CompiledAchievements,
+    add_kill,
+    check_achievements,
+    check_condition,
+    compile_condition,
+    compute_combat_stats,
+    compute_kill_stats,
+    record_mission_completion,
+)
+from services import achievement_rules
+
+
+STATS = {"killCount": 3, "assists": 0, "missionsCompleted": 5, "maxTonnageKill": 80}
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        ("killCount >= 3", True),
+        ("killCount > 3", False),
+        ("killCount<=3", True),
+        ("killCount < 3", False),
+        ("killCount === 3", True),
+        ("missionsCompleted >= 5 && maxTonnageKill >= 80", True),
+        ("missionsCompleted >= 5 && maxTonnageKill > 80", False),
+        ("unknownStat === 0", True),
+        ("unknownStat >= 1", False),
+        ("killCount >= 1 && garbage", False),
+        ("killCount == 3", False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_compiled_conditions(condition, expected):
+    assert compile_condition(condition)(STATS) is expected
+    assert check_condition(condition, STATS) is expected
+
+
+def test_compiled_achievements_match_check_achievements():
+    definitions = [
+        {"id": "first-blood", "name": "First Blood", "icon": "", "description": "", "condition": "killCount >= 1"},
+        {"id": "ace", "name": "Ace", "icon": "", "description": "", "condition": "killCount >= 5"},
+        {"id": "giant", "name": "Giant Killer", "icon": "", "description": "", "condition": "assaultKills >= 1"},
+        {"id": "broken", "name": "Broken", "icon": "", "description": "", "condition": "killCount >> 1"},
+    ]
+    record = {"kills": [{"tonnage": 85}, {"tonnage": 30}], "assists": 1, "missionsCompleted": 2}
+    compiled = CompiledAchievements(definitions)
+    assert compiled.earned_ids(record) == check_achievements(record, definitions) == ["first-blood", "giant"]
+    assert compiled.definitions_by_id["ace"]["name"] == "Ace"
+
+
+async def _wait_for_backfill(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = (await client.get(f"/api/admin/achievement-backfills/{job_id}")).json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        assert time.monotonic() < deadline, f"backfill job {job_id} did not finish in time"
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_admin_achievement_writes_invalidate_the_compiled_rules():
+    transport = ASGITransport(app=app)
+    achievement_id = "test-compiled-rules"
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete(f"/api/admin/achievement-definitions/{achievement_id}")
+        record = {"kills": [{"tonnage": 50}], "missionsCompleted": 1}
+        try:
+            async with SessionLocal() as session:
+                assert achievement_id not in (await achievement_rules.get_rules(session)).earned_ids(record)
+
+            resp = await client.post(
+                "/api/admin/achievement-definitions",
+                json={"id": achievement_id, "name": "Compiled", "condition": "mediumKills >= 1"},
+            )
+            assert resp.status_code == 201
+            await _wait_for_backfill(client, resp.json()["backfillJobId"])
+            async with SessionLocal() as session:
+                rules = await achievement_rules.get_rules(session)
+                assert achievement_id in rules.earned_ids(record)
+                assert await achievement_rules.get_rules(session) is rules
+
+            resp = await client.put(
+                f"/api/admin/achievement-definitions/{achievement_id}", json={"condition": "mediumKills >= 2"}
+            )
+            assert resp.status_code == 200
+            await _wait_for_backfill(client, resp.json()["backfillJobId"])
+            async with SessionLocal() as session:
+                assert achievement_id not in (await achievement_rules.get_rules(session)).earned_ids(record)
+        finally:
+            resp = await client.delete(f"/api/admin/achievement-definitions/{achievement_id}")
+        assert resp.status_code == 204
+        async with SessionLocal() as session:
+            assert achievement_id not in (await achievement_rules.get_rules(session)).definitions_by_id
+
+
+def test_add_kill_keeps_kill_stats_in_step_with_the_kills():
+    rng = random.Random(3)
+    record = None
+    for _ in range(200):
+        record = add_kill(record, {"mechModel": "X", "tonnage": rng.choice(range(0, 105, 5))})
+        if rng.random() < 0.2:
+            record = record_mission_completion(record, rng.random() < 0.5)
+    assert record["killStats"] == compute_kill_stats(record["kills"])
+    assert record["killStats"]["killCount"] == 200
+
+
+def test_combat_stats_use_kill_stats_without_walking_the_kills():
+    record = add_kill(add_kill(None, {"tonnage": 85}), {"tonnage": 30})
+    # Kills the stats already account for are never looked at.
+    walked = {**record, "kills": [None, None]}
+    stats = compute_combat_stats(walked)
+    assert stats["assaultKills"] == 1 and stats["lightKills"] == 1 and stats["maxTonnageKill"] == 85
+
+    # Records without stats, or with stats that no longer match the kill
+    # count (the frontend appending a kill), are recomputed.
+    legacy = {"kills": [{"tonnage": 50}]}
+    assert compute_combat_stats(legacy)["mediumKills"] == 1
+    stale = {**record, "kills": record["kills"] + [{"tonnage": 100}]}
+    assert compute_combat_stats(stale)["assaultKills"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pilot_writes_recompute_client_kill_stats():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        force = (await client.post("/api/forces", json={"name": "Kill Stats Test"})).json()
+        try:
+            bogus = {"kills": [{"tonnage": 90}], "killStats": {"killCount": 1, "lightKills": 1}}
+            pilot = (
+                await client.post(f"/api/forces/{force['id']}/pilots", json={"name": "Stats", "combatRecord": bogus})
+            ).json()
+            assert pilot["combatRecord"]["killStats"] == compute_kill_stats([{"tonnage": 90}])
+
+            edited = {**pilot["combatRecord"], "kills": [{"tonnage": 25}]}
+            resp = await client.put(f"/api/pilots/{pilot['id']}", json={"combatRecord": edited})
+            assert resp.json()["combatRecord"]["killStats"] == compute_kill_stats([{"tonnage": 25}])
+        finally:
+            await client.delete(f"/api/forces/{force['id']}")
+
+
+@pytest.mark.asyncio
+async def test_new_and_edited_definitions_are_backfilled_for_existing_pilots():
+    transport = ASGITransport(app=app)
+    achievement_id = "test-backfill"
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete(f"/api/admin/achievement-definitions/{achievement_id}")
+        force = (
+            await client.post("/api/forces", json={"name": "Backfill Test", "currentDate": "3052-01-01"})
+        ).json()
+        try:
+            record = {"kills": [{"tonnage": 45}, {"tonnage": 50}], "missionsCompleted": 2}
+            veteran = (
+                await client.post(f"/api/forces/{force['id']}/pilots", json={"name": "Vet", "combatRecord": record})
+            ).json()
+            rookie = (await client.post(f"/api/forces/{force['id']}/pilots", json={"name": "Rookie"})).json()
+
+            resp = await client.post(
+                "/api/admin/achievement-definitions",
+                json={"id": achievement_id, "name": "Backfilled", "condition": "mediumKills >= 2"},
+            )
+            job = await _wait_for_backfill(client, resp.json()["backfillJobId"])
+            assert job["status"] == "succeeded"
+            assert job["achievementIds"] == [achievement_id]
+            assert job["pilotsProcessed"] == job["totalPilots"] > 0
+            assert job["awarded"] >= 1
+
+            links = (await client.get(f"/api/pilots/{veteran['id']}/achievements")).json()
+            assert [(l["achievementId"], l["earnedAt"]) for l in links] == [(achievement_id, "3052-01-01")]
+            assert (await client.get(f"/api/pilots/{rookie['id']}/achievements")).json() == []
+
+            # Re-running awards nothing twice.
+            resp = await client.post(
+                "/api/admin/achievement-definitions/reevaluate", json={"achievementIds": [achievement_id]}
+            )
+            assert resp.status_code == 202
+            job = await _wait_for_backfill(client, resp.json()["id"])
+            assert job["status"] == "succeeded" and job["awarded"] == 0
+            assert len((await client.get(f"/api/pilots/{veteran['id']}/achievements")).json()) == 1
+
+            # Only condition edits queue a job; loosening it reaches the rookie once they have a record.
+            resp = await client.put(f"/api/admin/achievement-definitions/{achievement_id}", json={"name": "Renamed"})
+            assert "backfillJobId" not in resp.json()
+            await client.put(f"/api/pilots/{rookie['id']}", json={"combatRecord": {"kills": [{"tonnage": 40}]}})
+            resp = await client.put(
+                f"/api/admin/achievement-definitions/{achievement_id}", json={"condition": "mediumKills >= 1"}
+            )
+            job = await _wait_for_backfill(client, resp.json()["backfillJobId"])
+            assert job["awarded"] >= 1
+            assert len((await client.get(f"/api/pilots/{rookie['id']}/achievements")).json()) == 1
+
+            history = (await client.get("/api/admin/achievement-backfills")).json()
+            assert history[0]["id"] == job["id"]
+            assert (await client.get("/api/admin/achievement-backfills/nope")).status_code == 404
+        finally:
+            await client.delete(f"/api/admin/achievement-definitions/{achievement_id}")
+            await client.delete(f"/api/forces/{force['id']}")
@@ -0,0 +1,153 @@
+import asyncio
+import uuid
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete
+
+from server import app
+from database import SessionLocal
+from models import IdempotencyKey
+from routers import downtime
+from services import idempotency
+
+TEST_FORCE_ID = "test-idempotency"
+
+
+def _key():
+    return f"test-{uuid.uuid4().hex}"
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete(f"/api/forces/{TEST_FORCE_ID}")
+        await client.post(
+            "/api/forces",
+            json={"id": TEST_FORCE_ID, "name": "Idempotency Test", "startingWarchest": 500, "wpMultiplier": 5},
+        )
+        yield client
+        await client.delete(f"/api/forces/{TEST_FORCE_ID}")
+    async with SessionLocal() as session:
+        await session.execute(delete(IdempotencyKey).where(IdempotencyKey.key.startswith("test-")))
+        await session.commit()
+
+
+async def _warchest(client):
+    return (await client.get(f"/api/forces/{TEST_FORCE_ID}")).json()["currentWarchest"]
+
+
+async def _pilot(client):
+    resp = await client.post(f"/api/forces/{TEST_FORCE_ID}/pilots", json={"name": "Rookie", "injuries": 2})
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_retried_downtime_action_is_replayed_not_reapplied(client):
+    pilot_id = await _pilot(client)
+    key = _key()
+    url = f"/api/pilots/{pilot_id}/downtime"
+
+    first = await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    retry = await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert await _warchest(client) == 500 - first.json()["cost"]
+    assert first.json()["pilot"]["gunnery"] == 3
+
+    other = await client.post(url, json={"actionId": "heal-injury"}, headers={"Idempotency-Key": key})
+    assert other.status_code == 422
+
+    # Without a key every call applies.
+    await client.post(url, json={"actionId": "train-gunnery"})
+    assert await _warchest(client) == 500 - 2 * first.json()["cost"]
+
+
+@pytest.mark.asyncio
+async def test_retried_mission_completion_replays_instead_of_409(client):
+    resp = await client.post(f"/api/forces/{TEST_FORCE_ID}/missions", json={"name": "Raid", "cost": 50})
+    mission_id = resp.json()["id"]
+    completion = {"recap": "Done", "objectives": [{"title": "Win", "wpReward": 100, "achieved": True}]}
+    key = _key()
+
+    url = f"/api/missions/{mission_id}/complete"
+    first = await client.post(url, json=completion, headers={"Idempotency-Key": key})
+    retry = await client.post(url, json=completion, headers={"Idempotency-Key": key})
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert await _warchest(client) == 500 - 50 + 100
+
+    resp = await client.post(url, json=completion)
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_failed_request_does_not_consume_the_key(client):
+    key = _key()
+    resp = await client.post(
+        "/api/pilots/no-such-pilot/downtime", json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key}
+    )
+    assert resp.status_code == 404
+    async with SessionLocal() as session:
+        assert await session.get(IdempotencyKey, key) is None
+
+
+@pytest.mark.asyncio
+async def test_failure_after_the_write_leaves_neither_write_nor_key(client, monkeypatch):
+    pilot_id = await _pilot(client)
+    key = _key()
+    url = f"/api/pilots/{pilot_id}/downtime"
+
+    def broken_pilot_to_dict(*args, **kwargs):
+        raise RuntimeError("response failed")
+
+    # Fails after the warchest UPDATE and before the response is stored.
+    monkeypatch.setattr(downtime, "pilot_to_dict", broken_pilot_to_dict)
+    with pytest.raises(RuntimeError):
+        await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    monkeypatch.undo()
+    assert await _warchest(client) == 500
+    async with SessionLocal() as session:
+        assert await session.get(IdempotencyKey, key) is None
+
+    retry = await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert await _warchest(client) == 500 - retry.json()["cost"]
+    again = await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    assert again.headers["Idempotent-Replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_apply_once(client):
+    pilot_id = await _pilot(client)
+    key = _key()
+    url = f"/api/pilots/{pilot_id}/downtime"
+    responses = await asyncio.gather(
+        *(
+            client.post(url, json={"actionId": "train-piloting"}, headers={"Idempotency-Key": key})
+            for _ in range(5)
+        )
+    )
+    assert {resp.status_code for resp in responses} <= {200, 409}
+    applied = [resp for resp in responses if resp.status_code == 200 and "Idempotent-Replayed" not in resp.headers]
+    assert len(applied) == 1
+    assert await _warchest(client) == 500 - applied[0].json()["cost"]
+
+
+@pytest.mark.asyncio
+async def test_expired_key_applies_again(client, monkeypatch):
+    pilot_id = await _pilot(client)
+    key = _key()
+    url = f"/api/pilots/{pilot_id}/downtime"
+    first = await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_KEY_TTL_HOURS", 0)
+    again = await client.post(url, json={"actionId": "train-gunnery"}, headers={"Idempotency-Key": key})
+    assert again.status_code == 200
+    assert "Idempotent-Replayed" not in again.headers
+    assert await _warchest(client) == 500 - first.json()["cost"] - again.json()["cost"]
@@ -0,0 +1,104 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from server import app
+
+FORCE_A = "test-leaderboard-a"
+FORCE_B = "test-leaderboard-b"
+
+
+def _record(*tonnages, missions=0, without_injury=0):
+    return {
+        "kills": [{"mechModel": "X", "tonnage": tonnage} for tonnage in tonnages],
+        "missionsCompleted": missions,
+        "missionsWithoutInjury": without_injury,
+    }
+
+
+@pytest.mark.asyncio
+async def test_leaderboards_rank_pilots_per_force_and_campaign_wide():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for force_id in (FORCE_A, FORCE_B):
+            await client.delete(f"/api/forces/{force_id}")
+            await client.post("/api/forces", json={"id": force_id, "name": force_id})
+        try:
+
+            async def add_pilot(force_id, name, record):
+                resp = await client.post(f"/api/forces/{force_id}/pilots", json={"name": name, "combatRecord": record})
+                return resp.json()["id"]
+
+            ace = await add_pilot(FORCE_A, "Ace", _record(100, 85, 30, missions=4, without_injury=2))
+            rookie = await add_pilot(FORCE_A, "Rookie", _record(missions=1, without_injury=1))
+            rival = await add_pilot(FORCE_B, "Rival", _record(50, 55, missions=6, without_injury=6))
+            await client.post(f"/api/pilots/{rival}/achievements", json={"achievementId": "first-blood"})
+
+            board = (await client.get("/api/leaderboards", params={"forceId": FORCE_A})).json()
+            items = board["pilots"]["items"]
+            assert [item["pilotId"] for item in items] == [ace, rookie]
+            assert board["pilots"]["total"] == 2
+            assert items[0] == {
+                "rank": 1,
+                "pilotId": ace,
+                "pilotName": "Ace",
+                "forceId": FORCE_A,
+                "forceName": FORCE_A,
+                "kills": 3,
+                "tonnageDestroyed": 215,
+                "maxTonnageKill": 100,
+                "lightKills": 1,
+                "mediumKills": 0,
+                "heavyKills": 0,
+                "assaultKills": 2,
+                "missionsCompleted": 4,
+                "missionsWithoutInjury": 2,
+                "achievements": 0,
+            }
+            assert board["forces"] == [
+                {
+                    "forceId": FORCE_A,
+                    "forceName": FORCE_A,
+                    "pilots": 2,
+                    "kills": 3,
+                    "tonnageDestroyed": 215,
+                    "maxTonnageKill": 100,
+                    "lightKills": 1,
+                    "mediumKills": 0,
+                    "heavyKills": 0,
+                    "assaultKills": 2,
+                    "achievements": 0,
+                }
+            ]
+
+            board = (
+                await client.get("/api/leaderboards", params={"sort": "missionsWithoutInjury", "pageSize": 500})
+            ).json()
+            ours = [item["pilotId"] for item in board["pilots"]["items"] if item["forceId"] in (FORCE_A, FORCE_B)]
+            assert ours == [rival, ace, rookie]
+            rival_row = next(item for item in board["pilots"]["items"] if item["pilotId"] == rival)
+            assert rival_row["achievements"] == 1 and rival_row["mediumKills"] == 2
+            assert {FORCE_A, FORCE_B} <= {force["forceId"] for force in board["forces"]}
+
+            # Paging keeps the ranks going.
+            page = (
+                await client.get("/api/leaderboards", params={"forceId": FORCE_A, "pageSize": 1, "page": 2})
+            ).json()
+            assert [(item["rank"], item["pilotId"]) for item in page["pilots"]["items"]] == [(2, rookie)]
+
+            # The rollup follows pilot writes and deletes.
+            await client.put(f"/api/pilots/{rookie}", json={"combatRecord": _record(100, 100, 100, 100, missions=2)})
+            board = (await client.get("/api/leaderboards", params={"forceId": FORCE_A})).json()
+            assert board["pilots"]["items"][0]["pilotId"] == rookie
+            assert board["pilots"]["items"][0]["assaultKills"] == 4
+            await client.delete(f"/api/pilots/{rookie}")
+            board = (await client.get("/api/leaderboards", params={"forceId": FORCE_A})).json()
+            assert [item["pilotId"] for item in board["pilots"]["items"]] == [ace]
+            assert board["forces"][0]["kills"] == 3
+
+            assert (await client.get("/api/leaderboards", params={"sort": "bogus"})).status_code == 400
+            assert (await client.get("/api/leaderboards", params={"forceId": "nope"})).status_code == 404
+        finally:
+            for force_id in (FORCE_A, FORCE_B):
+                await client.delete(f"/api/forces/{force_id}")
+        board = (await client.get("/api/leaderboards", params={"pageSize": 500})).json()
+        assert not {FORCE_A, FORCE_B} & {item["forceId"] for item in board["pilots"]["items"]}
@@ -0,0 +1,164 @@
+import itertools
+import random
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+
+from server import app
+from database import SessionLocal
+from models import Mech, Pilot, Elemental
+from domain.lineup_optimizer import optimize_lineup
+from domain.missions_logic import (
+    calculate_mission_total_bv,
+    calculate_mission_total_tonnage,
+    is_mech_available_for_mission,
+    is_elemental_available_for_mission,
+)
+
+FORCE_ID = "ghost-bear"
+
+
+async def _load_roster(force_id):
+    async with SessionLocal() as session:
+        mechs = {m.id: m for m in (await session.execute(select(Mech).where(Mech.force_id == force_id))).scalars()}
+        pilots = {p.id: p for p in (await session.execute(select(Pilot).where(Pilot.force_id == force_id))).scalars()}
+        elementals = {
+            e.id: e for e in (await session.execute(select(Elemental).where(Elemental.force_id == force_id))).scalars()
+        }
+    return mechs, pilots, elementals
+
+
+@pytest.mark.asyncio
+async def test_evaluate_lineups_matches_mission_totals():
+    mechs, pilots, elementals = await _load_roster(FORCE_ID)
+    rng = random.Random(7)
+    lineups = [
+        {
+            "assignedMechs": rng.sample(sorted(mechs), rng.randint(0, len(mechs))),
+            "assignedElementals": rng.sample(sorted(elementals), rng.randint(0, len(elementals))),
+        }
+        for _ in range(200)
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(f"/api/forces/{FORCE_ID}/lineup/evaluate", json={"lineups": lineups})
+    assert resp.status_code == 200
+    results = resp.json()["lineups"]
+    assert len(results) == len(lineups)
+
+    for lineup, result in zip(lineups, results):
+        mech_ids, elemental_ids = lineup["assignedMechs"], lineup["assignedElementals"]
+        assert result["totalBv"] == calculate_mission_total_bv(mechs, pilots, mech_ids, elementals, elemental_ids)
+        assert result["totalTonnage"] == calculate_mission_total_tonnage(mechs, mech_ids)
+        assert result["unavailableMechs"] == [
+            i for i in mech_ids if not is_mech_available_for_mission(mechs[i], pilots.get(mechs[i].pilot_id))
+        ]
+        assert result["unavailableElementals"] == [
+            i for i in elemental_ids if not is_elemental_available_for_mission(elementals[i])
+        ]
+        assert result["available"] == (not result["unavailableMechs"] and not result["unavailableElementals"])
+
+
+@pytest.mark.asyncio
+async def test_evaluate_lineups_reports_unknown_units_and_force():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            f"/api/forces/{FORCE_ID}/lineup/evaluate",
+            json={"lineups": [{"assignedMechs": ["no-such-mech"], "assignedElementals": ["no-such-point"]}, {}]},
+        )
+        assert resp.status_code == 200
+        unknown, empty = resp.json()["lineups"]
+        assert unknown["available"] is False
+        assert unknown["unknownMechs"] == ["no-such-mech"]
+        assert unknown["unknownElementals"] == ["no-such-point"]
+        assert (empty["available"], empty["totalBv"], empty["totalTonnage"]) == (True, 0, 0)
+
+        resp = await client.post("/api/forces/no-such-force/lineup/evaluate", json={"lineups": []})
+        assert resp.status_code == 404
+
+
+def _brute_force_totals(units, max_bv, max_tonnage, min_units, max_units, required):
+    totals = []
+    for size in range(len(units) + 1):
+        for combo in itertools.combinations(units, size):
+            keys = {key for key, _, _ in combo}
+            bv = sum(unit[1] for unit in combo)
+            tonnage = sum(unit[2] for unit in combo)
+            if not set(required) <= keys or size < min_units or (max_units is not None and size > max_units):
+                continue
+            if (max_bv is None or bv <= max_bv) and (max_tonnage is None or tonnage <= max_tonnage):
+                totals.append((bv, tonnage))
+    return sorted(totals, key=lambda total: (-total[0], total[1]))
+
+
+def test_optimize_lineup_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(150):
+        units = [
+            (f"u{i}", rng.choice([0, rng.randint(500, 2500)]), rng.choice([0, 20, 55, 100]))
+            for i in range(rng.randint(0, 9))
+        ]
+        max_bv = rng.choice([None, rng.randint(0, 8000)])
+        max_tonnage = rng.choice([None, rng.randint(0, 300)])
+        min_units, max_units = rng.randint(0, 3), rng.choice([None, rng.randint(0, 5)])
+        required = [key for key, _, _ in units if rng.random() < 0.15]
+        top_k = rng.randint(1, 6)
+        result = optimize_lineup(units, max_bv, max_tonnage, min_units, max_units, required, top_k, time_limit=10)
+        assert result["optimal"]
+        expected = _brute_force_totals(units, max_bv, max_tonnage, min_units, max_units, required)[:top_k]
+        assert [(bv, tonnage) for _, bv, tonnage in result["lineups"]] == expected
+        assert len({frozenset(keys) for keys, _, _ in result["lineups"]}) == len(expected)
+
+
+def test_optimize_lineup_breaks_bv_ties_on_tonnage():
+    # Three lineups reach 60 BV; the 30t one must beat the 40t ones for third.
+    units = [("0", 20, 30), ("1", 40, 20), ("2", 40, 10), ("3", 20, 10), ("4", 10, 20), ("5", 20, 30)]
+    result = optimize_lineup(units, max_units=2, top_k=3)
+    expected = _brute_force_totals(units, None, None, 0, 2, ())[:3]
+    assert [(bv, tonnage) for _, bv, tonnage in result["lineups"]] == expected == [(80, 30), (60, 20), (60, 30)]
+
+
+def test_optimize_lineup_stops_at_time_limit():
+    ticks = itertools.count()
+    units = [(f"u{i}", 1000 + i, 50) for i in range(40)]
+    result = optimize_lineup(units, max_bv=20_000, top_k=3, time_limit=5, clock=lambda: next(ticks))
+    assert result["optimal"] is False
+    assert len(result["lineups"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_optimize_endpoint_returns_budgeted_lineups():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        base = f"/api/forces/{FORCE_ID}/lineup"
+        resp = await client.post(f"{base}/optimize", json={"maxBv": 6000, "maxTonnage": 250, "maxUnits": 4, "topK": 3})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["optimal"] is True
+        assert 1 <= len(body["lineups"]) <= 3
+        totals = [lineup["totalBv"] for lineup in body["lineups"]]
+        assert totals == sorted(totals, reverse=True)
+
+        evaluated = (await client.post(f"{base}/evaluate", json={"lineups": body["lineups"]})).json()["lineups"]
+        for lineup, check in zip(body["lineups"], evaluated):
+            assert check["available"] is True
+            assert (check["totalBv"], check["totalTonnage"]) == (lineup["totalBv"], lineup["totalTonnage"])
+            assert lineup["totalBv"] <= 6000 and lineup["totalTonnage"] <= 250
+            assert len(lineup["assignedMechs"]) <= 4
+
+        best_mech = body["lineups"][0]["assignedMechs"][0]
+        resp = await client.post(f"{base}/optimize", json={"maxUnits": 4, "excludedMechs": [best_mech]})
+        assert all(best_mech not in lineup["assignedMechs"] for lineup in resp.json()["lineups"])
+        resp = await client.post(f"{base}/optimize", json={"maxUnits": 4, "requiredMechs": [best_mech], "topK": 2})
+        assert all(best_mech in lineup["assignedMechs"] for lineup in resp.json()["lineups"])
+
+        resp = await client.post(f"{base}/optimize", json={"requiredMechs": ["no-such-mech"]})
+        assert resp.status_code == 400
+        resp = await client.post(f"{base}/optimize", json={"topK": 0})
+        assert resp.status_code == 400
+        for bad in ({"minUnits": -1}, {"maxUnits": -1}, {"minUnits": 3, "maxUnits": 2}):
+            resp = await client.post(f"{base}/optimize", json=bad)
+            assert resp.status_code == 400
@@ -1,5 +1,13 @@
+import asyncio
 import csv
+import gzip
+import io
+import json
+import os
 import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
@@ -8,26 +16,53 @@ from sqlalchemy import select, func, delete
 
 from server import app
 from database import SessionLocal
-from models import MechCatalogEntry
+from models import MechCatalogEntry, MechCatalogComponent, CatalogImportJob
 from import_mech_catalog import import_catalog
+from services import catalog_import, catalog_jobs, process_pool
+from services.catalog_components import PROCESS_POOL_MIN_ROWS, parse_components_bulk
+from services.catalog_parse import CatalogImportError, catalog_format, iter_catalog_batches
+from services.import_queue import import_queue
+from services.process_pool import ImportPool
+from domain.components_logic import parse_components
 
 SYNTHETIC_ROWS = [
-    {"chassis": "Test Catalog Mech", "model": "TCM-1", "mul_id": "900001", "BV": "1000", "tonnage": "50"},
-    {"chassis": "Test Catalog Mech", "model": "TCM-2", "mul_id": "900002", "BV": "1200", "tonnage": "55"},
+    {
+        "chassis": "Test Catalog Mech", "model": "TCM-1", "mul_id": "900001", "BV": "1000", "tonnage": "50",
+        "year": "3049", "jump": "5", "components": "1xER PPC:RA, 2xMedium Laser:LT, 1x XL Engine:Engine, 1x XL Engine:Engine",
+    },
+    {
+        "chassis": "Test Catalog Mech", "model": "TCM-2", "mul_id": "900002", "BV": "1200", "tonnage": "55",
+        "year": "3049", "jump": "0", "components": "1xER PPC:RA",
+    },
     {"chassis": "Test Catalog No Mul", "model": "", "mul_id": "", "BV": "800", "tonnage": "35"},
 ]
 
 
-def _write_synthetic_csv(tmp_path):
-    csv_path = tmp_path / "synthetic_mechs.csv"
+def _write_synthetic_csv(tmp_path, rows=SYNTHETIC_ROWS, name="synthetic_mechs.csv"):
+    csv_path = tmp_path / name
     with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["chassis", "model", "mul_id", "BV", "tonnage"])
+        writer = csv.DictWriter(
+            f, fieldnames=["chassis", "model", "mul_id", "BV", "tonnage", "year", "jump", "components"]
+        )
         writer.writeheader()
-        writer.writerows(SYNTHETIC_ROWS)
+        writer.writerows(rows)
     return csv_path
 
 
+def _changed_synthetic_rows():
+    changed_rows = [dict(row) for row in SYNTHETIC_ROWS]
+    changed_rows[0]["BV"] = "1111"
+    changed_rows[0]["components"] = "1xLarge Laser:RA"
+    # A duplicate MUL-less row later in the same file wins.
+    changed_rows.append({**SYNTHETIC_ROWS[2], "BV": "850"})
+    return changed_rows
+
+
 async def _cleanup_synthetic(session):
+    synthetic_ids = select(MechCatalogEntry.id).where(
+        MechCatalogEntry.mul_id.in_([900001, 900002]) | (MechCatalogEntry.chassis == "Test Catalog No Mul")
+    )
+    await session.execute(delete(MechCatalogComponent).where(MechCatalogComponent.catalog_id.in_(synthetic_ids)))
     await session.execute(delete(MechCatalogEntry).where(MechCatalogEntry.mul_id.in_([900001, 900002])))
     await session.execute(delete(MechCatalogEntry).where(MechCatalogEntry.chassis == "Test Catalog No Mul"))
     await session.commit()
@@ -41,14 +76,23 @@ async def test_reimport_is_idempotent_for_a_dropped_csv(tmp_path):
         await _cleanup_synthetic(session)
 
         async with session.begin():
-            created1, updated1 = await import_catalog(session, csv_path)
+            created1, updated1, unchanged1 = await import_catalog(session, csv_path)
         assert created1 == len(SYNTHETIC_ROWS)
         assert updated1 == 0
+        assert unchanged1 == 0
+        updated_at = (
+            await session.execute(select(MechCatalogEntry.updated_at).where(MechCatalogEntry.mul_id == 900001))
+        ).scalar_one()
+        await session.commit()
 
         async with session.begin():
-            created2, updated2 = await import_catalog(session, csv_path)
+            created2, updated2, unchanged2 = await import_catalog(session, csv_path)
         assert created2 == 0, "second import must not create any new rows"
-        assert updated2 == len(SYNTHETIC_ROWS)
+        assert updated2 == 0, "unchanged rows must not be rewritten"
+        assert unchanged2 == len(SYNTHETIC_ROWS)
+        assert (
+            await session.execute(select(MechCatalogEntry.updated_at).where(MechCatalogEntry.mul_id == 900001))
+        ).scalar_one() == updated_at
 
         rows = (
             await session.execute(
@@ -60,6 +104,371 @@ async def test_reimport_is_idempotent_for_a_dropped_csv(tmp_path):
         await _cleanup_synthetic(session)
 
 
+@pytest.mark.asyncio
+async def test_reimport_updates_changed_rows_in_place(tmp_path):
+    csv_path = _write_synthetic_csv(tmp_path)
+    changed_path = _write_synthetic_csv(tmp_path, _changed_synthetic_rows(), "synthetic_mechs_changed.csv")
+
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+        try:
+            async with session.begin():
+                await import_catalog(session, csv_path)
+            async with session.begin():
+                counts = await import_catalog(session, changed_path)
+            # TCM-1 and the MUL-less row (plus its duplicate) changed, TCM-2 didn't.
+            assert counts == (0, 3, 1)
+
+            tcm1 = (
+                await session.execute(select(MechCatalogEntry).where(MechCatalogEntry.mul_id == 900001))
+            ).scalar_one()
+            assert tcm1.bv == 1111
+            components = (
+                await session.execute(
+                    select(MechCatalogComponent.item).where(MechCatalogComponent.catalog_id == tcm1.id)
+                )
+            ).scalars().all()
+            assert components == ["Large Laser"]
+
+            no_mul = (
+                await session.execute(
+                    select(MechCatalogEntry).where(MechCatalogEntry.chassis == "Test Catalog No Mul")
+                )
+            ).scalars().all()
+            assert [row.bv for row in no_mul] == [850]
+        finally:
+            await _cleanup_synthetic(session)
+
+
+@pytest.mark.asyncio
+async def test_stream_import_yields_progress_per_batch_and_leaves_stream_open(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_import, "BATCH_SIZE", 2)
+    stream = io.BytesIO(_write_synthetic_csv(tmp_path).read_bytes() + b"\n,no chassis,,,\n")
+
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+        try:
+            async with session.begin():
+                events = [e async for e in catalog_import.stream_catalog_import(session, stream)]
+            assert [e["rows"] for e in events] == [2, 4]
+            assert [e["done"] for e in events] == [False, True]
+            assert events[-1]["created"] == len(SYNTHETIC_ROWS)
+            assert events[-1]["skipped"] == 1
+            assert events[-1]["bytesRead"] == len(stream.getvalue())
+            assert not stream.closed
+        finally:
+            await _cleanup_synthetic(session)
+
+
+@pytest.mark.asyncio
+async def test_parallel_parse_matches_sequential_across_chunk_boundaries():
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["chassis", "model", "mul_id", "BV", "tonnage", "components"])
+    writer.writeheader()
+    for i in range(400):
+        writer.writerow(
+            {
+                "chassis": "" if i % 97 == 0 else f"Parse Mech {i}",
+                "model": f'PM-{i} "Quoted"',
+                "mul_id": str(800000 + i),
+                "BV": str(i),
+                "tonnage": "55.0",
+                # Commas and newlines inside quoted fields must not split a record.
+                "components": f"1xER PPC:RA,\n{i}xMedium Laser:LT" if i % 3 == 0 else "1xPPC:RA",
+            }
+        )
+    data = out.getvalue().encode("utf-8-sig")
+
+    async def parse(workers):
+        rows = skipped = 0
+        values = []
+        async for batch in iter_catalog_batches(io.BytesIO(data), 50, workers=workers, chunk_bytes=2048):
+            rows += batch.rows
+            skipped += batch.skipped
+            values.extend(batch.values)
+        return rows, skipped, values
+
+    sequential = await parse(workers=1)
+    parallel = await parse(workers=2)
+    assert sequential[:2] == (400, 5)
+    assert parallel == sequential
+
+
+@pytest.mark.asyncio
+async def test_gzip_zip_and_ndjson_streams_parse_like_the_plain_csv(tmp_path):
+    plain = _write_synthetic_csv(tmp_path).read_bytes()
+    first_half = _write_synthetic_csv(tmp_path, SYNTHETIC_ROWS[:1], name="a.csv").read_bytes()
+    second_half = _write_synthetic_csv(tmp_path, SYNTHETIC_ROWS[1:], name="b.csv").read_bytes()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("b.csv", second_half)
+        zf.writestr("a.csv", first_half)
+        zf.writestr("readme.txt", "not a catalog")
+    ndjson = "\n".join(
+        json.dumps({**row, "mul_id": int(row["mul_id"]) if row["mul_id"] else None, "BV": int(row["BV"])})
+        for row in SYNTHETIC_ROWS
+    )
+
+    async def parse(data, fmt):
+        rows = skipped = 0
+        values = []
+        async for batch in iter_catalog_batches(io.BytesIO(data), 2, fmt=fmt):
+            rows += batch.rows
+            skipped += batch.skipped
+            values.extend(batch.values)
+            last_bytes_read = batch.bytes_read
+        assert last_bytes_read == len(data)
+        return rows, skipped, values
+
+    expected = await parse(plain, "csv")
+    assert expected[0] == len(SYNTHETIC_ROWS)
+    assert await parse(gzip.compress(plain), "csv.gz") == expected
+    assert await parse(archive.getvalue(), "zip") == expected
+    assert await parse(ndjson.encode(), "ndjson") == expected
+
+    assert catalog_format("MUL.CSV.GZ") == "csv.gz" and catalog_format("mul.gz") is None
+    bad_archive = io.BytesIO()
+    with zipfile.ZipFile(bad_archive, "w") as zf:
+        zf.writestr("a.csv", first_half)
+        zf.writestr("b.csv", "chassis,model\nFoo,F-1\n")
+    with pytest.raises(CatalogImportError, match="in b.csv"):
+        await parse(bad_archive.getvalue(), "zip")
+
+
+@pytest.mark.asyncio
+async def test_bad_byte_after_the_first_batch_is_a_catalog_import_error(tmp_path):
+    rows = [{**SYNTHETIC_ROWS[0], "mul_id": str(910000 + i)} for i in range(500)]
+    plain = _write_synthetic_csv(tmp_path, rows).read_bytes() + b"Bad \xff Mech,BM-1,,100,50,,,\n"
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.csv", plain)
+    ndjson = b"\n".join(json.dumps(row).encode() for row in rows) + b'\n{"chassis": "Bad \xff"}\n'
+
+    for data, fmt in (
+        (plain, "csv"), (gzip.compress(plain), "csv.gz"), (archive.getvalue(), "zip"), (ndjson, "ndjson"),
+    ):
+        batches = 0
+        with pytest.raises(CatalogImportError, match=f"as {fmt}"):
+            async for _ in iter_catalog_batches(io.BytesIO(data), 50, fmt=fmt):
+                batches += 1
+        assert batches > 0, fmt
+
+
+@pytest.mark.asyncio
+async def test_admin_import_accepts_gzipped_csv_and_rejects_unknown_formats(tmp_path):
+    csv_path = _write_synthetic_csv(tmp_path)
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+
+    job_id = None
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post(
+                "/api/admin/mech-catalog/import",
+                files={"file": ("synthetic.csv.gz", gzip.compress(csv_path.read_bytes()), "application/gzip")},
+            )
+            assert resp.status_code == 202
+            job_id = resp.json()["id"]
+            job = await _wait_for_job(client, job_id)
+            assert job["status"] == "succeeded"
+            assert job["created"] == len(SYNTHETIC_ROWS)
+            assert job["bytesRead"] == job["totalBytes"]
+
+            resp = await client.post(
+                "/api/admin/mech-catalog/import",
+                files={"file": ("synthetic.xlsx", b"PK", "application/octet-stream")},
+            )
+            assert resp.status_code == 400
+            resp = await client.post(
+                "/api/admin/mech-catalog/import",
+                files={"file": ("broken.zip", b"not a zip", "application/zip")},
+            )
+            assert resp.status_code == 400
+    finally:
+        async with SessionLocal() as session:
+            await _cleanup_synthetic(session)
+        if job_id:
+            await _delete_jobs([job_id])
+
+
+@pytest.mark.asyncio
+async def test_admin_import_rejects_csv_missing_required_headers():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/api/admin/mech-catalog/import",
+            files={"file": ("bad.csv", b"chassis,model\nFoo,F-1\n", "text/csv")},
+        )
+    assert resp.status_code == 400
+    assert "Missing required header" in resp.json()["detail"]
+
+
+async def _wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = (await client.get(f"/api/admin/mech-catalog/import/{job_id}")).json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        assert time.monotonic() < deadline, f"import job {job_id} did not finish in time"
+        await asyncio.sleep(0.05)
+
+
+async def _delete_jobs(job_ids):
+    async with SessionLocal() as session:
+        await session.execute(delete(CatalogImportJob).where(CatalogImportJob.id.in_(job_ids)))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_admin_import_runs_as_background_job_with_progress(tmp_path):
+    csv_path = _write_synthetic_csv(tmp_path)
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+
+    job_id = None
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post(
+                "/api/admin/mech-catalog/import",
+                files={"file": ("synthetic.csv", csv_path.read_bytes(), "text/csv")},
+            )
+            assert resp.status_code == 202
+            job_id = resp.json()["id"]
+            assert resp.json()["status"] in ("queued", "running", "succeeded")
+
+            job = await _wait_for_job(client, job_id)
+            assert job["status"] == "succeeded"
+            assert (job["rows"], job["created"], job["updated"]) == (len(SYNTHETIC_ROWS), len(SYNTHETIC_ROWS), 0)
+            assert job["bytesRead"] == job["totalBytes"] == csv_path.stat().st_size
+            assert job["finishedAt"] and job["rowsPerSecond"] is not None
+
+            history = (await client.get("/api/admin/mech-catalog/import-jobs")).json()
+            assert any(j["id"] == job_id for j in history)
+
+            assert (await client.get("/api/admin/mech-catalog/import/import-doesnotexist")).status_code == 404
+    finally:
+        async with SessionLocal() as session:
+            await _cleanup_synthetic(session)
+        if job_id:
+            await _delete_jobs([job_id])
+
+
+@pytest.mark.asyncio
+async def test_queued_import_job_can_be_cancelled_and_stale_jobs_are_marked_interrupted(tmp_path):
+    csv_path = _write_synthetic_csv(tmp_path)
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+
+    job_ids = []
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            # Occupy the import queue so the job stays queued.
+            release = asyncio.Event()
+            blocker = await import_queue.submit("test-blocker", release.wait, source="test")
+            resp = await client.post(
+                "/api/admin/mech-catalog/import",
+                files={"file": ("synthetic.csv", csv_path.read_bytes(), "text/csv")},
+            )
+            job_ids.append(resp.json()["id"])
+            assert resp.json()["status"] == "queued"
+            resp = await client.post(f"/api/admin/mech-catalog/import/{job_ids[0]}/cancel")
+            assert resp.json()["status"] == "cancelled"
+            assert import_queue.status()["queued"] == []
+            release.set()
+            await blocker.done
+            job = (await client.get(f"/api/admin/mech-catalog/import/{job_ids[0]}")).json()
+            assert (job["status"], job["rows"]) == ("cancelled", 0)
+
+        async with SessionLocal() as session:
+            assert (
+                await session.execute(select(MechCatalogEntry).where(MechCatalogEntry.mul_id == 900001))
+            ).scalar_one_or_none() is None
+            session.add(CatalogImportJob(id="import-stale0test", filename="stale.csv", status="running", created_at="x"))
+            job_ids.append("import-stale0test")
+            await session.commit()
+        await catalog_jobs.mark_interrupted_jobs()
+        async with SessionLocal() as session:
+            assert (await session.get(CatalogImportJob, "import-stale0test")).status == "interrupted"
+    finally:
+        await _delete_jobs(job_ids)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_counts_duplicates_like_the_real_import(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_import, "BATCH_SIZE", 4)
+    monkeypatch.setattr(catalog_import, "CHUNK_SIZE", 2)
+    tcm1, tcm2, no_mul = SYNTHETIC_ROWS
+    rows = [
+        tcm1, tcm1, tcm2, no_mul,  # identical duplicate within a chunk
+        tcm1, {**tcm2, "BV": "1300"}, no_mul, {**no_mul, "BV": "850"},  # repeats across batches
+        {**tcm1, "BV": "1111"},
+    ]
+    data = _write_synthetic_csv(tmp_path, rows).read_bytes()
+
+    async def counts(dry_run):
+        summary = None
+        async for summary in catalog_import.stream_catalog_import(session, io.BytesIO(data), dry_run=dry_run):
+            pass
+        return summary["created"], summary["updated"], summary["unchanged"]
+
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+        try:
+            for _ in range(2):  # into an empty table, then over the imported rows
+                async with session.begin():
+                    dry = await counts(dry_run=True)
+                async with session.begin():
+                    assert await counts(dry_run=False) == dry
+        finally:
+            await _cleanup_synthetic(session)
+
+
+@pytest.mark.asyncio
+async def test_admin_import_dry_run_reports_diff_without_writing(tmp_path):
+    csv_path = _write_synthetic_csv(tmp_path)
+    changed_csv = _write_synthetic_csv(tmp_path, _changed_synthetic_rows(), "synthetic_mechs_changed.csv")
+
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+        async with session.begin():
+            await import_catalog(session, csv_path)
+
+    job_id = None
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post(
+                "/api/admin/mech-catalog/import",
+                params={"dryRun": "true"},
+                files={"file": ("changed.csv", changed_csv.read_bytes(), "text/csv")},
+            )
+            assert resp.status_code == 202
+            job_id = resp.json()["id"]
+            body = await _wait_for_job(client, job_id)
+        assert body["status"] == "succeeded"
+        assert body["dryRun"] is True
+        assert (body["created"], body["updated"], body["unchanged"]) == (0, 3, 1)
+        assert body["diff"]["created"] == []
+        tcm1 = next(e for e in body["diff"]["updated"] if e["mulId"] == 900001)
+        assert tcm1["changes"]["bv"] == {"from": 1000, "to": 1111}
+        assert tcm1["changes"]["components"]["to"] == "1xLarge Laser:RA"
+        assert not any(e["mulId"] == 900002 for e in body["diff"]["updated"])
+
+        async with SessionLocal() as session:
+            bv = (
+                await session.execute(select(MechCatalogEntry.bv).where(MechCatalogEntry.mul_id == 900001))
+            ).scalar_one()
+        assert bv == 1000
+    finally:
+        async with SessionLocal() as session:
+            await _cleanup_synthetic(session)
+        if job_id:
+            await _delete_jobs([job_id])
+
+
 @pytest.mark.asyncio
 async def test_search_below_min_length_returns_empty():
     transport = ASGITransport(app=app)
@@ -100,3 +509,309 @@ async def test_search_no_results_for_unknown_term():
         resp = await client.get("/api/mech-catalog", params={"search": "zzzznotamechzzzz"})
     assert resp.status_code == 200
     assert resp.json() == []
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_tolerates_typos_and_model_code_variations():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for query in ["Marauder 3R", "MAD3R", "mad-3r"]:
+            resp = await client.get("/api/mech-catalog", params={"search": query, "fuzzy": "true"})
+            assert resp.status_code == 200
+            assert resp.json()[0]["name"] == "Marauder MAD-3R", query
+
+        resp = await client.get("/api/mech-catalog", params={"search": "Maurader", "fuzzy": "true"})
+        results = resp.json()
+        assert 0 < len(results) <= 50
+        assert all(r["chassis"].startswith("Marauder") for r in results)
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_matches_prefix_of_last_word_and_rejects_garbage():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/mech-catalog", params={"search": "atl", "fuzzy": "true"})
+        assert resp.status_code == 200
+        assert resp.json() and all("atlas" in r["name"].lower() for r in resp.json())
+
+        resp = await client.get("/api/mech-catalog", params={"search": "zzzznotamechzzzz", "fuzzy": "true"})
+        assert resp.json() == []
+
+
+def test_parse_components_normalizes_counts_and_locations():
+    parsed = parse_components(
+        "2xER Medium Laser:LA, 1xER Medium Laser:LA, 1xPartial Wing:RT/LT, 1x XL Engine:Engine, 1x XL Engine:Engine"
+    )
+    assert sorted(parsed) == [
+        ("ER Medium Laser", "LA", 3),
+        ("Partial Wing", "RT/LT", 1),
+        ("XL Engine", "Engine", 1),
+    ]
+    assert parse_components("") == []
+    assert parse_components(None) == []
+
+
+@pytest.mark.asyncio
+async def test_components_parse_shares_one_lazily_started_import_pool(monkeypatch):
+    started = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def __init__(self, max_workers=None, mp_context=None):
+            started.append(max_workers)
+            super().__init__(max_workers)
+
+    monkeypatch.setattr(process_pool, "ProcessPoolExecutor", CountingExecutor)
+    texts = ["2xMedium Laser:LA, 1xER PPC:RA", "1x XL Engine:Engine"] * PROCESS_POOL_MIN_ROWS
+    expected = [parse_components(text) for text in texts]
+
+    with ImportPool(1) as pool:
+        assert await parse_components_bulk(texts, pool) == expected
+    assert started == []
+    with ImportPool(2) as pool:
+        assert await parse_components_bulk(texts[:10], pool) == expected[:10]
+        assert started == []
+        for _ in range(3):
+            assert await parse_components_bulk(texts, pool) == expected
+    assert started == [2]
+
+
+@pytest.mark.asyncio
+async def test_import_populates_components_table_and_query_filters_on_it(tmp_path):
+    csv_path = _write_synthetic_csv(tmp_path)
+
+    async with SessionLocal() as session:
+        await _cleanup_synthetic(session)
+        async with session.begin():
+            await import_catalog(session, csv_path)
+        # Re-import replaces rather than duplicates component rows.
+        async with session.begin():
+            await import_catalog(session, csv_path)
+
+        tcm1_id = (
+            await session.execute(select(MechCatalogEntry.id).where(MechCatalogEntry.mul_id == 900001))
+        ).scalar_one()
+        components = (
+            await session.execute(select(MechCatalogComponent).where(MechCatalogComponent.catalog_id == tcm1_id))
+        ).scalars().all()
+        assert sorted((c.item, c.location, c.count) for c in components) == [
+            ("ER PPC", "RA", 1),
+            ("Medium Laser", "LT", 2),
+            ("XL Engine", "Engine", 1),
+        ]
+
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get(
+                "/api/mech-catalog/query",
+                params={"item": "er ppc", "maxYear": 3050, "maxTonnage": 55, "minJump": 1, "limit": 500},
+            )
+            assert resp.status_code == 200
+            models = {r["model"] for r in resp.json() if r["chassis"] == "Test Catalog Mech"}
+            assert models == {"TCM-1"}
+            assert all(r["tonnage"] <= 55 and r["jump"] >= 1 and r["year"] <= 3050 for r in resp.json())
+
+            resp = await client.get(
+                "/api/mech-catalog/query",
+                params=[
+                    ("item", "ER PPC"), ("item", "Medium Laser"), ("minTonnage", 50), ("maxTonnage", 55),
+                    ("maxYear", 3049), ("limit", 500),
+                ],
+            )
+            assert any(r["model"] == "TCM-1" for r in resp.json())
+            assert not any(r["model"] == "TCM-2" for r in resp.json())
+    finally:
+        async with SessionLocal() as session:
+            await _cleanup_synthetic(session)
+
+
+SAMPLE_MTF = """chassis:Test Unitfile Mech
+model:TUM-1X
+mul id:900101
+
+Config:Biped
+techbase:Inner Sphere
+era:3052
+role:Brawler
+
+mass:55
+engine:275 XL Engine(IS)
+structure:IS Endo Steel
+myomer:Standard
+heat sinks:12 Double
+walk mp:5
+jump mp:5
+
+armor:Ferro-Fibrous(Inner Sphere)
+LA armor:18
+
+Weapons:4
+ER PPC, Right Arm
+Medium Laser, Left Arm
+ISMediumLaser, Left Arm
+Medium Laser (R), Center Torso
+
+Left Arm:
+Shoulder
+Medium Laser
+-Empty-
+"""
+
+SAMPLE_BLK = """#Building block data file
+<BlockVersion>
+1
+</BlockVersion>
+<UnitType>
+Tank
+</UnitType>
+<Name>
+Test Unitfile Tank
+</Name>
+<Model>
+(Standard)
+</Model>
+<year>
+3025
+</year>
+<type>
+Clan Level 2
+</type>
+<tonnage>
+60
+</tonnage>
+<cruiseMP>
+4
+</cruiseMP>
+<heatsinks>
+10
+</heatsinks>
+<Turret Equipment>
+LRM 20
+IS Ammo LRM-20
+</Turret Equipment>
+<Front Equipment>
+Medium Laser
+</Front Equipment>
+"""
+
+
+def test_unit_file_parsers_map_mtf_and_blk_to_catalog_columns():
+    from domain.unitfile_logic import UNIT_FILE_COLUMNS, parse_blk, parse_mtf
+
+    mech = parse_mtf(SAMPLE_MTF)
+    assert set(mech) == set(UNIT_FILE_COLUMNS) and "bv" not in mech
+    assert (mech["mul_id"], mech["chassis"], mech["model"]) == (900101, "Test Unitfile Mech", "TUM-1X")
+    assert (mech["tonnage"], mech["year"], mech["techbase"], mech["role"]) == (55, 3052, "Inner Sphere", "Brawler")
+    assert (mech["walk"], mech["jump"]) == (5, 5)
+    # ER PPC 15 + 3 Medium Lasers x 3; 12 double heat sinks.
+    assert (mech["heat"], mech["dissipation"], mech["dissipation_efficiency"]) == (24, 24, 0)
+    assert sorted(parse_components(mech["components"])) == [
+        ("ER PPC", "RA", 1),
+        ("Endo Steel Structure", "Structure", 1),
+        ("Ferro-Fibrous Armor", "Armor", 1),
+        ("Medium Laser", "CT", 1),
+        ("Medium Laser", "LA", 2),
+        ("XL Engine", "Engine", 1),
+    ]
+
+    tank = parse_blk(SAMPLE_BLK)
+    assert (tank["chassis"], tank["model"], tank["mul_id"]) == ("Test Unitfile Tank", "(Standard)", None)
+    assert (tank["tonnage"], tank["walk"], tank["techbase"], tank["heat"], tank["dissipation"]) == (60, 4, "Clan", 9, 10)
+    assert sorted(parse_components(tank["components"])) == [("LRM 20", "Turret", 1), ("Medium Laser", "Front", 1)]
+
+    assert parse_mtf("model:No Chassis\n") is None
+
+
+@pytest.mark.asyncio
+async def test_unit_file_scan_upserts_and_rescans_incrementally(tmp_path):
+    from models import UnitFileState
+    from services.unitfile_import import scan_unit_directory
+
+    async def cleanup(session):
+        await session.execute(delete(MechCatalogEntry).where(MechCatalogEntry.mul_id == 900101))
+        await session.execute(delete(MechCatalogEntry).where(MechCatalogEntry.chassis == "Test Unitfile Tank"))
+        await session.execute(delete(UnitFileState).where(UnitFileState.path.startswith(str(tmp_path.resolve()))))
+        await session.commit()
+
+    (tmp_path / "mechs").mkdir()
+    mtf_path = tmp_path / "mechs" / "TUM-1X.mtf"
+    mtf_path.write_text(SAMPLE_MTF)
+    (tmp_path / "tank.blk").write_text(SAMPLE_BLK)
+    (tmp_path / "broken.mtf").write_text("model:Nothing\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    async with SessionLocal() as session:
+        await cleanup(session)
+        try:
+            first = await scan_unit_directory(session, tmp_path, commit=True, workers=1)
+            assert (first["files"], first["parsedFiles"], first["created"]) == (3, 3, 2)
+            assert [error["path"] for error in first["errors"]] == [str(tmp_path.resolve() / "broken.mtf")]
+            entry = (
+                await session.execute(select(MechCatalogEntry).where(MechCatalogEntry.mul_id == 900101))
+            ).scalar_one()
+            assert (entry.walk, entry.jump, entry.heat, entry.bv) == (5, 5, 24, 0)
+
+            again = await scan_unit_directory(session, tmp_path, commit=True, workers=1)
+            assert (again["unchangedFiles"], again["parsedFiles"], again["created"], again["updated"]) == (3, 0, 0, 0)
+
+            # Touched but identical: re-hashed, not re-imported.
+            os.utime(mtf_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            touched = await scan_unit_directory(session, tmp_path, commit=True, workers=1)
+            assert (touched["unchangedFiles"], touched["parsedFiles"]) == (3, 0)
+
+            mtf_path.write_text(SAMPLE_MTF.replace("walk mp:5", "walk mp:6"))
+            (tmp_path / "tank.blk").unlink()
+            changed = await scan_unit_directory(session, tmp_path, commit=True, workers=1)
+            assert (changed["parsedFiles"], changed["updated"], changed["removedFiles"]) == (1, 1, 1)
+            await session.refresh(entry)
+            assert entry.walk == 6
+        finally:
+            await cleanup(session)
+
+
+@pytest.mark.asyncio
+async def test_unit_file_scans_leave_mul_rows_alone(tmp_path):
+    from models import UnitFileState
+    from services.unitfile_import import scan_unit_directory
+
+    async def cleanup(session):
+        ids = select(MechCatalogEntry.id).where(MechCatalogEntry.mul_id == 900101)
+        await session.execute(delete(MechCatalogComponent).where(MechCatalogComponent.catalog_id.in_(ids)))
+        await session.execute(delete(MechCatalogEntry).where(MechCatalogEntry.mul_id == 900101))
+        await session.execute(delete(UnitFileState).where(UnitFileState.path.startswith(str(tmp_path.resolve()))))
+        await session.commit()
+
+    mul_row = {**SYNTHETIC_ROWS[0], "chassis": "Test Unitfile Mech", "model": "TUM-1X", "mul_id": "900101"}
+    csv_path = _write_synthetic_csv(tmp_path, [mul_row])
+    (tmp_path / "mechs").mkdir()
+    mtf_path = tmp_path / "mechs" / "TUM-1X.mtf"
+    mtf_path.write_text(SAMPLE_MTF)
+
+    async def snapshot(session):
+        entry = (
+            await session.execute(select(MechCatalogEntry).where(MechCatalogEntry.mul_id == 900101))
+        ).scalar_one()
+        await session.refresh(entry)
+        return entry.source, entry.bv, entry.heat, entry.components, entry.content_hash, entry.updated_at
+
+    async with SessionLocal() as session:
+        await cleanup(session)
+        try:
+            # A unit file creates the row; the MUL export then takes it over.
+            first = await scan_unit_directory(session, tmp_path / "mechs", commit=True, workers=1)
+            assert first["created"] == 1
+            assert (await snapshot(session))[:2] == ("unit_file", 0)
+            assert await import_catalog(session, csv_path, commit=True) == (0, 1, 0)
+            mul = await snapshot(session)
+            assert mul[:2] == ("mul", 1000) and mul[3] == mul_row["components"]
+
+            # From then on neither import rewrites the row.
+            for n in range(2):
+                mtf_path.write_text(SAMPLE_MTF + "\n" * (n + 1))
+                scan = await scan_unit_directory(session, tmp_path / "mechs", commit=True, workers=1)
+                assert (scan["parsedFiles"], scan["updated"], scan["unchanged"]) == (1, 0, 1)
+                assert await snapshot(session) == mul
+                assert await import_catalog(session, csv_path, commit=True) == (0, 0, 1)
+                assert await snapshot(session) == mul
+        finally:
+            await cleanup(session)
@@ -0,0 +1,79 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from server import app
+from domain.opfor_logic import OpForPool, generate_opfors
+
+FORCE_ID = "ghost-bear"
+
+
+def _synthetic_pool(size=500):
+    rng = random.Random(1)
+    return OpForPool(
+        [
+            SimpleNamespace(
+                id=i,
+                mul_id=i,
+                chassis=f"Chassis {i}",
+                model="X",
+                bv=rng.randint(300, 3000),
+                tonnage=rng.choice(range(20, 101, 5)),
+                year=rng.randint(2750, 3080),
+                techbase=rng.choice(["Inner Sphere", "Clan"]),
+                role=rng.choice(["Brawler", "Scout", "Sniper"]),
+            )
+            for i in range(size)
+        ]
+    )
+
+
+def test_generated_opfors_hit_the_bv_band_and_are_seedable():
+    pool = _synthetic_pool()
+    entries, bvs = pool.filtered(max_year=3050, techbases=["Clan"], gunnery=3, piloting=4)
+    assert bvs == sorted(bvs)
+    assert all(e.year <= 3050 and e.techbase == "Clan" for e in entries)
+    assert pool.filtered(max_year=3050, techbases=["Clan"], gunnery=3, piloting=4)[1] is bvs
+
+    tonnages = [entry.tonnage for entry in entries]
+    found = generate_opfors(bvs, 5, 7600, 8400, random.Random(42), 20, tonnages=tonnages, max_tonnage=350)
+    assert len(found) == 20
+    assert len({tuple(picks) for picks in found}) == 20
+    for picks in found:
+        assert len(picks) == 5
+        assert 7600 <= sum(bvs[i] for i in picks) <= 8400
+        assert sum(tonnages[i] for i in picks) <= 350
+    assert generate_opfors(bvs, 5, 7600, 8400, random.Random(42), 20, tonnages=tonnages, max_tonnage=350) == found
+
+    # Out of reach: five units can't total less than five of the cheapest.
+    assert generate_opfors(bvs, 5, 0, bvs[0] * 5 - 1, random.Random(1), 3) == []
+
+
+@pytest.mark.asyncio
+async def test_generate_endpoint_returns_opfor_units_in_range():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        url = f"/api/forces/{FORCE_ID}/missions/opfor/generate"
+        request = {"targetBv": 8000, "unitCount": 4, "candidates": 10, "maxYear": 3055, "techbases": ["Clan"]}
+        resp = await client.post(url, json={**request, "seed": 1234})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["seed"] == 1234 and body["poolSize"] > 0
+        assert body["bvRange"] == [7600, 8400]
+        assert body["candidates"]
+        for candidate in body["candidates"]:
+            assert 7600 <= candidate["totalBv"] <= 8400
+            assert candidate["totalBv"] == sum(unit["baseBv"] for unit in candidate["units"])
+            assert candidate["totalTonnage"] == sum(unit["tonnage"] for unit in candidate["units"])
+            for unit in candidate["units"]:
+                assert unit["year"] <= 3055 and unit["techbase"] == "Clan"
+                assert (unit["gunnery"], unit["piloting"], unit["status"]) == (4, 5, "active")
+
+        again = (await client.post(url, json={**request, "seed": 1234})).json()
+        assert again["candidates"] == body["candidates"]
+
+        assert (await client.post(url, json={"targetBv": 8000, "unitCount": 0})).status_code == 400
+        resp = await client.post("/api/forces/no-such-force/missions/opfor/generate", json={"targetBv": 1})
+        assert resp.status_code == 404
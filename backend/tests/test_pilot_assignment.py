@@ -0,0 +1,153 @@
+import itertools
+import random
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from server import app
+from domain.mechs_logic import get_adjusted_bv
+from domain.pilot_assignment import adjusted_bv_matrix, hungarian, solve_assignment
+
+TEST_FORCE_ID = "test-pilot-assignment"
+
+
+def _pairing_totals(matrix):
+    rows, columns = len(matrix), len(matrix[0])
+    if rows <= columns:
+        return [sum(matrix[i][perm[i]] for i in range(rows)) for perm in itertools.permutations(range(columns), rows)]
+    return [sum(matrix[perm[j]][j] for j in range(columns)) for perm in itertools.permutations(range(rows), columns)]
+
+
+def test_adjusted_bv_matrix_matches_get_adjusted_bv():
+    bvs = [0, 1, 999, 1897, 2500]
+    skills = [(g, p) for g in range(9) for p in range(9)] + [(None, 3)]
+    matrix = adjusted_bv_matrix(bvs, skills)
+    assert matrix == [[get_adjusted_bv(bv, g, p) for g, p in skills] for bv in bvs]
+
+
+def test_hungarian_finds_minimum_cost_matching():
+    rng = random.Random(11)
+    for _ in range(50):
+        size = rng.randint(1, 6)
+        cost = [[rng.randint(-50, 50) for _ in range(size)] for _ in range(size)]
+        assignment = hungarian(cost)
+        assert sorted(assignment) == list(range(size))
+        best = min(sum(cost[i][perm[i]] for i in range(size)) for perm in itertools.permutations(range(size)))
+        assert sum(cost[i][assignment[i]] for i in range(size)) == best
+
+
+def test_solve_assignment_extremes_match_brute_force():
+    rng = random.Random(5)
+    for _ in range(150):
+        rows, columns = rng.randint(1, 6), rng.randint(1, 6)
+        matrix = adjusted_bv_matrix(
+            [rng.choice([0, rng.randint(300, 2500)]) for _ in range(rows)],
+            [(rng.randint(0, 8), rng.randint(0, 8)) for _ in range(columns)],
+        )
+        totals = _pairing_totals(matrix)
+        for objective, expected in (("maximize", max(totals)), ("minimize", min(totals))):
+            pairs, total = solve_assignment(matrix, objective)
+            assert total == expected
+            assert len(pairs) == min(rows, columns)
+            assert len({i for i, _ in pairs}) == len({j for _, j in pairs}) == len(pairs)
+
+        target = rng.randint(0, 8000)
+        pairs, total = solve_assignment(matrix, "target", target)
+        assert len(pairs) == min(rows, columns) and total in totals
+        if target >= max(totals) or target <= min(totals):
+            assert abs(total - target) == min(abs(t - target) for t in totals)
+
+
+async def _cleanup(client):
+    await client.delete(f"/api/forces/{TEST_FORCE_ID}")
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await _cleanup(client)
+        yield client
+        await _cleanup(client)
+
+
+async def _add_mech(client, name, bv, pilot_id="", status="Operational"):
+    resp = await client.post(
+        f"/api/forces/{TEST_FORCE_ID}/mechs", json={"name": name, "bv": bv, "pilotId": pilot_id, "status": status}
+    )
+    return resp.json()["id"]
+
+
+async def _add_pilot(client, name, gunnery, piloting, injuries=0):
+    resp = await client.post(
+        f"/api/forces/{TEST_FORCE_ID}/pilots",
+        json={"name": name, "gunnery": gunnery, "piloting": piloting, "injuries": injuries},
+    )
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_pilot_assignment_proposes_and_applies_changes(client):
+    await client.post("/api/forces", json={"id": TEST_FORCE_ID, "name": "Pilot Assignment Test"})
+    ace = await _add_pilot(client, "Ace", 1, 2)
+    rookie = await _add_pilot(client, "Rookie", 5, 6)
+    dead = await _add_pilot(client, "Dead", 0, 0, injuries=6)
+    atlas = await _add_mech(client, "Atlas", 1897, pilot_id=rookie)
+    locust = await _add_mech(client, "Locust", 356, pilot_id=ace)
+    await _add_mech(client, "Wreck", 2000, status="Destroyed")
+
+    url = f"/api/forces/{TEST_FORCE_ID}/pilot-assignment"
+    resp = await client.post(url, json={"objective": "maximize"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["applied"] is False
+    assert {(a["mechId"], a["pilotId"]) for a in body["assignments"]} == {(atlas, ace), (locust, rookie)}
+    assert body["totalBv"] == get_adjusted_bv(1897, 1, 2) + get_adjusted_bv(356, 5, 6)
+    assert body["previousTotalBv"] == get_adjusted_bv(1897, 5, 6) + get_adjusted_bv(356, 1, 2)
+    assert sorted(body["changes"], key=lambda c: c["mechId"]) == sorted(
+        [
+            {"mechId": atlas, "fromPilotId": rookie, "toPilotId": ace},
+            {"mechId": locust, "fromPilotId": ace, "toPilotId": rookie},
+        ],
+        key=lambda c: c["mechId"],
+    )
+    mechs = {m["id"]: m for m in (await client.get(f"/api/forces/{TEST_FORCE_ID}")).json()["mechs"]}
+    assert mechs[atlas]["pilotId"] == rookie
+
+    resp = await client.post(url, json={"objective": "maximize", "apply": True})
+    assert resp.json()["applied"] is True
+    mechs = {m["id"]: m for m in (await client.get(f"/api/forces/{TEST_FORCE_ID}")).json()["mechs"]}
+    assert (mechs[atlas]["pilotId"], mechs[locust]["pilotId"]) == (ace, rookie)
+    resp = await client.post(url, json={"objective": "maximize"})
+    assert resp.json()["changes"] == []
+
+    # Only the Atlas is re-crewed: the rookie stays in the Locust.
+    resp = await client.post(url, json={"objective": "minimize", "mechIds": [atlas]})
+    assert resp.json()["changes"] == []
+    resp = await client.post(url, json={"objective": "minimize", "mechIds": [atlas], "pilotIds": [ace, rookie]})
+    assert sorted(resp.json()["changes"], key=lambda c: c["mechId"]) == sorted(
+        [
+            {"mechId": atlas, "fromPilotId": ace, "toPilotId": rookie},
+            {"mechId": locust, "fromPilotId": rookie, "toPilotId": ""},
+        ],
+        key=lambda c: c["mechId"],
+    )
+
+    # Only pilotIds: mechs held by other pilots are left alone.
+    griffin = await _add_mech(client, "Griffin", 1272)
+    resp = await client.post(url, json={"objective": "maximize", "pilotIds": [rookie], "apply": True})
+    assert sorted(resp.json()["changes"], key=lambda c: c["mechId"]) == sorted(
+        [
+            {"mechId": griffin, "fromPilotId": "", "toPilotId": rookie},
+            {"mechId": locust, "fromPilotId": rookie, "toPilotId": ""},
+        ],
+        key=lambda c: c["mechId"],
+    )
+    mechs = {m["id"]: m for m in (await client.get(f"/api/forces/{TEST_FORCE_ID}")).json()["mechs"]}
+    assert mechs[atlas]["pilotId"] == ace
+
+    assert (await client.post(url, json={"pilotIds": [dead]})).status_code == 400
+    assert (await client.post(url, json={"objective": "target"})).status_code == 400
+    assert (await client.post(url, json={"objective": "sideways"})).status_code == 400
+    assert (await client.post("/api/forces/no-such-force/pilot-assignment", json={})).status_code == 404
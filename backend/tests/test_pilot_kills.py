@@ -0,0 +1,73 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+
+from server import app
+from database import SessionLocal
+from models import PilotKill
+
+TEST_FORCE_ID = "test-pilot-kills-force"
+
+
+async def _kills(**where):
+    async with SessionLocal() as session:
+        query = select(
+            PilotKill.pilot_id, PilotKill.mission, PilotKill.mech_model, PilotKill.tonnage, PilotKill.weight_class
+        )
+        for column, value in where.items():
+            query = query.where(getattr(PilotKill, column) == value)
+        return sorted((await session.execute(query.order_by(PilotKill.id))).tuples())
+
+
+@pytest.mark.asyncio
+async def test_pilot_kills_mirror_every_combat_record_write():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete(f"/api/forces/{TEST_FORCE_ID}")
+        await client.post("/api/forces", json={"id": TEST_FORCE_ID, "name": "Kills", "currentDate": "3052-03-01"})
+        try:
+            record = {"kills": [{"mechModel": "Locust LCT-1V", "tonnage": 20, "mission": "Old", "date": "3051"}]}
+            pilot = (
+                await client.post(f"/api/forces/{TEST_FORCE_ID}/pilots", json={"name": "Ace", "combatRecord": record})
+            ).json()
+            assert await _kills(force_id=TEST_FORCE_ID) == [(pilot["id"], "Old", "Locust LCT-1V", 20, "light")]
+
+            mech = (await client.post(f"/api/forces/{TEST_FORCE_ID}/mechs", json={"name": "Atlas", "bv": 1897})).json()
+            await client.put(f"/api/mechs/{mech['id']}", json={"pilotId": pilot["id"]})
+            mission = (
+                await client.post(
+                    f"/api/forces/{TEST_FORCE_ID}/missions", json={"name": "Raid", "assignedMechs": [mech["id"]]}
+                )
+            ).json()
+            kills = [{"mechModel": "Atlas AS7-D", "tonnage": 100}, {"mechModel": "Odd", "tonnage": 37}]
+            resp = await client.post(
+                f"/api/missions/{mission['id']}/complete",
+                json={"objectives": [], "recap": "", "pilots": {pilot["id"]: {"kills": kills}}},
+            )
+            assert resp.status_code == 200
+            assert await _kills(mission="Raid") == [
+                (pilot["id"], "Raid", "Atlas AS7-D", 100, "assault"),
+                (pilot["id"], "Raid", "Odd", 37, None),
+            ]
+            assert len(resp.json()["pilots"][0]["combatRecord"]["kills"]) == 3
+            board = (await client.get("/api/leaderboards", params={"forceId": TEST_FORCE_ID})).json()
+            assert board["pilots"]["items"][0]["kills"] == 3
+            assert board["pilots"]["items"][0]["missionsCompleted"] == 1
+
+            snapshot = (
+                await client.post(f"/api/forces/{TEST_FORCE_ID}/state-snapshots", json={"label": "before"})
+            ).json()
+
+            # The client rewriting the record replaces the rows.
+            await client.put(f"/api/pilots/{pilot['id']}", json={"combatRecord": {"kills": []}})
+            assert await _kills(force_id=TEST_FORCE_ID) == []
+
+            resp = await client.post(f"/api/forces/{TEST_FORCE_ID}/state-snapshots/{snapshot['id']}/restore")
+            assert resp.status_code == 200
+            assert len(await _kills(force_id=TEST_FORCE_ID)) == 3
+
+            await client.delete(f"/api/pilots/{pilot['id']}")
+            assert await _kills(pilot_id=pilot["id"]) == []
+        finally:
+            await client.delete(f"/api/forces/{TEST_FORCE_ID}")
+        assert await _kills(force_id=TEST_FORCE_ID) == []
@@ -10,6 +10,7 @@ from models import (
     Mission,
     AchievementDefinition,
     PilotAchievement,
+    PilotStats,
     SpChoice,
     MissionSpPurchase,
 )
@@ -23,6 +24,7 @@ TEST_CHOICE_ID = "test-choice-refdata"
 async def _cleanup(session):
     await session.execute(delete(PilotAchievement).where(PilotAchievement.pilot_id == TEST_PILOT_ID))
     await session.execute(delete(MissionSpPurchase).where(MissionSpPurchase.mission_id == TEST_MISSION_ID))
+    await session.execute(delete(PilotStats).where(PilotStats.pilot_id == TEST_PILOT_ID))
     await session.execute(delete(Pilot).where(Pilot.id == TEST_PILOT_ID))
     await session.execute(delete(Mission).where(Mission.id == TEST_MISSION_ID))
     await session.execute(delete(Force).where(Force.id == TEST_FORCE_ID))
@@ -1,25 +1,34 @@
 import asyncio
+import gzip
+import hashlib
 import tempfile
 import threading
 import time
 from pathlib import Path
 
 import pytest
+from httpx import AsyncClient, ASGITransport
 from sqlalchemy import select, delete
+from watchdog.events import FileModifiedEvent
 from watchdog.observers import Observer
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from server import app
 from database import SessionLocal
-from models import MechCatalogEntry
+from models import MechCatalogEntry, CatalogImportJob
+from services.import_queue import ImportQueue, ImportQueueFull
+import watcher
 from watcher import (
+    get_status,
     validate_header,
     process_csv_file,
     handle_dropped_file,
     start_watcher,
     stop_watcher,
     _DebouncedCsvHandler,
+    DebounceScheduler,
 )
 
 TEST_MUL_IDS = [990001, 990002]
@@ -34,9 +43,13 @@ MALFORMED_CSV = """foo,bar,baz
 """
 
 
+TEST_CHECKSUMS = [hashlib.sha256(text.encode()).hexdigest() for text in (VALID_CSV, MALFORMED_CSV)]
+
+
 async def _cleanup():
     async with SessionLocal() as session:
         await session.execute(delete(MechCatalogEntry).where(MechCatalogEntry.mul_id.in_(TEST_MUL_IDS)))
+        await session.execute(delete(CatalogImportJob).where(CatalogImportJob.sha256.in_(TEST_CHECKSUMS)))
         await session.commit()
 
 
@@ -108,6 +121,65 @@ async def test_handle_dropped_file_archives_valid_file_with_timestamp():
     await _cleanup()
 
 
+@pytest.mark.asyncio
+async def test_redropped_identical_file_is_skipped_and_runs_are_persisted_in_paged_history():
+    await _cleanup()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            watch_dir = Path(tmp)
+            results = []
+            for name in ("first.csv", "again.csv"):
+                csv_path = watch_dir / name
+                csv_path.write_text(VALID_CSV)
+                async with SessionLocal() as session:
+                    results.append(await handle_dropped_file(session, csv_path, watch_dir, commit=True))
+                assert not csv_path.exists()
+
+        first, again = results
+        assert first["status"] == "ok" and first["created"] == 1
+        assert again["status"] == "duplicate" and again["duplicateOf"] == first["jobId"]
+        assert first["sha256"] == again["sha256"] == TEST_CHECKSUMS[0]
+
+        async with SessionLocal() as session:
+            runs = {
+                run.id: run
+                for run in (
+                    await session.execute(select(CatalogImportJob).where(CatalogImportJob.sha256 == TEST_CHECKSUMS[0]))
+                ).scalars()
+            }
+        assert runs[first["jobId"]].status == "succeeded"
+        assert runs[first["jobId"]].source == "watcher"
+        assert (runs[first["jobId"]].rows, runs[first["jobId"]].created) == (2, 1)
+        assert runs[first["jobId"]].duration_seconds is not None
+        assert runs[again["jobId"]].status == "duplicate"
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            page_one = (await client.get("/api/mech-catalog/import-status?page=1&pageSize=1")).json()
+            page_two = (await client.get("/api/mech-catalog/import-status?page=2&pageSize=1")).json()
+        assert page_one["history"]["total"] >= 2 and page_one["history"]["pageSize"] == 1
+        assert [item["id"] for item in page_one["history"]["items"]] == [again["jobId"]]
+        assert [item["id"] for item in page_two["history"]["items"]] == [first["jobId"]]
+        assert page_two["history"]["items"][0]["rowsPerSecond"] == runs[first["jobId"]].rows_per_second
+    finally:
+        await _cleanup()
+
+
+@pytest.mark.asyncio
+async def test_handle_dropped_gzipped_csv_is_imported_and_archived_with_its_suffix(tmp_path):
+    csv_path = tmp_path / "mul.csv.gz"
+    csv_path.write_bytes(gzip.compress(VALID_CSV.encode()))
+
+    async with SessionLocal() as session:
+        result = await handle_dropped_file(session, csv_path, tmp_path)
+        await session.rollback()
+
+    assert result["status"] == "ok"
+    assert (result["rows"], result["created"]) == (2, 1)
+    archived = Path(result["archivedTo"])
+    assert archived.name.startswith("mul_") and archived.name.endswith(".csv.gz")
+
+
 @pytest.mark.asyncio
 async def test_handle_dropped_file_quarantines_malformed_file_with_log():
     with tempfile.TemporaryDirectory() as tmp:
@@ -128,6 +200,183 @@ async def test_handle_dropped_file_quarantines_malformed_file_with_log():
         assert "Missing required header" in log_path.read_text()
 
 
+@pytest.mark.asyncio
+async def test_handle_dropped_file_records_and_quarantines_an_unexpected_failure(monkeypatch):
+    await _cleanup()
+
+    async def broken_import(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(watcher, "run_catalog_import", broken_import)
+    with tempfile.TemporaryDirectory() as tmp:
+        watch_dir = Path(tmp)
+        csv_path = watch_dir / "good.csv"
+        csv_path.write_text(VALID_CSV)
+
+        async with SessionLocal() as session:
+            result = await handle_dropped_file(session, csv_path, watch_dir, commit=True)
+
+        assert result["status"] == "error"
+        assert "database is locked" in result["reason"]
+        assert not csv_path.exists()
+        assert Path(result["movedTo"]).parent == watch_dir / "errors"
+        async with SessionLocal() as session:
+            run = await session.get(CatalogImportJob, result["jobId"])
+            assert (run.status, run.source, run.sha256) == ("failed", "watcher", TEST_CHECKSUMS[0])
+
+    await _cleanup()
+
+
+@pytest.mark.asyncio
+async def test_import_queue_runs_in_order_collapses_duplicates_and_bounds_depth():
+    queue = ImportQueue(concurrency=1, max_depth=3)
+    release = asyncio.Event()
+    ran = []
+    running = 0
+    max_running = 0
+
+    def job(name):
+        async def run():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            if name == "blocker":
+                await release.wait()
+            await asyncio.sleep(0)
+            ran.append(name)
+            running -= 1
+        return run
+
+    blocker = await queue.submit("blocker", job("blocker"), source="test")
+    await asyncio.sleep(0)
+    a = await queue.submit("a.csv", job("a"), source="watcher")
+    await queue.submit("b.csv", job("b"), source="watcher")
+    assert await queue.submit("a.csv", job("a-again"), source="watcher") is a
+    await queue.submit("c.csv", job("c"), source="admin")
+    with pytest.raises(ImportQueueFull):
+        await queue.submit("d.csv", job("d"), source="admin")
+
+    status = queue.status()
+    assert [e["key"] for e in status["inFlight"]] == ["blocker"]
+    assert [e["key"] for e in status["queued"]] == ["a.csv", "b.csv", "c.csv"]
+
+    # A waiting submitter gets in once a slot frees up.
+    waiting = asyncio.create_task(queue.submit("d.csv", job("d"), source="watcher", wait=True))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    release.set()
+    d = await waiting
+    await asyncio.gather(blocker.done, d.done)
+
+    assert ran == ["blocker", "a", "b", "c", "d"]
+    assert max_running == 1
+    assert queue.status()["queued"] == [] and queue.status()["inFlight"] == []
+
+
+@pytest.mark.asyncio
+async def test_full_import_queue_holds_back_one_task_however_many_files_fire(tmp_path, monkeypatch):
+    queue = ImportQueue(concurrency=1, max_depth=2)
+    monkeypatch.setattr(watcher, "import_queue", queue)
+    release = asyncio.Event()
+    await queue.submit("blocker", release.wait, source="test")
+    handler = _DebouncedCsvHandler(asyncio.get_running_loop(), tmp_path, debounce_seconds=0.2)
+    processed = []
+
+    async def process(path):
+        processed.append(path.name)
+
+    handler._process = process
+    await asyncio.sleep(0)
+    tasks_before = len(asyncio.all_tasks())
+    for i in range(200):
+        handler._fire(str(tmp_path / f"drop_{i}.csv"))
+    handler._fire(str(tmp_path / "drop_5.csv"))  # re-fired: keeps its place
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    assert len(asyncio.all_tasks()) - tasks_before == 1
+    assert [e["key"] for e in queue.status()["queued"]] == [str(tmp_path / "drop_0.csv"), str(tmp_path / "drop_1.csv")]
+    assert handler.waiting() == 198
+
+    release.set()
+    deadline = time.monotonic() + 10
+    while handler.waiting() or queue.status()["queued"] or queue.status()["inFlight"]:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+    assert processed == [f"drop_{i}.csv" for i in range(200)]
+    handler.close()
+
+
+def test_get_status_reports_import_queue():
+    status = get_status()
+    assert set(status["queue"]) == {"concurrency", "maxDepth", "inFlight", "queued"}
+
+
+@pytest.mark.asyncio
+async def test_debounce_collapses_1000_events_without_extra_threads(tmp_path):
+    loop = asyncio.get_running_loop()
+    handler = _DebouncedCsvHandler(loop, tmp_path, debounce_seconds=0.2)
+    fired = []
+    handler._fire = lambda path: fired.append(Path(path).name)
+    handler.scheduler.callback = handler._fire
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"burst_{i}.csv"
+        path.write_text(VALID_CSV)
+        paths.append(str(path))
+
+    threads_before = threading.active_count()
+    peak_threads = threads_before
+
+    def emit():
+        # Watchdog delivers events from its own thread.
+        nonlocal peak_threads
+        for n in range(1000):
+            handler.on_modified(FileModifiedEvent(paths[n % len(paths)]))
+            peak_threads = max(peak_threads, threading.active_count())
+        handler.on_modified(FileModifiedEvent(str(tmp_path / "notes.txt")))
+
+    emitter = threading.Thread(target=emit)
+    emitter.start()
+    emitter.join()
+    # The emitter thread itself is the only extra thread seen.
+    assert peak_threads <= threads_before + 1
+
+    deadline = time.monotonic() + 5
+    while len(fired) < len(paths) and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.3)
+    assert sorted(fired) == sorted(f"burst_{i}.csv" for i in range(10))
+    assert handler.scheduler.pending() == 0
+    handler.scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_debounce_waits_for_size_and_mtime_to_settle(tmp_path):
+    fired = []
+    scheduler = DebounceScheduler(0.2, lambda path: fired.append(asyncio.get_running_loop().time()))
+    path = tmp_path / "growing.csv"
+    path.write_text("chassis,model\n")
+
+    start = asyncio.get_running_loop().time()
+    scheduler.touch(str(path))
+    await asyncio.sleep(0.1)
+    # Still being written, but no event for it (e.g. a slow network copy).
+    with open(path, "a") as f:
+        f.write("Atlas,AS7-D\n")
+    await asyncio.sleep(0.2)
+    assert fired == [], "a file that changed since the last check must not fire yet"
+
+    await asyncio.sleep(0.3)
+    assert len(fired) == 1
+    assert fired[0] - start >= 0.4
+
+    scheduler.touch(str(tmp_path / "vanished.csv"))
+    await asyncio.sleep(0.3)
+    assert len(fired) == 1
+    scheduler.close()
+
+
 def test_real_filesystem_drop_is_detected_and_processed_end_to_end():
     """Full watchdog.Observer integration test against a temp directory -
     no real NAS folder needed, verifiable in CI."""
@@ -1,10 +1,13 @@
+import asyncio
+from contextlib import contextmanager
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy import select, delete
+from sqlalchemy import event, select, delete
 
 from server import app
-from database import SessionLocal
+from database import SessionLocal, engine
 from models import (
     Force,
     Mech,
@@ -13,6 +16,8 @@ from models import (
     Mission,
     MissionSpPurchase,
     PilotAchievement,
+    PilotKill,
+    PilotStats,
 )
 
 TEST_FORCE_ID = "test-write-api-lance"
@@ -33,11 +38,45 @@ async def _cleanup():
         await session.execute(delete(Mission).where(Mission.force_id == TEST_FORCE_ID))
         await session.execute(delete(Mech).where(Mech.force_id == TEST_FORCE_ID))
         await session.execute(delete(Elemental).where(Elemental.force_id == TEST_FORCE_ID))
+        await session.execute(delete(PilotKill).where(PilotKill.force_id == TEST_FORCE_ID))
+        await session.execute(delete(PilotStats).where(PilotStats.force_id == TEST_FORCE_ID))
         await session.execute(delete(Pilot).where(Pilot.force_id == TEST_FORCE_ID))
         await session.execute(delete(Force).where(Force.id == TEST_FORCE_ID))
         await session.commit()
 
 
+@contextmanager
+def _count_queries():
+    """Counts statements sent to the database (an executemany counts once)."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def _create_roster(client, size):
+    """`size` piloted mechs plus `size` elementals for the test force."""
+    mech_ids, pilot_ids, elemental_ids = [], [], []
+    for i in range(size):
+        pilot_id = (await client.post(f"/api/forces/{TEST_FORCE_ID}/pilots", json={"name": f"Pilot {i}"})).json()["id"]
+        mech_id = (
+            await client.post(f"/api/forces/{TEST_FORCE_ID}/mechs", json={"name": f"Mech {i}", "weight": 50})
+        ).json()["id"]
+        await client.put(f"/api/mechs/{mech_id}", json={"pilotId": pilot_id})
+        elemental_ids.append(
+            (await client.post(f"/api/forces/{TEST_FORCE_ID}/elementals", json={"name": f"Point {i}"})).json()["id"]
+        )
+        mech_ids.append(mech_id)
+        pilot_ids.append(pilot_id)
+    return mech_ids, pilot_ids, elemental_ids
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def cleanup_before_and_after():
     await _cleanup()
@@ -231,3 +270,112 @@ async def test_update_and_delete_mech():
 
         delete_missing_resp = await client.delete(f"/api/mechs/{mech_id}")
         assert delete_missing_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_complete_mission_query_count_does_not_grow_with_roster_size():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/api/forces", json={"id": TEST_FORCE_ID, "name": "Test Write API Lance", "startingWarchest": 500})
+        mech_ids, pilot_ids, elemental_ids = await _create_roster(client, 13)
+
+        async def complete(start, size):
+            units = slice(start, start + size)
+            mission_id = (
+                await client.post(
+                    f"/api/forces/{TEST_FORCE_ID}/missions",
+                    json={"name": f"Strike {size}", "assignedMechs": mech_ids[units], "assignedElementals": elemental_ids[units]},
+                )
+            ).json()["id"]
+            payload = {
+                "objectives": [{"title": "Win", "wpReward": 10, "achieved": True}],
+                "recap": "Done",
+                "mechs": {mech_id: {"status": "Damaged"} for mech_id in mech_ids[units]},
+                "elementals": {e_id: {"status": "Damaged", "suitsDamaged": 1} for e_id in elemental_ids[units]},
+                "pilots": {pilot_id: {"injuries": 1, "assists": 1} for pilot_id in pilot_ids[units]},
+            }
+            with _count_queries() as statements:
+                resp = await client.post(f"/api/missions/{mission_id}/complete", json=payload)
+            assert resp.status_code == 200
+            body = resp.json()
+            assert len(body["mechs"]) == len(body["elementals"]) == len(body["pilots"]) == size
+            assert all(p["injuries"] == 1 and p["combatRecord"]["assists"] == 1 for p in body["pilots"])
+            return len(statements)
+
+        # Fresh units each time, so every unit in a mission changes the same
+        # columns and the flush's UPDATEs batch the same way.
+        single = await complete(0, 1)
+        full = await complete(1, 12)
+        assert full == single
+        assert full <= 15
+
+
+@pytest.mark.asyncio
+async def test_create_mission_touches_only_assigned_units_with_constant_query_count():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/api/forces", json={"id": TEST_FORCE_ID, "name": "Test Write API Lance", "startingWarchest": 500})
+        mech_ids, pilot_ids, elemental_ids = await _create_roster(client, 4)
+
+        async def create(name):
+            with _count_queries() as statements:
+                resp = await client.post(
+                    f"/api/forces/{TEST_FORCE_ID}/missions",
+                    json={
+                        "name": name,
+                        "cost": 10,
+                        "assignedMechs": mech_ids[:2],
+                        "assignedElementals": elemental_ids[:1],
+                        "spPurchases": [{"choiceId": "art_longtom"}, {"choiceId": "art_longtom"}],
+                    },
+                )
+            assert resp.status_code == 201
+            assert resp.json()["totalTonnage"] == 100
+            assert len(resp.json()["spPurchases"]) == 2
+            return len(statements)
+
+        small_roster = await create("Before")
+        await _create_roster(client, 8)
+        large_roster = await create("After")
+        assert large_roster == small_roster
+
+        force = (await client.get(f"/api/forces/{TEST_FORCE_ID}")).json()
+        logs = {unit["id"]: len(unit["activityLog"]) for unit in force["mechs"] + force["elementals"] + force["pilots"]}
+        assert [logs[i] for i in mech_ids] == [2, 2, 0, 0]
+        assert [logs[i] for i in pilot_ids] == [2, 2, 0, 0]
+        assert [logs[i] for i in elemental_ids] == [2, 0, 0, 0]
+
+        resp = await client.post(
+            f"/api/forces/{TEST_FORCE_ID}/missions",
+            json={"name": "Bad SP", "spPurchases": [{"choiceId": "art_longtom"}, {"choiceId": "no-such-choice"}]},
+        )
+        assert resp.status_code == 404
+        assert "no-such-choice" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_parallel_downtime_actions_never_lose_a_warchest_update():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post(
+            "/api/forces",
+            json={"id": TEST_FORCE_ID, "name": "Test Write API Lance", "startingWarchest": 10_000, "wpMultiplier": 5},
+        )
+        mech_ids, _, _ = await _create_roster(client, 4)
+
+        responses = await asyncio.gather(
+            *(
+                client.post(f"/api/mechs/{mech_ids[i % len(mech_ids)]}/downtime", json={"actionId": "repair-armor"})
+                for i in range(100)
+            )
+        )
+        assert [resp.status_code for resp in responses] == [200] * 100
+        total_cost = sum(resp.json()["cost"] for resp in responses)
+        assert total_cost > 0
+
+        force = (await client.get(f"/api/forces/{TEST_FORCE_ID}")).json()
+        assert force["currentWarchest"] == 10_000 - total_cost
+        # Each response saw a distinct balance after its own debit.
+        balances = sorted(resp.json()["currentWarchest"] for resp in responses)
+        assert len(set(balances)) == 100
+        assert balances[0] == force["currentWarchest"]
@@ -1,10 +1,18 @@
 """Watched-folder auto-import for the mech catalog.
 
-Monitors MEK_CATALOG_WATCH_DIR (if set) for dropped *.csv files, debounced on
-write-completion, and upserts rows into mech_catalog keyed on mul_id.
+Monitors MEK_CATALOG_WATCH_DIR (if set) for dropped *.csv files (and
+*.csv.gz, *.zip and *.ndjson - see services/catalog_parse.py), debounced on
+write-completion, queues them on the shared catalog import queue
+(services/import_queue.py - one ordered queue for watched-folder drops and
+Admin uploads) and streams them through the shared catalog import engine
+(services/catalog_import.py) - the same upsert the Admin upload and the
+manual script use.
 Processed files are archived with a timestamp; malformed files (missing
 required header columns) are moved to an errors/ subfolder alongside a log
-explaining why.
+explaining why. Every drop is recorded in the persisted import history
+(`catalog_import_jobs`, see services/catalog_jobs.py) with its SHA-256; a
+drop whose checksum was already imported successfully is archived straight
+away without re-running the import.
 
 The file-processing logic (`process_csv_file`, `handle_dropped_file`) is
 pure/async and takes no dependency on watchdog, so it's directly unit
@@ -13,194 +21,268 @@ watcher. `start_watcher`/`stop_watcher` wire that logic to a real
 `watchdog.Observer` for the running app.
 """
 import asyncio
-import csv
+import heapq
 import logging
 import os
 import shutil
-import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
-from sqlalchemy import select
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
 from database import SessionLocal
-from models import MechCatalogEntry
+from domain.catalog_logic import validate_header
+from services.catalog_import import CatalogImportError, catalog_format, run_catalog_import
+from services.catalog_jobs import file_sha256, find_imported_checksum, record_run
+from services.catalog_parse import strip_catalog_suffix
+from services.import_queue import import_queue
 
 logger = logging.getLogger("mech_catalog_watcher")
 
-REQUIRED_HEADERS = {"chassis", "model", "mul_id", "BV", "tonnage"}
-MAX_HISTORY = 20
-
 _observer = None
+_handler = None
 _status = {
     "enabled": False,
     "watchDir": None,
     "running": False,
     "debounceSeconds": None,
 }
-_history = []
+RUN_STATUSES = {"ok": "succeeded", "error": "failed", "duplicate": "duplicate"}
 
 
 def get_status():
-    return {**_status, "recentImports": list(reversed(_history[-MAX_HISTORY:]))}
-
+    return {
+        **_status,
+        "queue": import_queue.status(),
+    }
 
-def _record_history(entry):
-    _history.append(entry)
-    del _history[:-MAX_HISTORY]
 
-
-def _parse_int(value):
-    if value is None:
-        return None
-    value = value.strip()
-    if not value:
-        return None
+async def process_csv_file(session, filepath: Path, commit=False) -> dict:
+    """Validate + import a single catalog file (format from its name). Does
+    not touch the filesystem beyond reading, so this is directly unit
+    testable."""
     try:
-        return int(float(value))
-    except ValueError:
-        return None
-
-
-def validate_header(fieldnames):
-    if not fieldnames:
-        return False
-    return REQUIRED_HEADERS.issubset(set(fieldnames))
-
-
-async def upsert_rows_by_mul_id(session, rows):
-    """Upsert catalog rows keyed strictly on mul_id. Rows missing chassis or
-    mul_id are counted as skipped (this watcher assumes incoming drops always
-    carry a mul_id, unlike Phase 6's bulk loader which also handles blanks)."""
-    created = updated = skipped = 0
-    for row in rows:
-        chassis = (row.get("chassis") or "").strip()
-        mul_id = _parse_int(row.get("mul_id"))
-        if not chassis or mul_id is None:
-            skipped += 1
-            continue
-
-        model = (row.get("model") or "").strip()
-        bv = _parse_int(row.get("BV")) or 0
-        tonnage = _parse_int(row.get("tonnage")) or 0
-        year = _parse_int(row.get("year"))
-        techbase = (row.get("techBase") or "").strip() or None
-        role = (row.get("role") or "").strip() or None
-
-        existing = (
-            await session.execute(select(MechCatalogEntry).where(MechCatalogEntry.mul_id == mul_id))
-        ).scalar_one_or_none()
-
-        now = datetime.now(timezone.utc).isoformat()
-        if existing:
-            existing.chassis = chassis
-            existing.model = model
-            existing.bv = bv
-            existing.tonnage = tonnage
-            existing.year = year
-            existing.techbase = techbase
-            existing.role = role
-            existing.updated_at = now
-            updated += 1
-        else:
-            session.add(
-                MechCatalogEntry(
-                    mul_id=mul_id,
-                    chassis=chassis,
-                    model=model,
-                    bv=bv,
-                    tonnage=tonnage,
-                    year=year,
-                    techbase=techbase,
-                    role=role,
-                    updated_at=now,
-                )
-            )
-            created += 1
-
-    return created, updated, skipped
-
-
-async def process_csv_file(session, filepath: Path) -> dict:
-    """Validate + import a single CSV file. Does not touch the filesystem
-    beyond reading, so this is directly unit testable."""
-    with open(filepath, encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        if not validate_header(reader.fieldnames):
-            return {
-                "status": "error",
-                "reason": f"Missing required header column(s). Found: {reader.fieldnames}",
-            }
-        rows = list(reader)
-
-    created, updated, skipped = await upsert_rows_by_mul_id(session, rows)
-    return {"status": "ok", "rows": len(rows), "created": created, "updated": updated, "skipped": skipped}
-
-
-async def handle_dropped_file(session, filepath: Path, watch_dir: Path) -> dict:
-    """Process a dropped file end-to-end: validate/import, then archive
-    (processed/) or quarantine (errors/ + a .log) depending on the outcome."""
+        with open(filepath, "rb") as f:
+            summary = await run_catalog_import(session, f, commit=commit, fmt=catalog_format(filepath.name) or "csv")
+    except CatalogImportError as exc:
+        return {"status": "error", "reason": str(exc)}
+    return {
+        "status": "ok",
+        "rows": summary["rows"],
+        "created": summary["created"],
+        "updated": summary["updated"],
+        "unchanged": summary["unchanged"],
+        "skipped": summary["skipped"],
+        "bytesRead": summary["bytesRead"],
+    }
+
+
+async def handle_dropped_file(session, filepath: Path, watch_dir: Path, commit=False) -> dict:
+    """Process a dropped file end-to-end: skip it if the same bytes were
+    already imported, otherwise validate/import; then archive (processed/)
+    or quarantine (errors/ + a .log) depending on the outcome, and record
+    the run in the import history."""
     processed_dir = watch_dir / "processed"
     errors_dir = watch_dir / "errors"
     processed_dir.mkdir(parents=True, exist_ok=True)
     errors_dir.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
-    result = await process_csv_file(session, filepath)
+    now = datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y%m%dT%H%M%S%f")
+    started = time.monotonic()
+    total_bytes = filepath.stat().st_size
+    sha256 = await asyncio.to_thread(file_sha256, filepath)
+    previous = await find_imported_checksum(session, sha256)
+    if previous is not None:
+        result = {"status": "duplicate", "duplicateOf": previous.id}
+    else:
+        try:
+            result = await process_csv_file(session, filepath, commit=commit)
+        except Exception as exc:
+            # Not a rejected file but a failed run (DB error, bug): still
+            # quarantine the file and record the run, so it isn't lost.
+            logger.exception("Import of dropped mech catalog file %s failed", filepath)
+            await session.rollback()
+            result = {"status": "error", "reason": f"Import failed: {exc}"}
+    duration = round(time.monotonic() - started, 3)
     result["filename"] = filepath.name
     result["timestamp"] = timestamp
+    result["sha256"] = sha256
 
-    if result["status"] == "ok":
-        dest = processed_dir / f"{filepath.stem}_{timestamp}{filepath.suffix}"
+    stem = strip_catalog_suffix(filepath.name)
+    suffix = filepath.name[len(stem):]
+    if result["status"] in ("ok", "duplicate"):
+        dest = processed_dir / f"{stem}_{timestamp}{suffix}"
         shutil.move(str(filepath), str(dest))
         result["archivedTo"] = str(dest)
     else:
-        dest = errors_dir / f"{filepath.stem}_{timestamp}{filepath.suffix}"
+        dest = errors_dir / f"{stem}_{timestamp}{suffix}"
         shutil.move(str(filepath), str(dest))
-        log_path = errors_dir / f"{filepath.stem}_{timestamp}.log"
+        log_path = errors_dir / f"{stem}_{timestamp}.log"
         log_path.write_text(f"{timestamp} - {result['reason']}\n")
         result["movedTo"] = str(dest)
         result["logPath"] = str(log_path)
 
-    _record_history(result)
+    run = record_run(
+        session,
+        filepath.name,
+        "watcher",
+        sha256,
+        RUN_STATUSES[result["status"]],
+        total_bytes=total_bytes,
+        summary=result if result["status"] == "ok" else None,
+        error=result.get("reason"),
+        started_at=now.isoformat(),
+        duration=duration,
+    )
+    if commit:
+        await session.commit()
+    result["jobId"] = run.id
+    result["durationSeconds"] = duration
+    result["rowsPerSecond"] = run.rows_per_second
     return result
 
 
+def _file_snapshot(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class DebounceScheduler:
+    """Per-path debounce on the event loop: one heap of `(deadline, path)`
+    and one task that sleeps until the earliest deadline, however many
+    events arrive (editors and rsync emit dozens per file). Each event
+    pushes the path's deadline back; superseded heap entries are skipped
+    when they surface. When a deadline passes, the file's size/mtime is
+    compared with the last snapshot - if it changed without an event, it is
+    still being written and gets another `delay`. Only a file that held
+    still for a full `delay` is handed to `callback`.
+
+    `touch` must run on the loop (use `loop.call_soon_threadsafe` from
+    watchdog's thread)."""
+
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self._heap = []
+        self._deadlines = {}
+        self._snapshots = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def pending(self):
+        return len(self._deadlines)
+
+    def touch(self, path):
+        loop = asyncio.get_running_loop()
+        self._push(path, loop.time() + self.delay)
+        self._snapshots[path] = _file_snapshot(path)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        elif self._heap[0][1] == path:
+            self._wakeup.set()
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._heap.clear()
+        self._deadlines.clear()
+        self._snapshots.clear()
+
+    def _push(self, path, deadline):
+        self._deadlines[path] = deadline
+        heapq.heappush(self._heap, (deadline, path))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._heap:
+            deadline, path = self._heap[0]
+            if self._deadlines.get(path) != deadline:
+                heapq.heappop(self._heap)
+                continue
+            remaining = deadline - loop.time()
+            if remaining > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            snapshot = _file_snapshot(path)
+            if snapshot is not None and snapshot != self._snapshots.get(path):
+                self._snapshots[path] = snapshot
+                self._push(path, loop.time() + self.delay)
+                continue
+            del self._deadlines[path]
+            self._snapshots.pop(path, None)
+            if snapshot is not None:
+                try:
+                    self.callback(path)
+                except Exception:
+                    logger.exception("Debounce callback failed for %s", path)
+
+
 class _DebouncedCsvHandler(FileSystemEventHandler):
     def __init__(self, loop, watch_dir, debounce_seconds):
         self.loop = loop
         self.watch_dir = watch_dir
         self.debounce_seconds = debounce_seconds
-        self._timers = {}
-        self._lock = threading.Lock()
+        self.scheduler = DebounceScheduler(debounce_seconds, self._fire)
+        # Debounced files waiting for room in the import queue, in firing
+        # order (a dict as an ordered set, so a re-fired file keeps its
+        # place). One feeder task moves them in, so a full queue holds back
+        # a single waiting coroutine rather than one per file.
+        self._waiting = {}
+        self._feeder = None
 
     def _schedule(self, src_path):
-        if not src_path.lower().endswith(".csv"):
+        if catalog_format(src_path) is None:
             return
-        with self._lock:
-            existing_timer = self._timers.get(src_path)
-            if existing_timer:
-                existing_timer.cancel()
-            timer = threading.Timer(self.debounce_seconds, self._fire, args=(src_path,))
-            self._timers[src_path] = timer
-            timer.daemon = True
-            timer.start()
+        # Called on watchdog's thread - hand the event to the loop.
+        self.loop.call_soon_threadsafe(self.scheduler.touch, src_path)
+
+    def waiting(self):
+        return len(self._waiting)
+
+    def close(self):
+        self.scheduler.close()
+        if self._feeder is not None:
+            self._feeder.cancel()
+            self._feeder = None
+        self._waiting.clear()
 
     def _fire(self, src_path):
-        with self._lock:
-            self._timers.pop(src_path, None)
-        path = Path(src_path)
-        if not path.exists():
-            return
-        asyncio.run_coroutine_threadsafe(self._process(path), self.loop)
+        self._waiting[Path(src_path)] = None
+        if self._feeder is None or self._feeder.done():
+            self._feeder = self.loop.create_task(self._feed())
+
+    async def _feed(self):
+        while self._waiting:
+            path = next(iter(self._waiting))
+            try:
+                # Waits for room when the queue is full; a file that's
+                # already queued collapses into its existing entry.
+                await import_queue.submit(
+                    str(path), lambda path=path: self._process(path), source="watcher", label=path.name, wait=True
+                )
+            except Exception:
+                logger.exception("Failed to queue dropped mech catalog file %s", path)
+            self._waiting.pop(path, None)
 
     async def _process(self, path):
+        if not path.exists():
+            # Handled (and archived) by an earlier queue entry.
+            return
         try:
             async with SessionLocal() as session:
-                async with session.begin():
-                    await handle_dropped_file(session, path, self.watch_dir)
+                await handle_dropped_file(session, path, self.watch_dir, commit=True)
         except Exception:
             logger.exception("Failed to process dropped mech catalog file %s", path)
 
@@ -212,9 +294,14 @@ class _DebouncedCsvHandler(FileSystemEventHandler):
         if not event.is_directory:
             self._schedule(event.src_path)
 
+    def on_moved(self, event):
+        # rsync and friends write a temp file and rename it into place.
+        if not event.is_directory:
+            self._schedule(event.dest_path)
+
 
 def start_watcher(loop):
-    global _observer
+    global _observer, _handler
 
     watch_dir_env = os.environ.get("MEK_CATALOG_WATCH_DIR")
     _status["debounceSeconds"] = float(os.environ.get("MEK_CATALOG_WATCH_DEBOUNCE_SECONDS", "2"))
@@ -234,6 +321,7 @@ def start_watcher(loop):
     observer.start()
 
     _observer = observer
+    _handler = handler
     _status["enabled"] = True
     _status["watchDir"] = str(watch_dir)
     _status["running"] = True
@@ -241,9 +329,12 @@ def start_watcher(loop):
 
 
 def stop_watcher():
-    global _observer
+    global _observer, _handler
     if _observer:
         _observer.stop()
         _observer.join(timeout=5)
         _observer = None
+    if _handler:
+        _handler.close()
+        _handler = None
     _status["running"] = False
@@ -3,12 +3,10 @@ import { Input } from './ui/input';
 import { Search, X } from 'lucide-react';
 import { searchMechCatalog, getMechCatalogImportStatus } from '../lib/api';
 
-// Watcher timestamps look like "20260810T062812123456" (from
-// datetime.strftime("%Y%m%dT%H%M%S%f")) - format into a readable local time.
+// Import history timestamps are ISO 8601 (UTC) - format into a readable local time.
 function formatWatcherTimestamp(ts) {
-  if (!ts || ts.length < 15) return ts || '';
-  const iso = `${ts.slice(0, 4)}-${ts.slice(4, 6)}-${ts.slice(6, 8)}T${ts.slice(9, 11)}:${ts.slice(11, 13)}:${ts.slice(13, 15)}Z`;
-  const date = new Date(iso);
+  if (!ts) return '';
+  const date = new Date(ts);
   return Number.isNaN(date.getTime()) ? ts : date.toLocaleString();
 }
 
@@ -40,7 +38,7 @@ export default function MechAutocomplete({ value, onChange, onSelect, placeholde
   useEffect(() => {
     let active = true;
     const poll = () => {
-      getMechCatalogImportStatus()
+      getMechCatalogImportStatus({ pageSize: 10 })
         .then((data) => {
           if (active) setImportStatus(data);
         })
@@ -179,8 +177,8 @@ export default function MechAutocomplete({ value, onChange, onSelect, placeholde
 
   const showDropdown = isOpen && filteredMechs.length > 0;
 
-  const latestImport = importStatus?.recentImports?.[0] || null;
-  const latestImportKey = latestImport ? `${latestImport.timestamp}-${latestImport.filename}` : 'idle';
+  const latestImport = importStatus?.history?.items?.find((entry) => entry.source === 'watcher') || null;
+  const latestImportKey = latestImport ? latestImport.id : 'idle';
   const showImportBadge = Boolean(importStatus?.enabled) && dismissedImportKey !== latestImportKey;
 
   return (
@@ -202,19 +200,23 @@ export default function MechAutocomplete({ value, onChange, onSelect, placeholde
         <div
           data-testid="mech-catalog-import-status"
           className={`mt-1 flex items-center justify-between gap-2 rounded-md border px-2 py-1 text-xs ${
-            latestImport?.status === 'error'
+            latestImport?.status === 'failed'
               ? 'border-destructive/40 bg-destructive/10 text-destructive'
               : 'border-border bg-muted/50 text-muted-foreground'
           }`}
         >
           {latestImport ? (
-            latestImport.status === 'error' ? (
+            latestImport.status === 'failed' ? (
               <span data-testid="mech-catalog-import-status-error">
-                Catalog import failed ({formatWatcherTimestamp(latestImport.timestamp)}): {latestImport.reason}
+                Catalog import failed ({formatWatcherTimestamp(latestImport.finishedAt)}): {latestImport.error}
+              </span>
+            ) : latestImport.status === 'duplicate' ? (
+              <span data-testid="mech-catalog-import-status-duplicate">
+                {latestImport.filename} ({formatWatcherTimestamp(latestImport.finishedAt)}) was already imported - skipped
               </span>
             ) : (
               <span data-testid="mech-catalog-import-status-success">
-                Last catalog import {formatWatcherTimestamp(latestImport.timestamp)} - {latestImport.created} new,{' '}
+                Last catalog import {formatWatcherTimestamp(latestImport.finishedAt)} - {latestImport.created} new,{' '}
                 {latestImport.updated} updated
                 {latestImport.skipped ? `, ${latestImport.skipped} skipped` : ''}
               </span>
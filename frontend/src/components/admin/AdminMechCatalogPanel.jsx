@@ -3,28 +3,42 @@ import { UploadCloud, FolderSync, RefreshCw, CheckCircle2, XCircle } from 'lucid
 import { Button } from '../ui/button';
 import * as api from '../../lib/api';
 
+const HISTORY_PAGE_SIZE = 10;
+
+function formatHistoryEntry(entry) {
+  if (entry.status === 'succeeded') {
+    const rate = entry.rowsPerSecond ? `, ${entry.rowsPerSecond} rows/s` : '';
+    const duration = entry.durationSeconds != null ? ` in ${entry.durationSeconds}s` : '';
+    return `${entry.created} created, ${entry.updated} updated, ${entry.unchanged ?? 0} unchanged, ${entry.skipped} skipped${duration}${rate}`;
+  }
+  if (entry.status === 'duplicate') return 'Identical file already imported - skipped';
+  return entry.error || entry.status;
+}
+
 export default function AdminMechCatalogPanel() {
   const fileInputRef = useRef(null);
   const [selectedFile, setSelectedFile] = useState(null);
   const [importing, setImporting] = useState(false);
+  const [job, setJob] = useState(null);
   const [result, setResult] = useState(null);
   const [error, setError] = useState(null);
 
   const [watcherStatus, setWatcherStatus] = useState(null);
   const [watcherError, setWatcherError] = useState('');
   const [watcherLoading, setWatcherLoading] = useState(false);
+  const [historyPage, setHistoryPage] = useState(1);
 
   const loadWatcherStatus = useCallback(async () => {
     setWatcherLoading(true);
     setWatcherError('');
     try {
-      setWatcherStatus(await api.getMechCatalogImportStatus());
+      setWatcherStatus(await api.getMechCatalogImportStatus({ page: historyPage, pageSize: HISTORY_PAGE_SIZE }));
     } catch (err) {
       setWatcherError(err.message);
     } finally {
       setWatcherLoading(false);
     }
-  }, []);
+  }, [historyPage]);
 
   useEffect(() => {
     loadWatcherStatus();
@@ -36,29 +50,64 @@ export default function AdminMechCatalogPanel() {
     setError(null);
   };
 
-  const handleImport = async () => {
+  // Imports run as background jobs; poll until the job reaches a final state.
+  useEffect(() => {
+    if (!job || !['queued', 'running'].includes(job.status)) return undefined;
+    const timer = setTimeout(async () => {
+      try {
+        const next = await api.getMechCatalogImportJob(job.id);
+        if (['queued', 'running'].includes(next.status)) {
+          setJob(next);
+          return;
+        }
+        setJob(null);
+        setImporting(false);
+        if (next.status === 'succeeded') {
+          setResult(next);
+          if (!next.dryRun) {
+            setSelectedFile(null);
+            if (fileInputRef.current) fileInputRef.current.value = '';
+          }
+        } else {
+          setError(next.error || `Import ${next.status}.`);
+        }
+      } catch (err) {
+        setJob(null);
+        setImporting(false);
+        setError(err.message);
+      }
+    }, 1000);
+    return () => clearTimeout(timer);
+  }, [job]);
+
+  const handleImport = async (dryRun = false) => {
     if (!selectedFile) return;
     setImporting(true);
     setError(null);
     setResult(null);
     try {
-      const response = await api.adminImportMechCatalog(selectedFile);
-      setResult(response);
-      setSelectedFile(null);
-      if (fileInputRef.current) fileInputRef.current.value = '';
-      loadWatcherStatus();
+      setJob(await api.adminImportMechCatalog(selectedFile, { dryRun }));
     } catch (err) {
       setError(err.message);
-    } finally {
       setImporting(false);
     }
   };
 
+  const handleCancel = async () => {
+    if (!job) return;
+    try {
+      setJob(await api.cancelMechCatalogImportJob(job.id));
+    } catch (err) {
+      setError(err.message);
+    }
+  };
+
   return (
     <div className="space-y-4" data-testid="admin-mech-catalog-panel">
       <h3 className="font-heading uppercase tracking-wider text-sm text-muted-foreground">Mech Catalog Import</h3>
       <p className="text-xs text-muted-foreground">
-        Upload a MekBay CSV export. Entries are upserted by MUL ID - existing rows are updated, new ones inserted.
+        Upload a MekBay CSV export (plain, .csv.gz, a .zip of CSVs, or .ndjson). Entries are upserted by MUL ID - changed rows are updated, new ones inserted, unchanged ones left alone.
+        Use Preview to see what an import would change first.
         The watched-folder mechanism (Docker/ops) remains available as an alternative path.
       </p>
 
@@ -66,16 +115,50 @@ export default function AdminMechCatalogPanel() {
         <input
           ref={fileInputRef}
           type="file"
-          accept=".csv"
+          accept=".csv,.gz,.zip,.ndjson"
           onChange={handleFileChange}
           data-testid="admin-mech-catalog-file-input"
           className="text-sm"
         />
-        <Button size="sm" onClick={handleImport} disabled={!selectedFile || importing} data-testid="admin-mech-catalog-import-btn">
+        <Button
+          variant="outline"
+          size="sm"
+          onClick={() => handleImport(true)}
+          disabled={!selectedFile || importing}
+          data-testid="admin-mech-catalog-preview-btn"
+        >
+          Preview changes
+        </Button>
+        <Button size="sm" onClick={() => handleImport()} disabled={!selectedFile || importing} data-testid="admin-mech-catalog-import-btn">
           <UploadCloud className="w-4 h-4" /> {importing ? 'Importing...' : 'Import CSV'}
         </Button>
       </div>
 
+      {job && (
+        <div className="border border-border/40 rounded p-3 text-sm space-y-2" data-testid="admin-mech-catalog-job">
+          <div className="flex items-center justify-between gap-3">
+            <span>
+              <span className="font-medium">{job.filename}</span> - {job.status === 'queued' ? 'queued' : `${job.rows} rows processed`}
+            </span>
+            <Button variant="outline" size="sm" onClick={handleCancel} data-testid="admin-mech-catalog-cancel-btn">
+              Cancel
+            </Button>
+          </div>
+          <div className="h-1.5 bg-muted rounded overflow-hidden">
+            <div
+              className="h-full bg-primary transition-all"
+              style={{ width: `${job.totalBytes ? Math.round((100 * job.bytesRead) / job.totalBytes) : 0}%` }}
+            />
+          </div>
+          {job.rowsPerSecond != null && (
+            <p className="font-mono text-xs text-muted-foreground">
+              {Math.round(job.rowsPerSecond)} rows/s
+              {job.etaSeconds != null && <> &middot; ~{Math.ceil(job.etaSeconds)}s left</>}
+            </p>
+          )}
+        </div>
+      )}
+
       {error && (
         <div className="border border-destructive/40 bg-destructive/5 rounded p-3 text-sm text-destructive" data-testid="admin-mech-catalog-error">
           {error}
@@ -84,10 +167,24 @@ export default function AdminMechCatalogPanel() {
 
       {result && (
         <div className="border border-operational/40 bg-operational/5 rounded p-3 text-sm" data-testid="admin-mech-catalog-result">
-          <p><span className="font-medium">{result.filename}</span> imported.</p>
+          <p>
+            <span className="font-medium">{result.filename}</span> {result.dryRun ? 'previewed - nothing was written.' : 'imported.'}
+          </p>
           <p className="font-mono text-xs mt-1">
-            Created: {result.created} &middot; Updated: {result.updated} &middot; Errors: {(result.errors || []).length}
+            Created: {result.created} &middot; Updated: {result.updated} &middot; Unchanged: {result.unchanged}
+            {' '}&middot; Errors: {(result.errors || []).length}
           </p>
+          {result.dryRun && result.diff?.updated?.length > 0 && (
+            <ul className="mt-2 space-y-0.5 text-xs font-mono" data-testid="admin-mech-catalog-diff">
+              {result.diff.updated.slice(0, 20).map((entry) => (
+                <li key={`${entry.mulId}-${entry.chassis}-${entry.model}`}>
+                  {entry.chassis} {entry.model}: {Object.entries(entry.changes)
+                    .map(([column, change]) => (column === 'components' ? column : `${column} ${change.from} -> ${change.to}`))
+                    .join(', ')}
+                </li>
+              ))}
+            </ul>
+          )}
         </div>
       )}
 
@@ -139,37 +236,67 @@ export default function AdminMechCatalogPanel() {
                   Watching: <span className="font-mono">{watcherStatus.watchDir}</span>
                 </div>
               )}
+              {watcherStatus.queue && (
+                <div className="text-muted-foreground" data-testid="watcher-status-queue">
+                  Import queue: {watcherStatus.queue.inFlight.length} running &middot; {watcherStatus.queue.queued.length} waiting
+                  {watcherStatus.queue.queued.length > 0 && (
+                    <span className="font-mono"> ({watcherStatus.queue.queued.map((entry) => entry.label || entry.key).join(', ')})</span>
+                  )}
+                </div>
+              )}
             </div>
 
             <div>
-              <div className="font-medium mb-1 text-muted-foreground">Recent Imports</div>
-              {(!watcherStatus.recentImports || watcherStatus.recentImports.length === 0) ? (
+              <div className="font-medium mb-1 text-muted-foreground">Import History</div>
+              {(!watcherStatus.history || watcherStatus.history.items.length === 0) ? (
                 <div className="text-muted-foreground" data-testid="watcher-status-empty">
-                  No CSV drops processed yet.
+                  No catalog imports recorded yet.
                 </div>
               ) : (
                 <ul className="space-y-1" data-testid="watcher-status-recent-imports">
-                  {watcherStatus.recentImports.slice(0, 5).map((entry, idx) => (
+                  {watcherStatus.history.items.map((entry, idx) => (
                     <li
-                      key={`${entry.filename}-${entry.timestamp}-${idx}`}
+                      key={entry.id}
                       className="flex items-center gap-2 bg-muted/50 rounded px-2 py-1"
                       data-testid={`watcher-status-import-row-${idx}`}
                     >
-                      {entry.status === 'ok' ? (
+                      {['succeeded', 'duplicate'].includes(entry.status) ? (
                         <CheckCircle2 className="w-3.5 h-3.5 text-emerald-400 flex-shrink-0" />
                       ) : (
                         <XCircle className="w-3.5 h-3.5 text-destructive flex-shrink-0" />
                       )}
                       <span className="font-mono truncate">{entry.filename}</span>
                       <span className="text-muted-foreground flex-shrink-0">
-                        {entry.status === 'ok'
-                          ? `${entry.created} created, ${entry.updated} updated, ${entry.skipped} skipped`
-                          : entry.reason}
+                        {entry.source === 'watcher' ? 'drop' : 'upload'}{entry.dryRun ? ' (preview)' : ''}
                       </span>
+                      <span className="text-muted-foreground flex-shrink-0">{formatHistoryEntry(entry)}</span>
                     </li>
                   ))}
                 </ul>
               )}
+              {watcherStatus.history && watcherStatus.history.total > HISTORY_PAGE_SIZE && (
+                <div className="flex items-center gap-2 mt-1" data-testid="watcher-status-history-pager">
+                  <Button
+                    variant="outline"
+                    size="sm"
+                    disabled={historyPage <= 1}
+                    onClick={() => setHistoryPage(historyPage - 1)}
+                  >
+                    Newer
+                  </Button>
+                  <span className="text-muted-foreground">
+                    Page {historyPage} of {Math.ceil(watcherStatus.history.total / HISTORY_PAGE_SIZE)}
+                  </span>
+                  <Button
+                    variant="outline"
+                    size="sm"
+                    disabled={historyPage * HISTORY_PAGE_SIZE >= watcherStatus.history.total}
+                    onClick={() => setHistoryPage(historyPage + 1)}
+                  >
+                    Older
+                  </Button>
+                </div>
+              )}
             </div>
           </div>
         )}
@@ -3,10 +3,16 @@
 
 const API_BASE = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
-async function request(method, path, body) {
+// `idempotencyKey` is sent as the `Idempotency-Key` header: the mission
+// create/complete and downtime endpoints replay their first response for a
+// retried key instead of applying the write (and its WP cost) again.
+async function request(method, path, body, { idempotencyKey } = {}) {
+  const headers = {};
+  if (body !== undefined) headers['Content-Type'] = 'application/json';
+  if (idempotencyKey) headers['Idempotency-Key'] = idempotencyKey;
   const response = await fetch(`${API_BASE}${path}`, {
     method,
-    headers: body !== undefined ? { 'Content-Type': 'application/json' } : undefined,
+    headers: Object.keys(headers).length ? headers : undefined,
     body: body !== undefined ? JSON.stringify(body) : undefined,
   });
 
@@ -79,12 +85,20 @@ export const adminCreateAchievementDefinition = (payload) =>
 export const adminUpdateAchievementDefinition = (id, payload) =>
   request('PUT', `/admin/achievement-definitions/${id}`, payload);
 export const adminDeleteAchievementDefinition = (id) => request('DELETE', `/admin/achievement-definitions/${id}`);
-
-// Admin: mech catalog CSV import (multipart, bypasses the generic JSON helper)
-export const adminImportMechCatalog = async (file) => {
+// Create/update (condition changes) return a `backfillJobId`; poll it to see existing pilots re-evaluated.
+export const adminReevaluateAchievements = (achievementIds = null) =>
+  request('POST', '/admin/achievement-definitions/reevaluate', { achievementIds });
+export const getAchievementBackfillJob = (jobId) => request('GET', `/admin/achievement-backfills/${jobId}`);
+export const listAchievementBackfillJobs = () => request('GET', '/admin/achievement-backfills');
+
+// Admin: mech catalog CSV import (multipart, bypasses the generic JSON helper).
+// Returns a background import job to poll with getMechCatalogImportJob;
+// `dryRun` jobs compute the would-be diff without writing anything.
+export const adminImportMechCatalog = async (file, { dryRun = false } = {}) => {
   const formData = new FormData();
   formData.append('file', file);
-  const response = await fetch(`${API_BASE}/admin/mech-catalog/import`, { method: 'POST', body: formData });
+  const query = dryRun ? '?dryRun=true' : '';
+  const response = await fetch(`${API_BASE}/admin/mech-catalog/import${query}`, { method: 'POST', body: formData });
   if (!response.ok) {
     let detail = '';
     try {
@@ -96,6 +110,9 @@ export const adminImportMechCatalog = async (file) => {
   }
   return response.json();
 };
+export const getMechCatalogImportJob = (jobId) => request('GET', `/admin/mech-catalog/import/${jobId}`);
+export const cancelMechCatalogImportJob = (jobId) => request('POST', `/admin/mech-catalog/import/${jobId}/cancel`);
+export const listMechCatalogImportJobs = () => request('GET', '/admin/mech-catalog/import-jobs');
 
 // Admin: force special abilities as free text ("Title: Description" per line).
 // Upserts by name into the existing pool, then links the resulting ids to
@@ -149,17 +166,33 @@ export const uploadElementalImage = (id, file) => uploadImage(`/elementals/${id}
 export const deleteElementalImage = (id) => request('DELETE', `/elementals/${id}/image`);
 
 // Missions
-export const createMission = (forceId, payload) => request('POST', `/forces/${forceId}/missions`, payload);
+export const createMission = (forceId, payload, options) =>
+  request('POST', `/forces/${forceId}/missions`, payload, options);
 export const updateMission = (id, payload) => request('PUT', `/missions/${id}`, payload);
 export const deleteMission = (id) => request('DELETE', `/missions/${id}`);
 export const addSpPurchase = (missionId, purchase) =>
   request('POST', `/missions/${missionId}/sp-purchases`, purchase);
 export const deleteSpPurchase = (id) => request('DELETE', `/sp-purchases/${id}`);
+export const evaluateLineups = (forceId, lineups) =>
+  request('POST', `/forces/${forceId}/lineup/evaluate`, { lineups });
+export const optimizeLineup = (forceId, options) => request('POST', `/forces/${forceId}/lineup/optimize`, options);
+export const solvePilotAssignment = (forceId, options) =>
+  request('POST', `/forces/${forceId}/pilot-assignment`, options);
+export const generateOpFor = (forceId, options) =>
+  request('POST', `/forces/${forceId}/missions/opfor/generate`, options);
+export const getLeaderboards = ({ forceId, sort = 'kills', page = 1, pageSize = 50 } = {}) =>
+  request(
+    'GET',
+    `/leaderboards?sort=${sort}&page=${page}&pageSize=${pageSize}${forceId ? `&forceId=${forceId}` : ''}`
+  );
 
 // Mech catalog
-export const searchMechCatalog = (search) =>
-  request('GET', `/mech-catalog?search=${encodeURIComponent(search)}`);
-export const getMechCatalogImportStatus = () => request('GET', '/mech-catalog/import-status');
+export const searchMechCatalog = (search, { fuzzy = true } = {}) =>
+  request('GET', `/mech-catalog?search=${encodeURIComponent(search)}${fuzzy ? '&fuzzy=true' : ''}`);
+// Watched-folder state, the import queue and one page of the persisted
+// import history (`history.items`, newest first).
+export const getMechCatalogImportStatus = ({ page = 1, pageSize = 20 } = {}) =>
+  request('GET', `/mech-catalog/import-status?page=${page}&pageSize=${pageSize}`);
 
 // Downtime
 export const getDowntimeActionsConfig = async () => {
@@ -171,10 +204,12 @@ export const getDowntimeActionsConfig = async () => {
   }
   return grouped;
 };
-export const applyMechDowntime = (mechId, payload) => request('POST', `/mechs/${mechId}/downtime`, payload);
-export const applyElementalDowntime = (elementalId, payload) =>
-  request('POST', `/elementals/${elementalId}/downtime`, payload);
-export const applyPilotDowntime = (pilotId, payload) => request('POST', `/pilots/${pilotId}/downtime`, payload);
+export const applyMechDowntime = (mechId, payload, options) =>
+  request('POST', `/mechs/${mechId}/downtime`, payload, options);
+export const applyElementalDowntime = (elementalId, payload, options) =>
+  request('POST', `/elementals/${elementalId}/downtime`, payload, options);
+export const applyPilotDowntime = (pilotId, payload, options) =>
+  request('POST', `/pilots/${pilotId}/downtime`, payload, options);
 
 // Achievements
 export const listAchievementDefinitions = () => request('GET', '/achievement-definitions');